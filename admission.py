@@ -0,0 +1,265 @@
+"""Admission control and backpressure for /chat.
+
+`AdmissionController` sits in front of `main.run`:
+  - a per-user token bucket rejects users sending faster than their rate
+  - at most `max_concurrent` chats run at once
+  - excess requests wait in a bounded queue, served across users by
+    deficit round-robin so one busy client cannot starve the others
+  - when the queue is full (or a wait times out) the request is rejected
+    with a Retry-After hint instead of piling up
+
+Queue waits are also bounded by the request deadline (core.deadline);
+a request whose deadline passes while queued raises DeadlineExceeded.
+
+Queue depth, in-flight count and wait-time statistics are available from
+`metrics()`.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from core.config import (
+    CHAT_MAX_CONCURRENCY,
+    CHAT_MAX_QUEUE,
+    CHAT_MAX_QUEUE_WAIT_SECONDS,
+    CHAT_USER_BURST,
+    CHAT_USER_RATE_PER_MINUTE,
+)
+from core import deadline
+from core.deadline import DeadlineExceeded
+
+# Idle, full buckets are dropped once this many users are tracked.
+MAX_TRACKED_BUCKETS = 10_000
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted; carries a Retry-After hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take `cost` tokens; return 0 on success or seconds until they are available."""
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate else math.inf
+
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.burst
+
+
+@dataclass
+class _Waiter:
+    user_id: str
+    cost: float
+    enqueued_at: float = field(default_factory=time.monotonic)
+    event: threading.Event = field(default_factory=threading.Event)
+    granted: bool = False
+
+
+class AdmissionController:
+    """Global concurrency limit + per-user rate limit + fair bounded queue."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        user_rate_per_minute: float,
+        user_burst: float,
+        max_wait_seconds: float,
+        quantum: float = 1.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.user_rate = user_rate_per_minute / 60
+        self.user_burst = user_burst
+        self.max_wait_seconds = max_wait_seconds
+        self.quantum = quantum
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queued = 0
+        self._buckets: dict[str, TokenBucket] = {}
+        self._queues: dict[str, deque[_Waiter]] = {}
+        self._deficit: dict[str, float] = {}
+        self._active: deque[str] = deque()  # users with queued requests, in DRR order
+
+        self._service_time = 1.0  # EWMA of seconds per admitted request
+        self._waits: deque[float] = deque(maxlen=1000)
+        self._counters = {
+            "admitted": 0, "queued": 0, "rejected_rate": 0, "rejected_queue_full": 0, "rejected_timeout": 0,
+            "rejected_deadline": 0,
+        }
+
+    # ── Public API ──
+
+    @contextmanager
+    def admit(self, user_id: str, cost: float = 1.0):
+        """Hold an execution slot for the duration of the block.
+
+        Raises AdmissionRejected when the user is over their rate, the queue
+        is full, or the wait for a slot exceeds max_wait_seconds, and
+        DeadlineExceeded when the request deadline passes while queued.
+        """
+        self._acquire(user_id, cost)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - start)
+
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def metrics(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            per_user = {user: len(q) for user, q in self._queues.items()}
+            counters = dict(self._counters)
+            in_flight, queued = self._in_flight, self._queued
+        return {
+            "in_flight": in_flight,
+            "queue_depth": queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queued_users": len(per_user),
+            "largest_user_queue": max(per_user.values(), default=0),
+            "wait_ms": {
+                "samples": len(waits),
+                "p50": waits[len(waits) // 2] * 1000 if waits else 0.0,
+                "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000 if waits else 0.0,
+                "max": waits[-1] * 1000 if waits else 0.0,
+            },
+            "service_time_ms": self._service_time * 1000,
+            **counters,
+        }
+
+    # ── Internals ──
+
+    def _bucket(self, user_id: str) -> TokenBucket:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= MAX_TRACKED_BUCKETS:
+                self._buckets = {u: b for u, b in self._buckets.items() if not b.is_full()}
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        return bucket
+
+    def _estimated_wait(self) -> float:
+        return self._service_time * (self._queued + 1) / max(self.max_concurrent, 1)
+
+    def _acquire(self, user_id: str, cost: float) -> None:
+        with self._lock:
+            runs_now = self._in_flight < self.max_concurrent and not self._queued
+            # Checked before taking a token, so a request turned away for a
+            # full queue does not also use up the user's rate limit.
+            if not runs_now and self._queued >= self.max_queue:
+                self._counters["rejected_queue_full"] += 1
+                raise AdmissionRejected("Server is busy, please retry shortly", self._estimated_wait())
+
+            wait_for_token = self._bucket(user_id).take(cost)
+            if wait_for_token:
+                self._counters["rejected_rate"] += 1
+                raise AdmissionRejected("Too many requests from this user", wait_for_token)
+
+            if runs_now:
+                self._in_flight += 1
+                self._counters["admitted"] += 1
+                self._waits.append(0.0)
+                return
+
+            waiter = _Waiter(user_id=user_id, cost=cost)
+            if user_id not in self._queues:
+                self._queues[user_id] = deque()
+                self._deficit[user_id] = 0.0
+                self._active.append(user_id)
+            self._queues[user_id].append(waiter)
+            self._queued += 1
+            self._counters["queued"] += 1
+
+        max_wait = deadline.bounded(self.max_wait_seconds)
+        waiter.event.wait(max_wait)
+
+        with self._lock:
+            if waiter.granted:
+                self._waits.append(time.monotonic() - waiter.enqueued_at)
+                return
+            self._remove(waiter)
+            if max_wait < self.max_wait_seconds:
+                self._counters["rejected_deadline"] += 1
+                raise DeadlineExceeded("a chat slot was free")
+            self._counters["rejected_timeout"] += 1
+            raise AdmissionRejected("Timed out waiting for capacity", self._estimated_wait())
+
+    def _release(self, service_seconds: float) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._service_time = 0.9 * self._service_time + 0.1 * service_seconds
+            while self._in_flight < self.max_concurrent and self._queued:
+                waiter = self._next_waiter()
+                waiter.granted = True
+                self._in_flight += 1
+                self._counters["admitted"] += 1
+                waiter.event.set()
+
+    def _next_waiter(self) -> _Waiter:
+        """Pick the next queued request by deficit round-robin (lock held)."""
+        while True:
+            user_id = self._active[0]
+            queue = self._queues[user_id]
+            head = queue[0]
+            if self._deficit[user_id] >= head.cost:
+                self._deficit[user_id] -= head.cost
+                queue.popleft()
+                self._queued -= 1
+                if not queue:
+                    self._drop_user(user_id)
+                return head
+            self._deficit[user_id] += self.quantum
+            self._active.rotate(-1)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        """Drop a timed-out waiter from its user's queue (lock held)."""
+        queue = self._queues.get(waiter.user_id)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        self._queued -= 1
+        if not queue:
+            self._drop_user(waiter.user_id)
+
+    def _drop_user(self, user_id: str) -> None:
+        del self._queues[user_id]
+        del self._deficit[user_id]
+        self._active.remove(user_id)
+
+
+chat_admission = AdmissionController(
+    max_concurrent=CHAT_MAX_CONCURRENCY,
+    max_queue=CHAT_MAX_QUEUE,
+    user_rate_per_minute=CHAT_USER_RATE_PER_MINUTE,
+    user_burst=CHAT_USER_BURST,
+    max_wait_seconds=CHAT_MAX_QUEUE_WAIT_SECONDS,
+)
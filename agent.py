@@ -1,5 +1,7 @@
 """Orchestrator agent factory."""
 
+from functools import partial
+
 from langchain.agents import create_agent
 from langchain.agents.middleware import ContextEditingMiddleware, ClearToolUsesEdit
 from langgraph.checkpoint.memory import MemorySaver
@@ -7,22 +9,38 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
 from tools import ALL_TOOLS
+from tools.specialist_utils import open_connection
 from agent_config import AgentConfig
+from agent_middleware import (
+    CircuitBreakerMiddleware,
+    DeadlineMiddleware,
+    ModelTieringMiddleware,
+    PromptCacheMiddleware,
+)
+from core.config import FALLBACK_MODEL_NAME, LLM_TIMEOUT_SECONDS
 from core.models import Chat  # noqa: F401 — re-exported for backwards compat
 from prompts import ORCHESTRATOR_PROMPT
+from services.model_router import get_model_router
+from services.prompt_cache import get_prompt_cache
 
 load_dotenv()
 
 
-def create_zionx_agent(config: AgentConfig | None = None):
-    """orchestrator agent"""
+def create_zionx_agent(config: AgentConfig | None = None, warm: bool = False):
+    """orchestrator agent
+
+    With warm=True the model's HTTP connection is opened before returning.
+    """
     if config is None:
         config = AgentConfig.from_env()
 
-    model = ChatGoogleGenerativeAI(
-        model=config.model_name,
+    model_factory = partial(ChatGoogleGenerativeAI, timeout=LLM_TIMEOUT_SECONDS)
+    model = model_factory(
+        model=config.model_for("orchestrator"),
         temperature=config.temperature,
     )
+    if warm:
+        open_connection(model)
 
     middleware = [
         ContextEditingMiddleware(
@@ -32,8 +50,18 @@ def create_zionx_agent(config: AgentConfig | None = None):
                     keep=config.context_editing_keep_calls,
                 )
             ],
-        )
+        ),
+        # Before prompt caching, so the cache is keyed on the model actually used.
+        ModelTieringMiddleware(get_model_router(), config, model_factory),
+        # Inside tiering (breakers are per model actually used) and outside
+        # prompt caching (a cached-call retry is part of one model call).
+        CircuitBreakerMiddleware(config, FALLBACK_MODEL_NAME, model_factory),
     ]
+    prompt_cache = get_prompt_cache()
+    if prompt_cache is not None:
+        middleware.append(PromptCacheMiddleware(prompt_cache))
+    # Innermost, so each model attempt gets a timeout from the budget left at that point.
+    middleware.append(DeadlineMiddleware(LLM_TIMEOUT_SECONDS))
 
     return create_agent(
         model=model,
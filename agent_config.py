@@ -1,12 +1,13 @@
 """Configuration for ZionX agent orchestration.
 
 LLM model and temperature come from core.config (single source of truth).
-Only the context-editing middleware parameters live here.
+This module adds per-role model selection, the load thresholds for
+downgrading to the fast tier, and the context-editing middleware parameters.
 """
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from core.config import MODEL_NAME, TEMPERATURE
+from core.config import FAST_MODEL_NAME, MODEL_NAME, SPECIALIST_MODEL, TEMPERATURE
 
 
 @dataclass
@@ -16,15 +17,51 @@ class AgentConfig:
     model_name: str = MODEL_NAME
     temperature: float = TEMPERATURE
 
+    # Per-role models. Roles are 'orchestrator', every specialist type
+    # ('emergency', 'pregnancy', ...), 'doc_extractor' and 'translator'.
+    # Roles without an entry use model_name (orchestrator) or
+    # specialist_model (everything else). Env: SPECIALIST_MODEL_<ROLE>.
+    specialist_model: str = SPECIALIST_MODEL
+    role_models: dict[str, str] = field(default_factory=dict)
+
+    # Automatic downgrade to fast_model_name when more than
+    # downgrade_queue_depth chats are waiting or in flight, or when the
+    # recent p95 chat latency exceeds latency_target_p95_ms (0 disables
+    # either trigger). Pinned roles always keep their configured model.
+    fast_model_name: str | None = FAST_MODEL_NAME
+    downgrade_queue_depth: int = 0
+    latency_target_p95_ms: float = 0.0
+    pinned_roles: tuple[str, ...] = ("emergency",)
+
     # Context-editing middleware
     context_editing_trigger_tokens: int = 50_000
     context_editing_keep_calls: int = 4
 
+    def model_for(self, role: str) -> str:
+        """Configured (non-downgraded) model for a role."""
+        if role in self.role_models:
+            return self.role_models[role]
+        return self.model_name if role == "orchestrator" else self.specialist_model
+
     @classmethod
     def from_env(cls) -> "AgentConfig":
+        prefix = "SPECIALIST_MODEL_"
+        role_models = {
+            key[len(prefix):].lower(): value
+            for key, value in os.environ.items()
+            if key.startswith(prefix) and value
+        }
         return cls(
             model_name=MODEL_NAME,
             temperature=TEMPERATURE,
+            specialist_model=SPECIALIST_MODEL,
+            role_models=role_models,
+            fast_model_name=FAST_MODEL_NAME,
+            downgrade_queue_depth=int(os.getenv("DOWNGRADE_QUEUE_DEPTH", 0)),
+            latency_target_p95_ms=float(os.getenv("LATENCY_TARGET_P95_MS", 0)),
+            pinned_roles=tuple(
+                r.strip() for r in os.getenv("PINNED_MODEL_ROLES", "emergency").split(",") if r.strip()
+            ),
             context_editing_trigger_tokens=int(
                 os.getenv("CONTEXT_EDITING_TRIGGER_TOKENS", 50_000)
             ),
@@ -0,0 +1,157 @@
+"""Custom middleware for the orchestrator agent loop."""
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.structured_output import AutoStrategy, ProviderStrategy, ToolStrategy
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.utils.function_calling import convert_to_openai_function
+
+from agent_config import AgentConfig
+from core import deadline
+from core.deadline import DeadlineExceeded
+from services.circuit_breaker import get_breaker
+from services.model_router import ModelRouter
+from services.prompt_cache import PromptCache
+
+
+class DeadlineMiddleware(AgentMiddleware):
+    """Stop the agent loop once the request deadline has passed.
+
+    Checked before every model call and every tool call, so an abandoned
+    request does not start another round trip. Each model call is sent with
+    a timeout of the time left (at most `max_call_seconds`), so a call in
+    flight when the deadline passes is cut off rather than left running.
+    Register it last: it then sees every attempt the other middleware make
+    (fallback model, uncached retry) with the budget left at that point.
+    """
+
+    def __init__(self, max_call_seconds: float | None = None):
+        super().__init__()
+        self.max_call_seconds = max_call_seconds
+
+    def wrap_model_call(self, request, handler):
+        step = "orchestrator model call"
+        timeout = deadline.call_timeout(step, self.max_call_seconds)
+        if timeout is not None:
+            request = request.override(model_settings={**request.model_settings, "timeout": timeout})
+        with deadline.expiring(step):
+            return handler(request)
+
+    def wrap_tool_call(self, request, handler):
+        deadline.check(f"tool call {request.tool_call['name']}")
+        return handler(request)
+
+
+class ModelTieringMiddleware(AgentMiddleware):
+    """Switch the orchestrator to the fast model tier while the service is overloaded.
+
+    `model_factory` builds the alternate chat model (ChatGoogleGenerativeAI in
+    production); one instance per model name is reused across calls.
+    """
+
+    def __init__(self, router: ModelRouter, config: AgentConfig, model_factory):
+        super().__init__()
+        self.router = router
+        self.config = config
+        self.model_factory = model_factory
+        self._models: dict[str, object] = {}
+
+    def wrap_model_call(self, request, handler):
+        model_name = self.router.select("orchestrator", self.config)
+        if model_name == self.config.model_for("orchestrator"):
+            return handler(request)
+        if model_name not in self._models:
+            self._models[model_name] = self.model_factory(model=model_name, temperature=self.config.temperature)
+        return handler(request.override(model=self._models[model_name]))
+
+
+class CircuitBreakerMiddleware(AgentMiddleware):
+    """Call the orchestrator model through a circuit breaker, with a fallback model.
+
+    Model calls fail fast while the model's breaker is open. When the
+    primary model fails or is open and `fallback_model_name` is set, the call
+    is retried once on the fallback model (which has its own breaker). Tool
+    calls are not affected: specialists have their own breakers.
+    """
+
+    def __init__(self, config: AgentConfig, fallback_model_name: str | None, model_factory):
+        super().__init__()
+        self.config = config
+        self.fallback_model_name = fallback_model_name
+        self.model_factory = model_factory
+        self._fallback = None
+
+    def wrap_model_call(self, request, handler):
+        model_name = getattr(request.model, "model", None) or self.config.model_for("orchestrator")
+        try:
+            return get_breaker(f"orchestrator:{model_name}").call(handler, request)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if not self.fallback_model_name or model_name == self.fallback_model_name:
+                raise
+            print(f"Orchestrator model {model_name} unavailable, using {self.fallback_model_name}: {e}")
+        if self._fallback is None:
+            self._fallback = self.model_factory(model=self.fallback_model_name, temperature=self.config.temperature)
+        return get_breaker(f"orchestrator:{self.fallback_model_name}").call(
+            handler, request.override(model=self._fallback)
+        )
+
+
+class PromptCacheMiddleware(AgentMiddleware):
+    """Reference the orchestrator prompt and tool schemas from a provider cache.
+
+    The provider rejects a system instruction or tool list alongside cached
+    content, so cached calls drop both and move any per-request system
+    context (memory, profile, tracking) into a user turn. A rejected cached
+    call is retried once with the original request.
+
+    Structured output must not add a tool either: cached calls ask for the
+    response schema natively (ProviderStrategy) instead of through a tool
+    call, and a request that insists on a tool call (ToolStrategy) is sent
+    uncached.
+    """
+
+    def __init__(self, prompt_cache: PromptCache):
+        super().__init__()
+        self.prompt_cache = prompt_cache
+        self._tool_schemas: dict[tuple, list[dict]] = {}
+
+    def _schemas(self, tools) -> list[dict]:
+        key = tuple(getattr(t, "name", repr(t)) for t in tools)
+        if key not in self._tool_schemas:
+            self._tool_schemas[key] = [convert_to_openai_function(t) for t in tools]
+        return self._tool_schemas[key]
+
+    def wrap_model_call(self, request, handler):
+        model_name = getattr(request.model, "model", None)
+        if not model_name or not request.system_prompt or isinstance(request.response_format, ToolStrategy):
+            return handler(request)
+        response_format = request.response_format
+        if isinstance(response_format, AutoStrategy):
+            # Auto may resolve to a structured-output tool, which the provider rejects here.
+            response_format = ProviderStrategy(response_format.schema)
+
+        schemas = self._schemas(request.tools)
+        cache_name = self.prompt_cache.get(model_name, request.system_prompt, schemas)
+        if not cache_name:
+            return handler(request)
+
+        messages = [
+            HumanMessage(content=m.content) if isinstance(m, SystemMessage) else m
+            for m in request.messages
+        ]
+        cached = request.override(
+            system_prompt=None,
+            tools=[],
+            messages=messages,
+            response_format=response_format,
+            model_settings={**request.model_settings, "cached_content": cache_name},
+        )
+        try:
+            return handler(cached)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Cached orchestrator call failed, retrying uncached: {e}")
+            self.prompt_cache.invalidate(model_name, request.system_prompt, schemas)
+            return handler(request)
@@ -1,10 +1,29 @@
-"""Emergency alert history tracking system."""
+"""Emergency alert history tracking system.
+
+Each save or update also updates a per-user daily rollup (core.rollup),
+which get_alerts_summary reads instead of the full history.
+"""
 
-import json
 from pathlib import Path
 from datetime import datetime
 
+from core.codec import read_json, write_json
+from core.ids import new_id
+from core.json_cache import load_json_cached
+from core.pagination import DEFAULT_PAGE_LIMIT, paginate
+from core.rollup import (
+    bucket,
+    buckets_in_window,
+    increment,
+    load_rollup,
+    push_recent,
+    recent_in_window,
+    save_rollup,
+)
+from core.versions import file_version
+
 ALERTS_DIR = "emergency_alerts_history"
+RECENT_ALERTS = 10
 
 
 def _ensure_alerts_dir():
@@ -12,7 +31,16 @@ def _ensure_alerts_dir():
     Path(ALERTS_DIR).mkdir(exist_ok=True)
 
 
-def save_alert_record(user_id: str, alert_data: dict, success: bool, message: str) -> dict:
+def save_alert_record(
+    user_id: str,
+    alert_data: dict,
+    success: bool,
+    message: str,
+    job_id: int | None = None,
+    alert_key: str | None = None,
+    kind: str = "alert",
+    suppressed_count: int = 0,
+) -> dict:
     """Record an emergency alert attempt.
     
     Args:
@@ -20,18 +48,25 @@ def save_alert_record(user_id: str, alert_data: dict, success: bool, message: st
         alert_data: Dict with alert details (severity, symptoms, etc.)
         success: Whether the alert was sent successfully
         message: Result message
+        job_id: Background job that dispatched the alert, if any
+        alert_key: Idempotency key of that job (unique, unlike job IDs,
+            which restart when the job database is recreated)
+        kind: 'alert', or 'digest' for a summary of suppressed alerts
+        suppressed_count: Repeat alerts coalesced into this one
     
     Returns:
         dict with saved alert record
     """
     _ensure_alerts_dir()
+    path = Path(ALERTS_DIR) / f"{user_id}.json"
+    rollup = _load_rollup(path)
     
     # Load existing alerts
     alerts = load_alert_history(user_id)
     
     # Create new alert record
     alert_record = {
-        "alert_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "alert_id": new_id(),
         "timestamp": datetime.now().isoformat(),
         "date": datetime.now().strftime("%Y-%m-%d"),
         "severity": alert_data.get("severity"),
@@ -39,20 +74,123 @@ def save_alert_record(user_id: str, alert_data: dict, success: bool, message: st
         "ai_assessment": alert_data.get("ai_assessment", ""),
         "user_location": alert_data.get("user_location", "Not provided"),
         "success": success,
-        "message": message
+        "status": "sent" if success else "failed",
+        "message": message,
+        "job_id": job_id,
+        "alert_key": alert_key,
+        "kind": kind,
+        "suppressed_count": suppressed_count,
     }
     
     alerts.append(alert_record)
     
     # Save to file
-    path = Path(ALERTS_DIR) / f"{user_id}.json"
     try:
-        with path.open("w") as f:
-            json.dump(alerts, f, indent=2)
-        return alert_record
+        write_json(path, alerts)
     except Exception as e:
         print(f"Error saving alert record for {user_id}: {e}")
         return {}
+    
+    # A failed rollup update is repaired by a rebuild on the next read
+    if rollup is not None:
+        try:
+            _add_to_rollup(rollup, alert_record)
+            save_rollup(path, rollup)
+        except Exception as e:
+            print(f"Error updating alert rollup for {user_id}: {e}")
+    return alert_record
+
+
+def _count_in_rollup(rollup: dict, alert: dict, sign: int = 1) -> None:
+    """Add (sign=1) or take back (sign=-1) an alert's contribution to its day's counters."""
+    counters = bucket(rollup, alert.get("date") or alert["timestamp"][:10])
+    increment(counters, "total", sign)
+    increment(counters, "successful" if alert.get("success") else "failed", sign)
+    # Digests report a subset of their alert's count, so only alerts are summed.
+    if alert.get("kind", "alert") == "alert":
+        increment(counters, "suppressed", sign * alert.get("suppressed_count", 0))
+
+
+def _add_to_rollup(rollup: dict, alert: dict) -> None:
+    _count_in_rollup(rollup, alert)
+    push_recent(rollup, "recent", alert, RECENT_ALERTS)
+
+
+def _update_in_rollup(rollup: dict, old: dict, new: dict) -> None:
+    """Replace an updated alert's contribution: counters by delta, and its entry in the ring."""
+    _count_in_rollup(rollup, old, -1)
+    _count_in_rollup(rollup, new)
+    recent = rollup.get("recent", [])
+    for index, record in enumerate(recent):
+        if record.get("alert_id") == new.get("alert_id"):
+            recent[index] = new
+
+
+def _build_rollup(alerts: list) -> dict:
+    rollup = {}
+    for alert in alerts:
+        _add_to_rollup(rollup, alert)
+    return rollup
+
+
+def _load_rollup(path: Path, shared: bool = False) -> dict | None:
+    try:
+        return load_rollup(path, _build_rollup, shared=shared)
+    except Exception as e:
+        print(f"Error loading alert rollup from {path}: {e}")
+        return None
+
+
+def update_alert_record(user_id: str, alert_key: str, **fields) -> bool:
+    """Update fields of the alert record with this alert_key; returns whether it was found."""
+    path = Path(ALERTS_DIR) / f"{user_id}.json"
+    rollup = _load_rollup(path)
+    
+    alerts = load_alert_history(user_id)
+    for record in alerts:
+        if record.get("alert_key") == alert_key:
+            old = dict(record)
+            record.update(fields)
+            break
+    else:
+        return False
+    
+    try:
+        write_json(path, alerts)
+    except Exception as e:
+        print(f"Error updating alert record for {user_id}: {e}")
+        return False
+    
+    # A failed rollup update is repaired by a rebuild on the next read
+    if rollup is not None:
+        try:
+            _update_in_rollup(rollup, old, record)
+            save_rollup(path, rollup)
+        except Exception as e:
+            print(f"Error updating alert rollup for {user_id}: {e}")
+    return True
+
+
+def pending_alert_record(job: dict) -> dict:
+    """Shape a not-yet-finished alert job like a stored alert record."""
+    alert_data = job["payload"]["alert_data"]
+    created = datetime.fromtimestamp(job["created_at"])
+    return {
+        "alert_id": None,
+        "timestamp": created.isoformat(),
+        "date": created.strftime("%Y-%m-%d"),
+        "severity": alert_data.get("severity"),
+        "symptoms": alert_data.get("symptoms", ""),
+        "ai_assessment": alert_data.get("ai_assessment", ""),
+        "user_location": alert_data.get("user_location", "Not provided"),
+        "success": None,
+        "status": "pending",
+        "message": "Alert is being sent to your emergency contacts",
+        "job_id": job["id"],
+        "alert_key": job["payload"].get("alert_key"),
+        "kind": "alert",
+        "suppressed_count": 0,
+    }
 
 
 def load_alert_history(user_id: str, days: int = None) -> list:
@@ -69,11 +207,7 @@ def load_alert_history(user_id: str, days: int = None) -> list:
     path = Path(ALERTS_DIR) / f"{user_id}.json"
     
     try:
-        if not path.exists():
-            return []
-        
-        with path.open() as f:
-            alerts = json.load(f)
+        alerts = read_json(path, default=[])
         
         # Filter by days if specified
         if days:
@@ -89,38 +223,58 @@ def load_alert_history(user_id: str, days: int = None) -> list:
         return []
 
 
+def alert_version(user_id: str) -> str:
+    """Version token of a user's alert history; changes on every save."""
+    return file_version(Path(ALERTS_DIR) / f"{user_id}.json")
+
+
+def load_alert_page(
+    user_id: str, limit: int = DEFAULT_PAGE_LIMIT, cursor: str | None = None, days: int = None
+) -> tuple[list, str | None]:
+    """Load one page of alert history, newest page first.
+    
+    Returns:
+        (alerts in chronological order, cursor for the next older page or None)
+    """
+    try:
+        records = load_json_cached(Path(ALERTS_DIR) / f"{user_id}.json", default=[])
+    except Exception as e:
+        print(f"Error loading alert history for {user_id}: {e}")
+        records = []
+    return paginate(records, "alert_id", limit, cursor, days)
+
+
 def get_alerts_summary(user_id: str, days: int = 30) -> dict:
     """Get a summary of emergency alerts for display.
     
+    Answered from the daily rollup, so `days` covers whole calendar days.
+    
     Returns:
         Dict with alert statistics
     """
-    alerts = load_alert_history(user_id, days=days)
+    rollup = _load_rollup(Path(ALERTS_DIR) / f"{user_id}.json", shared=True) or {}
+    buckets = buckets_in_window(rollup, days)
+    total = sum(b.get("total", 0) for b in buckets)
     
-    if not alerts:
+    if not total:
         return {
             "total_alerts": 0,
             "successful_alerts": 0,
             "failed_alerts": 0,
+            "suppressed_alerts": 0,
             "latest_alert": None,
             "recent_alerts": []
         }
     
-    successful = [a for a in alerts if a.get("success")]
-    failed = [a for a in alerts if not a.get("success")]
-    
-    # Get recent alerts
-    recent_alerts = sorted(
-        alerts,
-        key=lambda x: x["timestamp"],
-        reverse=True
-    )[:10]  # Last 10 alerts
+    # Most recent first
+    recent_alerts = recent_in_window(rollup, "recent", days)[::-1]
     
     return {
-        "total_alerts": len(alerts),
-        "successful_alerts": len(successful),
-        "failed_alerts": len(failed),
-        "latest_alert": alerts[-1] if alerts else None,
+        "total_alerts": total,
+        "successful_alerts": sum(b.get("successful", 0) for b in buckets),
+        "failed_alerts": sum(b.get("failed", 0) for b in buckets),
+        "suppressed_alerts": sum(b.get("suppressed", 0) for b in buckets),
+        "latest_alert": recent_alerts[0] if recent_alerts else None,
         "recent_alerts": recent_alerts,
         "days_monitored": days
     }
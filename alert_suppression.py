@@ -0,0 +1,173 @@
+"""Per-user deduplication window for emergency alerts.
+
+The first alert in a crisis goes out immediately and opens a suppression
+window. Within the window, further critical turns are not re-sent to every
+contact: they are counted, and a digest summarising them is sent at most
+every `digest_interval`. A turn whose severity is higher than the last
+alert sent escalates: it is sent at once and restarts the window.
+
+State lives in an in-memory index, loaded lazily per user and written back
+to `alert_suppression/<user_id>.json` on every change, so a restart does
+not re-alert everyone for an ongoing crisis.
+"""
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+
+from core.codec import read_json, write_json
+from core.config import ALERT_DIGEST_INTERVAL_MINUTES, ALERT_SUPPRESSION_WINDOW_MINUTES
+
+SUPPRESSION_DIR = "alert_suppression"
+
+SEND = "send"
+ESCALATE = "escalate"
+SUPPRESS = "suppress"
+
+RISK_RANK = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+URGENCY_RANK = {"monitor": 1, "schedule_visit": 2, "seek_urgent_care": 3, "call_emergency": 4}
+
+
+def severity_rank(risk_level: str | None, urgency: str | None) -> int:
+    """Order alerts by severity: risk level and urgency both count."""
+    return RISK_RANK.get(risk_level or "", 0) + URGENCY_RANK.get(urgency or "", 0)
+
+
+@dataclass
+class SuppressionState:
+    """One user's alert window."""
+
+    window_started_at: float = 0.0
+    last_rank: int = 0
+    last_alert_key: str | None = None  # alert_key of the job sending the window's alert
+    suppressed_in_window: int = 0
+    suppressed_since_notice: int = 0
+    last_notice_at: float = 0.0
+    digest_scheduled: bool = False
+    latest_alert_data: dict = field(default_factory=dict)
+
+
+@dataclass
+class Decision:
+    """What to do with an alert, and what a suppressed alert should report."""
+
+    action: str
+    window_started_at: float
+    suppressed_in_window: int
+    last_alert_key: str | None
+    schedule_digest_in: float | None = None
+
+
+class AlertSuppressor:
+    """Decides per user whether an alert is sent, escalated or suppressed."""
+
+    def __init__(self, state_dir: str, window_seconds: float, digest_interval_seconds: float):
+        self.state_dir = state_dir
+        self.window_seconds = window_seconds
+        self.digest_interval_seconds = digest_interval_seconds
+        self._states: dict[str, SuppressionState] = {}
+        self._lock = threading.Lock()
+
+    # ── Persistence ──
+
+    def _path(self, user_id: str) -> Path:
+        return Path(self.state_dir) / f"{user_id}.json"
+
+    def _state(self, user_id: str) -> SuppressionState:
+        """In-memory state for a user, loaded from disk on first use (lock held)."""
+        state = self._states.get(user_id)
+        if state is None:
+            state = SuppressionState()
+            path = self._path(user_id)
+            try:
+                if path.exists():
+                    # Ignores fields this version no longer has.
+                    known = {f.name for f in fields(SuppressionState)}
+                    state = SuppressionState(**{k: v for k, v in read_json(path).items() if k in known})
+            except Exception as e:
+                print(f"Error loading alert suppression state for {user_id}: {e}")
+            self._states[user_id] = state
+        return state
+
+    def _save(self, user_id: str, state: SuppressionState) -> None:
+        try:
+            Path(self.state_dir).mkdir(exist_ok=True)
+            write_json(self._path(user_id), asdict(state))
+        except Exception as e:
+            print(f"Error saving alert suppression state for {user_id}: {e}")
+
+    # ── Decisions ──
+
+    def decide(self, user_id: str, risk_level: str | None, urgency: str | None, alert_data: dict) -> Decision:
+        """Classify a triggered alert and update the user's window."""
+        now = time.time()
+        rank = severity_rank(risk_level, urgency)
+        with self._lock:
+            state = self._state(user_id)
+            in_window = self.window_seconds > 0 and now - state.window_started_at < self.window_seconds
+            if in_window and rank <= state.last_rank:
+                state.suppressed_in_window += 1
+                state.suppressed_since_notice += 1
+                state.latest_alert_data = alert_data
+                schedule_in = None
+                if not state.digest_scheduled:
+                    state.digest_scheduled = True
+                    schedule_in = max(0.0, state.last_notice_at + self.digest_interval_seconds - now)
+                decision = Decision(
+                    SUPPRESS, state.window_started_at, state.suppressed_in_window, state.last_alert_key, schedule_in
+                )
+            else:
+                action = ESCALATE if in_window else SEND
+                # An escalation supersedes the suppressed turns before it:
+                # contacts get the more severe alert instead of a digest.
+                state = SuppressionState(window_started_at=now, last_rank=rank, last_notice_at=now)
+                self._states[user_id] = state
+                decision = Decision(action, now, 0, None)
+            self._save(user_id, state)
+            return decision
+
+    def attach_job(self, user_id: str, window_started_at: float, alert_key: str) -> None:
+        """Remember the alert_key of the job that sends the alert opening the current window."""
+        with self._lock:
+            state = self._state(user_id)
+            if state.window_started_at == window_started_at:
+                state.last_alert_key = alert_key
+                self._save(user_id, state)
+
+    def release(self, user_id: str, window_started_at: float) -> None:
+        """Close a window whose alert could not be queued, so the next alert is sent."""
+        with self._lock:
+            state = self._state(user_id)
+            if state.window_started_at == window_started_at:
+                state = self._states[user_id] = SuppressionState()
+                self._save(user_id, state)
+
+    def pending_digest(self, user_id: str) -> dict | None:
+        """Suppressed alerts not yet reported: count, window start and latest alert data."""
+        with self._lock:
+            state = self._state(user_id)
+            if not state.suppressed_since_notice:
+                state.digest_scheduled = False
+                self._save(user_id, state)
+                return None
+            return {
+                "count": state.suppressed_since_notice,
+                "window_started_at": state.window_started_at,
+                "alert_data": dict(state.latest_alert_data),
+            }
+
+    def digest_sent(self, user_id: str, count: int) -> None:
+        """Mark `count` suppressed alerts as reported."""
+        with self._lock:
+            state = self._state(user_id)
+            state.suppressed_since_notice = max(0, state.suppressed_since_notice - count)
+            state.last_notice_at = time.time()
+            state.digest_scheduled = False
+            self._save(user_id, state)
+
+
+alert_suppressor = AlertSuppressor(
+    SUPPRESSION_DIR,
+    window_seconds=ALERT_SUPPRESSION_WINDOW_MINUTES * 60,
+    digest_interval_seconds=ALERT_DIGEST_INTERVAL_MINUTES * 60,
+)
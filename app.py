@@ -1,35 +1,125 @@
-from flask import Flask, request, send_file
+from flask import Flask, Response, g, request, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-from spitch import Spitch
 from dotenv import load_dotenv
 import os
 import io
+import threading
+from datetime import datetime
 from functools import wraps
 
 # Load environment variables from .env file
 load_dotenv()
 
-from core.config import MODEL_NAME
-from main import run, get_chat_history
-from memory import load_facts, get_all_users, delete_thread_memory, save_fact
-from document_extractor import extract_document_content
-from services.ai_service import extract_health_facts_with_ai, translate_to_english
-from users import register_user, login_user, logout_user, verify_session, get_user_info, update_user_profile
-from daily_tracking import save_daily_tracking, load_tracking_history, get_tracking_summary
-from risk_monitor import load_risk_history, get_risk_summary
-from alert_history import load_alert_history, get_alerts_summary
+from core import deadline
+from core.config import (
+    CHAT_TIMEOUT_SECONDS,
+    MODEL_NAME,
+    REQUEST_TIMEOUT_MAX_SECONDS,
+    SPEECH_TIMEOUT_SECONDS,
+    UPLOAD_TIMEOUT_SECONDS,
+    WARMUP_ON_STARTUP,
+    WARMUP_PRIME_REQUEST,
+)
+from core.deadline import DeadlineExceeded
+from core.versions import thread_versions
+from http_cache import CodecJSONProvider, conditional, gzip_stream, init_compression
+from main import run, get_chat_history, get_pending_alerts, pending_alerts_version, warm_up, is_ready
+from job_queue import job_queue
+from admission import AdmissionRejected, chat_admission
+from services.circuit_breaker import CircuitOpenError, breaker_stats, get_breaker
+from services.model_router import get_model_router
+from memory import load_facts, get_all_users, delete_thread_memory
+from services.ai_service import translate_to_english
+from users import register_user, login_user, logout_user, verify_session, get_user_info, update_user_profile, users_version
+from daily_tracking import (
+    MAX_BATCH_ENTRIES,
+    get_tracking_summary,
+    load_tracking_page,
+    parse_batch_entry,
+    save_daily_tracking,
+    save_tracking_batch,
+    tracking_version,
+)
+from tracking_trends import get_tracking_trends
+from risk_monitor import load_risk_page, get_risk_summary, risk_version
+from alert_history import load_alert_page, get_alerts_summary, alert_version
+from core.pagination import InvalidCursor, parse_limit
+from export import decode_export_cursor, export_stream
 from thread_manager import save_thread_metadata, get_recent_threads, increment_thread_message_count
+from upload_jobs import enqueue_upload, get_upload_status, upload_queue
 
 app = Flask(__name__)
+app.json = CodecJSONProvider(app)
 CORS(app)
+init_compression(app)
+
+# Requests waiting for a /chat slot count toward the model router's load signal.
+get_model_router().set_queue_depth_source(chat_admission.queue_depth)
+
+if WARMUP_ON_STARTUP:
+    threading.Thread(
+        target=warm_up, kwargs={"prime": WARMUP_PRIME_REQUEST}, name="zionx-warmup", daemon=True
+    ).start()
+
+# Default deadline per endpoint (view name); X-Request-Timeout overrides it.
+# Endpoints not listed only get a deadline when the client sends the header.
+ENDPOINT_TIMEOUTS = {
+    "chat": CHAT_TIMEOUT_SECONDS,
+    "upload_document": UPLOAD_TIMEOUT_SECONDS,
+    "transcribe_audio": SPEECH_TIMEOUT_SECONDS,
+    "generate_speech": SPEECH_TIMEOUT_SECONDS,
+}
+
+
+@app.before_request
+def start_background_workers():
+    """Start the job workers on the first request (idempotent), not at import.
+
+    This also resumes jobs left over from a previous run (chat side effects,
+    alerts, uploads). Importing the app therefore creates no database files.
+    """
+    job_queue.start()
+    upload_queue.start()
+
+
+@app.before_request
+def start_request_deadline():
+    seconds = deadline.parse_timeout(
+        request.headers.get("X-Request-Timeout"),
+        ENDPOINT_TIMEOUTS.get(request.endpoint),
+        REQUEST_TIMEOUT_MAX_SECONDS,
+    )
+    if seconds is not None:
+        g.deadline_token = deadline.start(seconds)
+
+
+@app.teardown_request
+def end_request_deadline(exc):
+    token = g.pop("deadline_token", None)
+    if token is not None:
+        deadline.reset(token)
+
 
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'docx', 'md'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-spitch_client = Spitch() if os.getenv("SPITCH_API_KEY") else None
+spitch_client = None
+
+
+def get_spitch_client():
+    """Return the Spitch client, importing the SDK on first use.
+
+    Returns None when SPITCH_API_KEY is not configured.
+    """
+    global spitch_client
+    if spitch_client is None and os.getenv("SPITCH_API_KEY"):
+        from spitch import Spitch
+
+        spitch_client = Spitch()
+    return spitch_client
 
 # Supported Nigerian languages
 SUPPORTED_LANGUAGES = {
@@ -63,11 +153,19 @@ def require_auth(f):
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "model": MODEL_NAME}
+    if WARMUP_ON_STARTUP and not is_ready():
+        return {"status": "warming_up", "ready": False, "model": MODEL_NAME}, 503
+    return {"status": "ok", "ready": True, "model": MODEL_NAME}
 
 
 # ── Authentication Endpoints ──
 
+@app.get("/health/dependencies")
+def health_dependencies():
+    """Circuit breaker state for each external dependency, and background job counts."""
+    return {"ok": True, "circuit_breakers": breaker_stats(), "job_queue": job_queue.stats()}
+
+
 @app.post("/auth/register")
 def register():
     """Register a new user."""
@@ -167,6 +265,7 @@ def update_onboarding_profile(user):
 
 @app.get("/onboarding/profile")
 @require_auth
+@conditional(lambda user: (user["username"], users_version()))
 def get_onboarding_profile(user):
     """Get user's onboarding profile."""
     user_info = get_user_info(user["username"])
@@ -197,13 +296,72 @@ def submit_daily_tracking(user):
     return {"error": "Failed to save tracking data"}, 500
 
 
+@app.post("/tracking/batch")
+@require_auth
+def submit_tracking_batch(user):
+    """Submit queued tracking entries (offline sync) in one request.
+    
+    Body: {"entries": [{"client_entry_id", "timestamp", "mood", ...}, ...]}.
+    Valid entries are saved in one write; invalid ones are reported in
+    `rejected` and resubmitted ones in `duplicates`.
+    """
+    body = request.get_json(silent=True) or {}
+    raw_entries = body.get("entries")
+    if not isinstance(raw_entries, list) or not raw_entries:
+        return {"error": "entries must be a non-empty list"}, 400
+    if len(raw_entries) > MAX_BATCH_ENTRIES:
+        return {"error": f"At most {MAX_BATCH_ENTRIES} entries per batch"}, 400
+
+    entries, rejected = [], []
+    for index, raw in enumerate(raw_entries):
+        try:
+            entries.append(parse_batch_entry(raw))
+        except ValueError as exc:
+            client_entry_id = raw.get("client_entry_id") if isinstance(raw, dict) else None
+            rejected.append({"index": index, "client_entry_id": client_entry_id, "error": str(exc)})
+
+    try:
+        result = save_tracking_batch(user["user_id"], entries)
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error saving tracking batch for {user['user_id']}: {exc}")
+        return {"error": "Failed to save tracking data"}, 500
+
+    return {
+        "ok": True,
+        "saved": len(result["saved"]),
+        "entries": result["saved"],
+        "duplicates": result["duplicates"],
+        "rejected": rejected,
+    }
+
+
+def window_version() -> str | None:
+    """The current hour when a `days` window is requested (records age out of it)."""
+    return datetime.now().strftime("%Y-%m-%dT%H") if request.args.get("days") else None
+
+
+def page_args() -> tuple[int, str | None, int | None]:
+    """limit, cursor and days query parameters of a history endpoint."""
+    return (
+        parse_limit(request.args.get("limit", type=int)),
+        request.args.get("cursor") or None,
+        request.args.get("days", type=int),
+    )
+
+
+@app.errorhandler(InvalidCursor)
+def invalid_cursor(exc):
+    return {"error": str(exc)}, 400
+
+
 @app.get("/tracking/history")
 @require_auth
+@conditional(lambda user: (user["user_id"], tracking_version(user["user_id"]), window_version()))
 def get_tracking_history(user):
-    """Get user's tracking history."""
-    days = request.args.get("days", type=int)
-    entries = load_tracking_history(user["user_id"], days=days)
-    return {"ok": True, "entries": entries, "count": len(entries)}
+    """Get a page of the user's tracking history (most recent first; pass next_cursor for older)."""
+    limit, cursor, days = page_args()
+    entries, next_cursor = load_tracking_page(user["user_id"], limit, cursor, days)
+    return {"ok": True, "entries": entries, "count": len(entries), "next_cursor": next_cursor}
 
 
 @app.get("/tracking/summary")
@@ -215,15 +373,27 @@ def get_tracking_summary_endpoint(user):
     return {"ok": True, "summary": summary}
 
 
+@app.get("/tracking/trends")
+@require_auth
+def get_tracking_trends_endpoint(user):
+    """Get mood/energy trends, change points and symptom frequencies."""
+    days = min(max(request.args.get("days", 30, type=int), 1), 365)
+    trends = get_tracking_trends(user["user_id"], days=days)
+    if not trends:
+        return {"error": "Failed to analyze tracking data"}, 500
+    return {"ok": True, "trends": trends}
+
+
 # ── Risk Monitor Endpoints ──
 
 @app.get("/risk/history")
 @require_auth
+@conditional(lambda user: (user["user_id"], risk_version(user["user_id"]), window_version()))
 def get_risk_history(user):
-    """Get user's risk assessment history."""
-    days = request.args.get("days", type=int)
-    assessments = load_risk_history(user["user_id"], days=days)
-    return {"ok": True, "assessments": assessments, "count": len(assessments)}
+    """Get a page of the user's risk assessment history (most recent first; pass next_cursor for older)."""
+    limit, cursor, days = page_args()
+    assessments, next_cursor = load_risk_page(user["user_id"], limit, cursor, days)
+    return {"ok": True, "assessments": assessments, "count": len(assessments), "next_cursor": next_cursor}
 
 
 @app.get("/risk/summary")
@@ -239,11 +409,24 @@ def get_risk_summary_endpoint(user):
 
 @app.get("/alerts/history")
 @require_auth
+@conditional(lambda user: (
+    user["user_id"], alert_version(user["user_id"]), window_version(), pending_alerts_version(user["user_id"])
+))
 def get_alerts_history(user):
-    """Get user's emergency alert history."""
-    days = request.args.get("days", type=int)
-    alerts = load_alert_history(user["user_id"], days=days)
-    return {"ok": True, "alerts": alerts, "count": len(alerts)}
+    """Get a page of the user's emergency alert history (most recent first; pass next_cursor for older).
+
+    The first page also lists alerts still being sent.
+    """
+    limit, cursor, days = page_args()
+    alerts, next_cursor = load_alert_page(user["user_id"], limit, cursor, days)
+    pending = [] if cursor else get_pending_alerts(user["user_id"])
+    return {
+        "ok": True,
+        "alerts": alerts + pending,
+        "count": len(alerts) + len(pending),
+        "pending_count": len(pending),
+        "next_cursor": next_cursor,
+    }
 
 
 @app.get("/alerts/summary")
@@ -255,6 +438,32 @@ def get_alerts_summary_endpoint(user):
     return {"ok": True, "summary": summary}
 
 
+# ── Export ──
+
+@app.get("/export")
+@require_auth
+def export_user_data(user):
+    """Stream the user's complete record as NDJSON.
+
+    Pass the last received line's cursor as ?cursor= to resume after it.
+    Gzipped on the fly when the client accepts gzip.
+    """
+    cursor = request.args.get("cursor") or None
+    if cursor:
+        decode_export_cursor(cursor)  # reject a bad cursor before streaming starts
+
+    body = export_stream(user, cursor)
+    headers = {
+        "Cache-Control": "no-store",
+        "Content-Disposition": f'attachment; filename="{secure_filename(user["user_id"]) or "user"}-export.ndjson"',
+        "Vary": "Accept-Encoding",
+    }
+    if request.accept_encodings["gzip"]:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, mimetype="application/x-ndjson", headers=headers)
+
+
 @app.post("/chat")
 def chat():
     body = request.get_json(silent=True) or {}
@@ -272,26 +481,38 @@ def chat():
         user_id = body.get("user_id", "guest")
     
     try:
-        # Check if this is a new thread (no existing metadata)
-        from thread_manager import get_thread_metadata
-        existing_thread = get_thread_metadata(user_id, thread_id)
-        
-        # Save thread metadata (creates new or updates existing)
-        if not existing_thread:
-            # New thread - use first message as title
-            save_thread_metadata(user_id, thread_id, message, message)
-        else:
-            # Existing thread - just increment count and update timestamp
-            increment_thread_message_count(user_id, thread_id)
-        
-        response = run(message, thread_id=thread_id, user_id=user_id)
+        with chat_admission.admit(user_id):
+            # Check if this is a new thread (no existing metadata)
+            from thread_manager import get_thread_metadata
+            existing_thread = get_thread_metadata(user_id, thread_id)
+
+            # Save thread metadata (creates new or updates existing)
+            if not existing_thread:
+                # New thread - use first message as title
+                save_thread_metadata(user_id, thread_id, message, message)
+            else:
+                # Existing thread - just increment count and update timestamp
+                increment_thread_message_count(user_id, thread_id)
+
+            response = run(message, thread_id=thread_id, user_id=user_id)
+    except AdmissionRejected as exc:
+        return {"error": exc.reason, "retry_after": exc.retry_after}, 429, {"Retry-After": str(exc.retry_after)}
+    except DeadlineExceeded as exc:
+        return {"error": str(exc)}, 504
     except Exception as exc:  # noqa: BLE001
         return {"error": str(exc)}, 500
 
     return response
 
 
+@app.get("/chat/admission")
+def get_chat_admission_metrics():
+    """Queue depth, in-flight count and wait-time metrics for /chat admission."""
+    return {"ok": True, "admission": chat_admission.metrics(), "model_router": get_model_router().stats()}
+
+
 @app.get("/chat/history")
+@conditional(lambda: thread_versions.version(request.args.get("thread_id", "default")))
 def get_history():
     """Get chat history for a specific thread."""
     thread_id = request.args.get("thread_id", "default")
@@ -332,7 +553,11 @@ def get_memory():
 
 @app.post("/upload")
 def upload_document():
-    """Upload a document and append its content to user's long-term memory."""
+    """Upload a document for background fact extraction into the user's long-term memory.
+
+    The file is stored and queued; the response is 202 with a job id to poll
+    at GET /upload/<job_id>.
+    """
     # Get authenticated user or use provided user_id or default to guest
     user = get_authenticated_user()
     if user:
@@ -354,27 +579,33 @@ def upload_document():
         return {"error": f"File type not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"}, 400
     
     try:
-        filename = secure_filename(file.filename)        
-        content = extract_document_content(file, filename)
-        
-        extracted_facts = ""
-        if extract_facts and content and not content.startswith("["):
-            extracted_facts = extract_health_facts_with_ai(content, filename)
-            if extracted_facts and "No significant health facts" not in extracted_facts:
-                save_fact(user_id, extracted_facts)
-        
+        filename = secure_filename(file.filename)
+        job_id = enqueue_upload(user_id, filename, file.read(), extract_facts=extract_facts)
+        status_url = f"/upload/{job_id}"
         return {
-            "ok": True, 
-            "message": f"Document '{filename}' uploaded and processed",
+            "ok": True,
+            "message": f"Document '{filename}' uploaded and queued for processing",
             "user_id": user_id,
-            "content_extracted": not content.startswith("["),
-            "facts_extracted": bool(extracted_facts and "No significant health facts" not in extracted_facts)
-        }
+            "job_id": job_id,
+            "status": "pending",
+            "status_url": status_url,
+        }, 202, {"Location": status_url}
     
     except Exception as exc:
         return {"error": str(exc)}, 500
 
 
+@app.get("/upload/<int:job_id>")
+def upload_status(job_id: int):
+    """Status, progress (0-1) and, once done, the result of an upload job."""
+    user = get_authenticated_user()
+    user_id = user["user_id"] if user else request.args.get("user_id", "guest")
+    status = get_upload_status(job_id, user_id)
+    if status is None:
+        return {"error": "Upload job not found"}, 404
+    return {"ok": True, **status}
+
+
 @app.get("/threads")
 def list_threads():
     """List all available chat threads/sessions for a specific user."""
@@ -407,7 +638,8 @@ def delete_memory():
 @app.post("/speech/transcribe")
 def transcribe_audio():
     """Convert speech to text using Spitch API, then translate to English."""
-    if not spitch_client:
+    client = get_spitch_client()
+    if not client:
         return {"error": "Speech service not configured"}, 503
     
     if 'audio' not in request.files:
@@ -423,10 +655,12 @@ def transcribe_audio():
         audio_content = audio_file.read()
         
         # Step 1: Transcribe audio in the original language
-        response = spitch_client.speech.transcribe(
+        response = get_breaker("spitch").call(
+            client.speech.transcribe,
             language=language,
             content=audio_content,
-            timestamp="sentence"
+            timestamp="sentence",
+            timeout=deadline.check("speech transcription"),
         )
         
         original_text = response.text
@@ -440,6 +674,10 @@ def transcribe_audio():
             "original_text": original_text if language != 'en' else None,
             "language": language
         }
+    except CircuitOpenError as exc:
+        return {"error": "Speech service temporarily unavailable", "retry_after": exc.retry_after}, 503, {"Retry-After": str(exc.retry_after)}
+    except DeadlineExceeded as exc:
+        return {"error": str(exc)}, 504
     except Exception as exc:
         return {"error": str(exc)}, 500
 
@@ -450,7 +688,8 @@ def generate_speech():
     Convert English text to speech in target language using Spitch API.
     Process: English text → translate to target language → generate speech
     """
-    if not spitch_client:
+    client = get_spitch_client()
+    if not client:
         return {"error": "Speech service not configured"}, 503
     
     body = request.get_json(silent=True) or {}
@@ -467,10 +706,12 @@ def generate_speech():
     try:
         # Step 1: Translate English text to target language (if not already English)
         if language != 'en':
-            translation = spitch_client.text.translate(
+            translation = get_breaker("spitch").call(
+                client.text.translate,
                 text=text,
                 source="en",
-                target=language
+                target=language,
+                timeout=deadline.check("speech translation"),
             )
             translated_text = translation.text
         else:
@@ -478,11 +719,13 @@ def generate_speech():
         
         # Step 2: Generate speech from the translated text
         voice = SUPPORTED_LANGUAGES[language]['voice']
-        response = spitch_client.speech.generate(
+        response = get_breaker("spitch").call(
+            client.speech.generate,
             text=translated_text,
             language=language,
             voice=voice,
-            format=audio_format
+            format=audio_format,
+            timeout=deadline.check("speech generation"),
         )
         
         audio_data = response.read()
@@ -495,6 +738,10 @@ def generate_speech():
             as_attachment=False,
             download_name=f'speech.{audio_format}'
         )
+    except CircuitOpenError as exc:
+        return {"error": "Speech service temporarily unavailable", "retry_after": exc.retry_after}, 503, {"Retry-After": str(exc.retry_after)}
+    except DeadlineExceeded as exc:
+        return {"error": str(exc)}, 504
     except Exception as exc:
         return {"error": str(exc)}, 500
 
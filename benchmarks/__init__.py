@@ -0,0 +1,6 @@
+"""Offline benchmark suites for the ZionX backend.
+
+Every suite runs without network access: model and speech calls are replaced
+with deterministic stand-ins so that only our own overhead is measured.
+Run a suite with ``python -m benchmarks.<name> --help``.
+"""
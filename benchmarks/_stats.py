@@ -0,0 +1,45 @@
+"""Small statistics and reporting helpers shared by the benchmark suites."""
+
+import json
+import math
+from pathlib import Path
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Return the pct-th percentile of an already sorted list (nearest-rank)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples: list[float]) -> dict:
+    """Summarize latency samples (seconds) as milliseconds."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        "count": count,
+        "mean_ms": (sum(ordered) / count * 1000) if count else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": (ordered[-1] * 1000) if count else 0.0,
+    }
+
+
+def print_table(headers: list[str], rows: list[list]) -> None:
+    """Print rows as a fixed-width text table."""
+    cells = [[f"{c:.2f}" if isinstance(c, float) else str(c) for c in row] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in cells)) for i, h in enumerate(headers)]
+    print("  ".join(h.rjust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in cells:
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+
+
+def write_json(path: str | None, payload: dict) -> None:
+    """Write benchmark results to a JSON file when a path is given."""
+    if not path:
+        return
+    Path(path).write_text(json.dumps(payload, indent=2))
+    print(f"\nResults written to {path}")
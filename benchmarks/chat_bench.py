@@ -0,0 +1,165 @@
+"""End-to-end /chat benchmark driven by a latency-simulating fake LLM.
+
+Drives `main.run` directly and/or the Flask `/chat` route at several
+concurrency levels and reports throughput plus p50/p95/p99 for total latency,
+simulated model time and our own overhead (total minus model time).
+
+Usage:
+    python -m benchmarks.chat_bench --requests 200 --concurrency 1,4,16 \
+        --orchestrator-latency lognormal:400:0.5 --specialist-latency uniform:300:900
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks._stats import print_table, summarize, write_json
+from benchmarks.fake_llm import LatencyProfile, install_fake_models, measure_model_time
+
+MESSAGES = [
+    "Hello there",
+    "I'm 7 months pregnant with headaches",
+    "Blood sugar at 240 after meal",
+    "Chest pain and shortness of breath",
+    "Feeling anxious and can't sleep",
+    "My 2-year-old has a fever",
+    "What patterns do you see in my health?",
+    "Thanks, that helps",
+]
+
+
+def _check(result: dict) -> None:
+    # main.run swallows failures and answers with degraded_chat_response instead.
+    if result.get("degraded"):
+        raise RuntimeError("main.run returned a degraded response")
+
+
+def _make_target(name: str, users: int, threads: int):
+    """Return a callable(i) that sends the i-th benchmark message to the target."""
+    def payload(i: int) -> tuple[str, str, str]:
+        return (
+            MESSAGES[i % len(MESSAGES)],
+            f"bench-thread-{i % threads}",
+            f"bench-user-{i % users}",
+        )
+
+    if name == "main":
+        from main import run
+
+        def call(i: int) -> None:
+            message, thread_id, user_id = payload(i)
+            _check(run(message, thread_id=thread_id, user_id=user_id))
+        return call
+
+    from app import app
+    local = threading.local()
+
+    def call(i: int) -> None:
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        message, thread_id, user_id = payload(i)
+        response = local.client.post(
+            "/chat", json={"message": message, "thread_id": thread_id, "user_id": user_id}
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"/chat returned {response.status_code}: {response.get_data(as_text=True)}")
+        _check(response.get_json())
+    return call
+
+
+def run_level(call, requests: int, concurrency: int) -> dict:
+    """Issue `requests` calls with `concurrency` workers and summarize the timings."""
+    totals, model, overhead = [], [], []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        with measure_model_time() as clock:
+            try:
+                call(i)
+            except Exception as exc:  # noqa: BLE001
+                with lock:
+                    errors += 1
+                print(f"Request {i} failed: {exc}")
+        elapsed = time.perf_counter() - start
+        with lock:
+            totals.append(elapsed)
+            model.append(clock.seconds)
+            overhead.append(max(elapsed - clock.seconds, 0.0))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "total": summarize(totals),
+        "model": summarize(model),
+        "overhead": summarize(overhead),
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=["main", "flask", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--users", type=int, default=20, help="distinct synthetic user ids")
+    parser.add_argument("--threads", type=int, default=50, help="distinct conversation thread ids")
+    parser.add_argument("--orchestrator-latency", default="lognormal:300:0.4")
+    parser.add_argument("--specialist-latency", default="lognormal:500:0.5")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", help="working directory for the file stores (default: fresh temp dir)")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    # The stores use paths relative to the working directory.
+    os.chdir(args.data_dir or tempfile.mkdtemp(prefix="zionx-chat-bench-"))
+    print(f"Data directory: {os.getcwd()}")
+
+    install_fake_models(
+        orchestrator=LatencyProfile.parse(args.orchestrator_latency),
+        specialist=LatencyProfile.parse(args.specialist_latency),
+        seed=args.seed,
+    )
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    targets = ["main", "flask"] if args.target == "both" else [args.target]
+    results = {"config": vars(args), "results": []}
+
+    for target in targets:
+        call = _make_target(target, args.users, args.threads)
+        call(0)  # build the agent and specialists outside the measured window
+        rows = []
+        for level in levels:
+            res = run_level(call, args.requests, level)
+            res["target"] = target
+            results["results"].append(res)
+            rows.append([
+                level, res["throughput_rps"],
+                res["total"]["p50_ms"], res["total"]["p95_ms"], res["total"]["p99_ms"],
+                res["model"]["p50_ms"], res["overhead"]["p50_ms"],
+                res["overhead"]["p95_ms"], res["overhead"]["p99_ms"], res["errors"],
+            ])
+        print(f"\n== target: {target} ({args.requests} requests per level) ==")
+        print_table(
+            ["conc", "req/s", "p50", "p95", "p99", "model p50", "ovh p50", "ovh p95", "ovh p99", "errors"],
+            rows,
+        )
+
+    write_json(json_path, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
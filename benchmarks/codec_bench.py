@@ -0,0 +1,143 @@
+"""JSON serialization share of request time: stdlib `json` vs core.codec.
+
+Two request shapes, each measured the old way (stdlib json, indent=2 on
+disk, Flask's default JSON provider) and the new way (core.codec):
+
+  - save: a tracking save, i.e. read the user's history, append one entry
+    and write it back; the codec part is decode + encode
+  - GET: a Flask request returning one page of risk history (with full
+    ai_response texts); the codec part is building the JSON response
+
+For each it prints total time per operation, time spent in JSON, that
+share of the total and the on-disk / response size.
+
+Usage:
+    python -m benchmarks.codec_bench
+    python -m benchmarks.codec_bench --history-sizes 1000,10000 --page-size 500 --json codec.json
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from flask import Flask
+
+from benchmarks._stats import print_table, write_json
+from benchmarks.seed import risk_records, tracking_entries
+from core import codec
+from http_cache import CodecJSONProvider
+
+NEW_ENTRY = {"mood": "good", "symptoms": ["headache"], "energy": "7/10", "medications": [], "notes": ""}
+
+
+def best_mean(fn, min_time: float, repeats: int = 3) -> float:
+    """Best-of-`repeats` mean seconds per call."""
+    fn()
+    best = float("inf")
+    for _ in range(repeats):
+        iterations, start = 0, time.perf_counter()
+        while (elapsed := time.perf_counter() - start) < min_time or not iterations:
+            fn()
+            iterations += 1
+        best = min(best, elapsed / iterations)
+    return best
+
+
+# ── save: read history, append, write ──
+
+def _stdlib_save(path: Path) -> None:
+    with path.open() as f:
+        entries = json.load(f)
+    entries.append({"timestamp": datetime.now().isoformat(), **NEW_ENTRY})
+    with path.open("w") as f:
+        json.dump(entries, f, indent=2)
+
+
+def _codec_save(path: Path) -> None:
+    entries = codec.read_json(path)
+    entries.append({"timestamp": datetime.now().isoformat(), **NEW_ENTRY})
+    codec.write_json(path, entries)
+
+
+def bench_save(size: int, min_time: float) -> list[dict]:
+    entries = tracking_entries(random.Random(size), size, datetime.now())
+    rows = []
+    for name, save, encode, decode in [
+        ("stdlib", _stdlib_save, lambda o: json.dumps(o, indent=2).encode(), json.loads),
+        ("codec", _codec_save, codec.dumps, codec.loads),
+    ]:
+        path = Path(f"save-{name}-{size}.json")
+        raw = encode(entries)
+        path.write_bytes(raw)
+        # Reset the file each call so the history does not grow while measuring.
+        total = best_mean(lambda: (path.write_bytes(raw), save(path)), min_time)
+        reset = best_mean(lambda: path.write_bytes(raw), min_time)
+        serialization = best_mean(lambda: encode(decode(raw)), min_time)
+        rows.append({
+            "case": f"save history={size}", "encoder": name if name == "stdlib" else codec.BACKEND,
+            "total_ms": (total - reset) * 1e3, "json_ms": serialization * 1e3, "bytes": len(raw),
+        })
+    return rows
+
+
+# ── GET: Flask JSON response for one history page ──
+
+def bench_get(page_size: int, min_time: float) -> list[dict]:
+    page = risk_records(random.Random(page_size), page_size, datetime.now())
+    rows = []
+    for name, provider in [("stdlib", None), ("codec", CodecJSONProvider)]:
+        app = Flask(f"codec-bench-{name}")
+        if provider:
+            app.json = provider(app)
+
+        @app.get("/risk/history")
+        def history():
+            return {"ok": True, "assessments": page, "count": len(page), "next_cursor": None}
+
+        client = app.test_client()
+        body = client.get("/risk/history").data
+        total = best_mean(lambda: client.get("/risk/history"), min_time)
+        with app.app_context():
+            payload = {"ok": True, "assessments": page, "count": len(page), "next_cursor": None}
+            serialization = best_mean(lambda: app.json.response(payload).get_data(), min_time)
+        rows.append({
+            "case": f"GET page={page_size}", "encoder": name if name == "stdlib" else codec.BACKEND,
+            "total_ms": total * 1e3, "json_ms": serialization * 1e3, "bytes": len(body),
+        })
+    return rows
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history-sizes", default="100,1000,10000", help="comma-separated history sizes for saves")
+    parser.add_argument("--page-size", default="100,500", help="comma-separated records per GET page")
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds to spend per measurement")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    os.chdir(tempfile.mkdtemp(prefix="zionx-codec-bench-"))
+    print(f"JSON backend: {codec.BACKEND}\n")
+
+    rows = []
+    for size in (int(s) for s in args.history_sizes.split(",") if s.strip()):
+        rows += bench_save(size, args.min_time)
+    for size in (int(s) for s in args.page_size.split(",") if s.strip()):
+        rows += bench_get(size, args.min_time)
+
+    print_table(
+        ["case", "encoder", "total ms", "json ms", "json share %", "bytes"],
+        [[r["case"], r["encoder"], r["total_ms"], r["json_ms"], 100 * min(1.0, r["json_ms"] / r["total_ms"]), r["bytes"]]
+         for r in rows],
+    )
+    results = {"backend": codec.BACKEND, "results": rows}
+    write_json(json_path, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Document text extraction on large synthetic PDFs: serial vs process pool.
+
+Generates PDFs of N pages of Helvetica text and extracts them with
+document_extractor three ways:
+
+  - serial: DOCUMENT_EXTRACT_WORKERS=0, every page in this process
+  - pool: page batches in the extraction process pool
+  - budget: pool with a max_chars budget (the /upload fact-extraction
+    budget by default), which stops after the first pages
+
+For each it prints the time to the first text part, the total time and the
+characters extracted. The pool is started before measuring, so its
+start-up cost is not counted.
+
+Usage:
+    python -m benchmarks.extract_bench
+    python -m benchmarks.extract_bench --pages 100,1000 --workers 8 --json extract.json
+"""
+import argparse
+import io
+import os
+import random
+import time
+
+import document_extractor
+from benchmarks._stats import print_table, write_json
+from core.config import DOCUMENT_FACTS_MAX_CHARS
+
+WORDS = (
+    "patient reports mild headache fatigue blood pressure glucose reading dose "
+    "tablet daily morning evening follow up clinic result normal elevated "
+    "prescribed history allergy penicillin asthma inhaler review weeks"
+).split()
+
+
+def synthetic_pdf(pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    """A PDF of `pages` pages, each with `lines_per_page` lines of text."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} clinical note"] + [
+            " ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(lines_per_page - 1)
+        ]
+        text = "".join(f"({line}) Tj T* " for line in lines)
+        stream = f"BT /F1 11 Tf 14 TL 50 780 Td {text}ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def measure(data: bytes, workers: int, max_chars: int | None) -> dict:
+    document_extractor.DOCUMENT_EXTRACT_WORKERS = workers
+    start = time.perf_counter()
+    first, chars = None, 0
+    for part in document_extractor.iter_document_text(io.BytesIO(data), "bench.pdf", max_chars):
+        if first is None:
+            first = time.perf_counter() - start
+        chars += len(part)
+    return {"first_ms": (first or 0.0) * 1e3, "total_ms": (time.perf_counter() - start) * 1e3, "chars": chars}
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", default="50,200,1000", help="comma-separated page counts")
+    parser.add_argument("--workers", type=int, default=document_extractor.DOCUMENT_EXTRACT_WORKERS or os.cpu_count(),
+                        help="extraction processes for the pool runs")
+    parser.add_argument("--budget", type=int, default=DOCUMENT_FACTS_MAX_CHARS, help="max_chars for the budget run")
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    # Start the pool and import pypdf in its workers before timing anything.
+    warm = synthetic_pdf(document_extractor.PARALLEL_MIN_PAGES * 2)
+    measure(warm, args.workers, None)
+
+    rows = []
+    for pages in (int(p) for p in args.pages.split(",") if p.strip()):
+        data = synthetic_pdf(pages, seed=pages)
+        for mode, workers, budget in [
+            ("serial", 0, None), ("pool", args.workers, None), ("budget", args.workers, args.budget),
+        ]:
+            rows.append({"pages": pages, "mode": mode, "workers": workers, "max_chars": budget,
+                         **measure(data, workers, budget)})
+
+    print_table(
+        ["pages", "mode", "workers", "max chars", "first ms", "total ms", "chars"],
+        [[r["pages"], r["mode"], r["workers"], r["max_chars"] or "-", r["first_ms"], r["total_ms"], r["chars"]]
+         for r in rows],
+    )
+    results = {"results": rows}
+    write_json(args.json, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Deterministic fake chat model for offline benchmarks.
+
+`FakeChatModel` stands in for `ChatGoogleGenerativeAI` in both the orchestrator
+and the specialist tools. Latency is drawn from a seeded distribution, tool
+calls and the structured `Chat` output are scripted, and every simulated model
+call is charged to a per-request `ModelClock` so that model time can be
+separated from our own overhead.
+"""
+import contextvars
+import itertools
+import random
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+CHAT_TOOL_NAME = "Chat"
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated model latency.
+
+    kind is one of 'constant', 'uniform' or 'lognormal':
+      - constant: always `a` ms
+      - uniform: between `a` and `b` ms
+      - lognormal: median `a` ms with shape (sigma) `b`
+    """
+
+    kind: str = "constant"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyProfile":
+        """Parse 'constant:200', 'uniform:100:400' or 'lognormal:300:0.6'."""
+        kind, *params = spec.split(":")
+        if kind not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        values = [float(p) for p in params] + [0.0, 0.0]
+        return cls(kind=kind, a=values[0], b=values[1])
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency in seconds."""
+        if self.kind == "uniform":
+            ms = rng.uniform(self.a, self.b)
+        elif self.kind == "lognormal":
+            ms = rng.lognormvariate(0.0, self.b) * self.a
+        else:
+            ms = self.a
+        return max(ms, 0.0) / 1000
+
+
+@dataclass
+class ScriptStep:
+    """One scripted orchestrator turn: an optional specialist call, then a Chat answer."""
+
+    tool: str | None = None
+    tool_args: dict = field(default_factory=dict)
+    chat: dict = field(default_factory=lambda: {"normal_response": "Benchmark answer."})
+
+
+DEFAULT_SCRIPT = [
+    ScriptStep(chat={"normal_response": "Hello! How can I help you today?"}),
+    ScriptStep(
+        tool="pregnancy_advisor",
+        tool_args={"question": "Headaches at 7 months pregnant", "user_context": ""},
+        chat={
+            "normal_response": "Please check your blood pressure and contact your midwife.",
+            "fact": "User is pregnant, 7 months along",
+            "risk_level": "medium",
+            "urgency": "schedule_visit",
+        },
+    ),
+    ScriptStep(
+        tool="diabetes_advisor",
+        tool_args={"question": "Blood sugar at 240 after meal", "user_context": ""},
+        chat={
+            "normal_response": "Recheck in two hours and review your meal plan.",
+            "risk_level": "low",
+            "urgency": "monitor",
+        },
+    ),
+    ScriptStep(
+        tool="emergency_triage",
+        tool_args={"symptoms": "Chest pain and shortness of breath", "user_context": ""},
+        chat={
+            "normal_response": "Call emergency services now.",
+            "risk_level": "critical",
+            "urgency": "call_emergency",
+        },
+    ),
+]
+
+
+class ModelClock:
+    """Accumulates simulated model time for one benchmark request."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def charge(self, seconds: float) -> None:
+        with self._lock:
+            self.seconds += seconds
+            self.calls += 1
+
+
+# Tool calls run on langchain's context-copying executors, so the clock set
+# by the request thread is visible to nested specialist calls.
+_current_clock: contextvars.ContextVar[ModelClock | None] = contextvars.ContextVar(
+    "benchmark_model_clock", default=None
+)
+
+
+@contextmanager
+def measure_model_time():
+    """Charge every fake model call made inside the block to a fresh ModelClock."""
+    clock = ModelClock()
+    token = _current_clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _current_clock.reset(token)
+
+
+def _tool_name(tool) -> str | None:
+    if isinstance(tool, dict):
+        return tool.get("name") or tool.get("function", {}).get("name") or tool.get("title")
+    return getattr(tool, "name", None) or getattr(tool, "__name__", None)
+
+
+class FakeChatModel(BaseChatModel):
+    """Scripted, latency-simulating replacement for ChatGoogleGenerativeAI.
+
+    Without bound tools (specialists, doc extraction, translation) it returns
+    `reply`. With bound tools (the orchestrator) it picks a `ScriptStep` from a
+    stable hash of the latest user message, calls that step's specialist tool
+    first and then answers by calling the `Chat` structured-output tool.
+    """
+
+    model: str = "zionx-benchmark-fake"
+    latency: LatencyProfile = LatencyProfile()
+    script: list[ScriptStep] = DEFAULT_SCRIPT
+    reply: str = "Specialist benchmark reply. This is not medical advice."
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _ids = PrivateAttr(default_factory=itertools.count)
+
+    def model_post_init(self, __context) -> None:
+        super().model_post_init(__context)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "zionx-benchmark-fake"
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(tools=list(tools), **kwargs)
+
+    def with_structured_output(self, schema, **kwargs):
+        raise NotImplementedError("FakeChatModel only supports tool-based structured output")
+
+    def _simulate_latency(self) -> None:
+        with self._lock:
+            delay = self.latency.sample(self._rng)
+        if delay:
+            time.sleep(delay)
+        clock = _current_clock.get()
+        if clock is not None:
+            clock.charge(delay)
+
+    def _next_call_id(self) -> str:
+        with self._lock:
+            return f"call_{next(self._ids)}"
+
+    def _pick_step(self, messages) -> ScriptStep:
+        last_user = next(
+            (m for m in reversed(messages) if isinstance(m, HumanMessage)), None
+        )
+        text = str(last_user.content) if last_user else ""
+        return self.script[zlib.crc32(text.encode()) % len(self.script)]
+
+    def _respond(self, messages, tool_names: list[str]) -> AIMessage:
+        if not tool_names:
+            return AIMessage(content=self.reply)
+
+        step = self._pick_step(messages)
+        # Only look at the current turn: everything after the latest user message.
+        turn = list(itertools.takewhile(lambda m: not isinstance(m, HumanMessage), reversed(messages)))
+        tool_done = any(isinstance(m, ToolMessage) for m in turn)
+
+        if step.tool and step.tool in tool_names and not tool_done:
+            name, args = step.tool, step.tool_args
+        else:
+            name, args = CHAT_TOOL_NAME, step.chat
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": dict(args), "id": self._next_call_id()}],
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._simulate_latency()
+        tool_names = [n for n in (_tool_name(t) for t in kwargs.get("tools") or []) if n]
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages, tool_names))])
+
+
+@dataclass
+class FakeModelFactory:
+    """Drop-in for the ChatGoogleGenerativeAI constructor used by agent.py and specialist_utils.py."""
+
+    latency: LatencyProfile
+    script: list[ScriptStep] = field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    seed: int = 0
+
+    def __call__(self, *args, **kwargs) -> FakeChatModel:
+        return FakeChatModel(latency=self.latency, script=self.script, seed=self.seed)
+
+
+def install_fake_models(orchestrator: LatencyProfile, specialist: LatencyProfile, seed: int = 0) -> None:
+    """Replace the Gemini client in the orchestrator and specialist factories.
+
+    Resets the cached agent and specialist instances so the fakes take effect
+    even if the real clients were already built.
+    """
+    import agent
+    import main
+    from tools import specialist_utils
+
+    agent.ChatGoogleGenerativeAI = FakeModelFactory(latency=orchestrator, seed=seed)
+    specialist_utils.ChatGoogleGenerativeAI = FakeModelFactory(latency=specialist, seed=seed + 1)
+    specialist_utils._cache.clear()
+    main._agent = None
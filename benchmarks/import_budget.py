@@ -0,0 +1,79 @@
+"""Import-time profiler with a startup budget.
+
+Imports the app in a fresh interpreter with `-X importtime`, prints the
+slowest top-level imports and fails (exit 1) when the total exceeds the
+budget or when a feature-specific heavy dependency is imported eagerly.
+
+Usage:
+    python -m benchmarks.import_budget --budget-ms 800
+    IMPORT_BUDGET_MS=800 python -m benchmarks.import_budget --module app
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded on first use of chat, document upload or speech -- never at import.
+LAZY_MODULES = [
+    "langchain",
+    "langgraph",
+    "numpy",
+    "langchain_google_genai",
+    "pypdf",
+    "docx",
+    "spitch",
+]
+
+
+def profile_imports(module: str) -> list[tuple[int, int, str]]:
+    """Import `module` in a subprocess; return (depth, cumulative_us, name) rows."""
+    env = {**os.environ, "WARMUP_ON_STARTUP": "false", "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((depth, int(cumulative), name.strip()))
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", 1500)))
+    parser.add_argument("--top", type=int, default=15, help="number of slowest top-level imports to show")
+    args = parser.parse_args(argv)
+
+    rows = profile_imports(args.module)
+    top_level = [(cumulative, name) for depth, cumulative, name in rows if depth == 0]
+    total_ms = sum(cumulative for cumulative, _ in top_level) / 1000
+
+    print(f"Slowest top-level imports for `import {args.module}`:")
+    for cumulative, name in sorted(top_level, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:9.1f} ms  {name}")
+
+    imported = {name for _, _, name in rows}
+    eager = [m for m in LAZY_MODULES if m in imported]
+    failed = False
+    if eager:
+        print(f"\nFAIL: imported eagerly but should load on first use: {', '.join(eager)}")
+        failed = True
+
+    verdict = "FAIL" if total_ms > args.budget_ms else "OK"
+    print(f"\n{verdict}: import {args.module} took {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    return 1 if failed or verdict == "FAIL" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
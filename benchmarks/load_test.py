@@ -0,0 +1,251 @@
+"""HTTP-level load test of every Flask endpoint against synthetic users.
+
+For each history depth, seeds N synthetic users into a fresh data directory,
+then replays a weighted mix of requests against `app.py` through Flask's test
+client (or a live server with --base-url). Model and speech calls are stubbed.
+Prints per-endpoint latency for each depth so the growth curve of every
+file-based store is visible side by side.
+
+Usage:
+    python -m benchmarks.load_test --users 50 --depths 10,100,1000,5000 \
+        --requests 2000 --concurrency 8 --json load.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from benchmarks._stats import print_table, summarize, write_json
+from benchmarks.fake_llm import LatencyProfile, install_fake_models
+from benchmarks.seed import PASSWORD, SeedConfig, SeededUser, seed_users
+
+
+@dataclass
+class Op:
+    """One request in the workload mix."""
+
+    name: str
+    method: str
+    path: str
+    weight: int
+    json: dict | None = None
+    form: dict | None = None
+    auth: bool = True
+
+
+WORKLOAD = [
+    Op("auth/login", "POST", "/auth/login", 2, auth=False),
+    Op("auth/verify", "GET", "/auth/verify", 4),
+    Op("auth/me", "GET", "/auth/me", 2),
+    Op("onboarding/profile", "GET", "/onboarding/profile", 3),
+    Op("tracking/daily", "POST", "/tracking/daily", 6, json={
+        "mood": "good", "symptoms": ["headache"], "energy": "medium",
+        "medications": ["Paracetamol"], "notes": "load test",
+    }),
+    Op("tracking/history", "GET", "/tracking/history?days=30", 8),
+    Op("tracking/summary", "GET", "/tracking/summary?days=7", 4),
+    Op("risk/history", "GET", "/risk/history?days=30", 6),
+    Op("risk/summary", "GET", "/risk/summary?days=30", 6),
+    Op("alerts/history", "GET", "/alerts/history?days=30", 4),
+    Op("alerts/summary", "GET", "/alerts/summary?days=30", 4),
+    Op("chat", "POST", "/chat", 6, json={"message": "I'm 7 months pregnant with headaches"}),
+    Op("chat/recent", "GET", "/chat/recent?limit=10", 6),
+    Op("memory", "GET", "/memory", 5),
+    Op("upload", "POST", "/upload", 1, form={"extract_facts": "true"}),
+    Op("speech/transcribe", "POST", "/speech/transcribe", 1, form={"language": "yo"}),
+    Op("speech/generate", "POST", "/speech/generate", 1, json={"text": "Drink water", "language": "yo"}),
+    Op("speech/languages", "GET", "/speech/languages", 1, auth=False),
+    Op("health", "GET", "/health", 1, auth=False),
+]
+
+UPLOAD_BODY = b"Lab report\nHbA1c: 6.1%\nFasting glucose: 110 mg/dL\nAllergy: Penicillin\n"
+
+
+class _FakeAudio:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self) -> bytes:
+        return self._data
+
+
+class FakeSpitch:
+    """Minimal stand-in for the Spitch client used by the /speech endpoints."""
+
+    class _Result:
+        def __init__(self, text: str):
+            self.text = text
+
+    def __init__(self):
+        self.speech = self
+        self.text = self
+
+    def transcribe(self, **kwargs):
+        return self._Result("Mo ni ibà")
+
+    def translate(self, text: str, **kwargs):
+        return self._Result(text)
+
+    def generate(self, **kwargs):
+        return _FakeAudio(b"ID3" + b"\x00" * 2048)
+
+
+class InProcessClient:
+    """Sends workload requests through Flask's test client."""
+
+    def __init__(self):
+        from app import app
+        self._app = app
+        self._local = threading.local()
+
+    def send(self, op: Op, user: SeededUser) -> int:
+        if not hasattr(self._local, "client"):
+            self._local.client = self._app.test_client()
+        kwargs = _request_kwargs(op, user)
+        response = self._local.client.open(op.path, method=op.method, **kwargs)
+        response.get_data()
+        return response.status_code
+
+
+class HttpClient:
+    """Sends workload requests to a running server over HTTP (JSON ops only)."""
+
+    def __init__(self, base_url: str):
+        self._base = base_url.rstrip("/")
+
+    def send(self, op: Op, user: SeededUser) -> int | None:
+        if op.form is not None:
+            return None  # multipart bodies are only replayed in-process
+        kwargs = _request_kwargs(op, user)
+        data = json.dumps(kwargs["json"]).encode() if "json" in kwargs else None
+        headers = dict(kwargs.get("headers", {}))
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(self._base + op.path, data=data, method=op.method, headers=headers)
+        try:
+            with urllib.request.urlopen(req) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+
+def _request_kwargs(op: Op, user: SeededUser) -> dict:
+    kwargs: dict = {}
+    if op.auth:
+        kwargs["headers"] = {"Authorization": f"Bearer {user.token}"}
+    if op.name == "auth/login":
+        kwargs["json"] = {"username": user.user_id, "password": PASSWORD}
+    elif op.json is not None:
+        kwargs["json"] = {**op.json, "user_id": user.user_id}
+    elif op.form is not None:
+        form = {**op.form, "user_id": user.user_id}
+        if op.name == "upload":
+            form["file"] = (io.BytesIO(UPLOAD_BODY), "labs.txt")
+        else:
+            form["audio"] = (io.BytesIO(b"\x00" * 1024), "clip.wav")
+        kwargs["data"] = form
+        kwargs["content_type"] = "multipart/form-data"
+    return kwargs
+
+
+def replay(client, seeded: list[SeededUser], requests: int, concurrency: int, seed: int) -> dict:
+    """Replay a seeded random mix of operations and collect latencies per endpoint."""
+    rng = random.Random(seed)
+    plan = [
+        (rng.choices(WORKLOAD, weights=[op.weight for op in WORKLOAD])[0], rng.choice(seeded))
+        for _ in range(requests)
+    ]
+    samples: dict[str, list[float]] = {op.name: [] for op in WORKLOAD}
+    errors: dict[str, int] = {op.name: 0 for op in WORKLOAD}
+    lock = threading.Lock()
+
+    def one(item) -> None:
+        op, user = item
+        start = time.perf_counter()
+        try:
+            status = client.send(op, user)
+        except Exception as exc:  # noqa: BLE001
+            print(f"{op.name} failed: {exc}")
+            status = 599
+        elapsed = time.perf_counter() - start
+        if status is None:
+            return
+        with lock:
+            samples[op.name].append(elapsed)
+            if status >= 500:
+                errors[op.name] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, plan))
+
+    return {
+        name: {**summarize(values), "errors": errors[name]}
+        for name, values in samples.items() if values
+    }
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--depths", default="10,100,1000", help="history records per user, comma-separated")
+    parser.add_argument("--requests", type=int, default=1000, help="requests per depth")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--model-latency", default="constant:0", help="fake model latency (see fake_llm.LatencyProfile)")
+    parser.add_argument("--base-url", help="replay against a running server instead of in-process")
+    parser.add_argument("--data-dir", help="seed into this directory (the server's working dir with --base-url)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    json_path = os.path.abspath(args.json) if args.json else None
+    depths = [int(d) for d in args.depths.split(",") if d.strip()]
+    results = {"config": vars(args), "depths": {}}
+
+    if args.base_url:
+        client = HttpClient(args.base_url)
+    else:
+        latency = LatencyProfile.parse(args.model_latency)
+        install_fake_models(orchestrator=latency, specialist=latency, seed=args.seed)
+        import app as app_module
+        app_module.spitch_client = FakeSpitch()
+        client = InProcessClient()
+
+    for depth in depths:
+        # The stores resolve paths relative to cwd: use a fresh directory per
+        # depth, or re-seed --data-dir in place when driving a live server.
+        os.chdir(args.data_dir or tempfile.mkdtemp(prefix=f"zionx-load-{depth}-"))
+        seed_config = SeedConfig(
+            users=args.users, tracking=depth, risk=depth, alerts=max(depth // 5, 1),
+            threads=max(depth // 5, 1), facts=depth, seed=args.seed,
+        )
+        started = time.perf_counter()
+        seeded = seed_users(seed_config)
+        print(f"Seeded {args.users} users at depth {depth} in {time.perf_counter() - started:.1f}s ({os.getcwd()})")
+        results["depths"][depth] = replay(client, seeded, args.requests, args.concurrency, args.seed)
+
+    for metric in ("p50_ms", "p95_ms"):
+        print(f"\n== {metric} by history depth ==")
+        rows = []
+        for op in WORKLOAD:
+            row = [op.name]
+            for depth in depths:
+                stats = results["depths"][depth].get(op.name)
+                row.append(stats[metric] if stats else "-")
+            rows.append(row)
+        print_table(["endpoint", *(f"d={d}" for d in depths)], rows)
+
+    write_json(json_path, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Synthetic data generator for the file-based stores.
+
+Writes users, sessions, facts, tracking, risk, alert and thread histories
+directly in the on-disk format each store expects, so seeding large
+histories does not go through the O(history) write paths being measured.
+All paths are relative to the current working directory, like the stores.
+"""
+import random
+import secrets
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import alert_history
+from core.codec import write_json
+from core.ids import encode_id
+import daily_tracking
+import memory
+import risk_monitor
+import thread_manager
+import users
+
+MOODS = ["great", "good", "okay", "low", "bad"]
+ENERGY = ["high", "medium", "low"]
+SYMPTOMS = ["headache", "fatigue", "nausea", "dizziness", "back pain", "cough", "fever", "insomnia"]
+MEDICATIONS = ["Metformin 500mg", "Paracetamol", "Folic acid", "Lisinopril 10mg", "Ibuprofen"]
+RISK_LEVELS = ["low", "low", "low", "medium", "medium", "high", "critical"]
+URGENCY = {"low": "monitor", "medium": "schedule_visit", "high": "seek_urgent_care", "critical": "call_emergency"}
+PASSWORD = "benchmark-password"
+
+
+@dataclass
+class SeededUser:
+    user_id: str
+    token: str
+
+
+@dataclass
+class SeedConfig:
+    """How many users to create and how deep each of their histories is."""
+
+    users: int = 10
+    tracking: int = 100
+    risk: int = 50
+    alerts: int = 10
+    threads: int = 20
+    facts: int = 30
+    seed: int = 0
+    start: datetime = field(default_factory=datetime.now)
+
+
+def _stamps(rng: random.Random, count: int, start: datetime) -> list[datetime]:
+    """`count` ascending timestamps ending near `start`, roughly 8 hours apart."""
+    stamps, current = [], start
+    for _ in range(count):
+        current -= timedelta(hours=rng.uniform(1, 16))
+        stamps.append(current)
+    return stamps[::-1]
+
+
+def _record_id(rng: random.Random, ts: datetime) -> str:
+    return encode_id(int(ts.timestamp() * 1000), rng.getrandbits(80))
+
+
+def _dump(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, payload)
+
+
+def tracking_entries(rng: random.Random, count: int, start: datetime) -> list[dict]:
+    return [
+        {
+            "entry_id": _record_id(rng, ts),
+            "timestamp": ts.isoformat(),
+            "date": ts.strftime("%Y-%m-%d"),
+            "mood": rng.choice(MOODS),
+            "symptoms": rng.sample(SYMPTOMS, rng.randint(0, 3)),
+            "energy": rng.choice(ENERGY),
+            "medications": rng.sample(MEDICATIONS, rng.randint(0, 2)),
+            "notes": rng.choice(["", "Slept badly", "Walked 30 minutes", "Skipped lunch"]),
+        }
+        for ts in _stamps(rng, count, start)
+    ]
+
+
+def risk_records(rng: random.Random, count: int, start: datetime) -> list[dict]:
+    records = []
+    for ts in _stamps(rng, count, start):
+        level = rng.choice(RISK_LEVELS)
+        records.append({
+            "assessment_id": _record_id(rng, ts),
+            "timestamp": ts.isoformat(),
+            "date": ts.strftime("%Y-%m-%d"),
+            "risk_level": level,
+            "urgency": URGENCY[level],
+            "user_message": "I have had a headache for three days",
+            "ai_response": "Synthetic assessment text. " * rng.randint(5, 40),
+            "emergency_alert_sent": level == "critical",
+        })
+    return records
+
+
+def alert_records(rng: random.Random, count: int, start: datetime) -> list[dict]:
+    return [
+        {
+            "alert_id": _record_id(rng, ts),
+            "timestamp": ts.isoformat(),
+            "date": ts.strftime("%Y-%m-%d"),
+            "severity": "critical",
+            "symptoms": "Chest pain and shortness of breath",
+            "ai_assessment": "Synthetic emergency assessment. " * rng.randint(5, 20),
+            "user_location": "Not provided",
+            "success": rng.random() > 0.2,
+            "message": "Emergency alert sent to 2 contact(s)",
+        }
+        for ts in _stamps(rng, count, start)
+    ]
+
+
+def thread_index(rng: random.Random, count: int, start: datetime) -> dict:
+    threads = {}
+    for i, ts in enumerate(_stamps(rng, count, start)):
+        thread_id = f"thread-{i}"
+        threads[thread_id] = {
+            "thread_id": thread_id,
+            "title": f"Conversation {i}",
+            "created_at": ts.isoformat(),
+            "last_updated": ts.isoformat(),
+            "last_message": "Synthetic last message",
+            "message_count": rng.randint(1, 30),
+        }
+    return threads
+
+
+def seed_users(config: SeedConfig) -> list[SeededUser]:
+    """Write users, sessions and every per-user history; return ids and session tokens."""
+    rng = random.Random(config.seed)
+    user_db, sessions, seeded = {}, {}, []
+    expiry = (config.start + timedelta(days=30)).isoformat()
+
+    for n in range(config.users):
+        user_id = f"bench-user-{n}"
+        token = secrets.token_urlsafe(32)
+        user_db[user_id] = {
+            "password_hash": users._hash_password(PASSWORD),
+            "email": f"{user_id}@example.com",
+            "created_at": config.start.isoformat(),
+            "user_id": user_id,
+            "profile": {
+                "onboarding_complete": True,
+                "medical_data": {
+                    "allergies": ["Penicillin"],
+                    "medications_to_avoid": [],
+                    "blood_group": "O+",
+                    "conditions": rng.sample(["Type 2 Diabetes", "Hypertension", "Asthma"], 1),
+                    "ongoing_issues": [],
+                },
+                "emergency_contacts": {"consent_given": False, "doctor": {}, "loved_ones": []},
+                "preferences": {"language": "en", "output_mode": "text"},
+            },
+        }
+        sessions[token] = {
+            "username": user_id,
+            "user_id": user_id,
+            "created_at": config.start.isoformat(),
+            "expires_at": expiry,
+        }
+
+        _dump(Path(daily_tracking.TRACKING_DIR) / f"{user_id}.json", tracking_entries(rng, config.tracking, config.start))
+        _dump(Path(risk_monitor.RISK_DIR) / f"{user_id}.json", risk_records(rng, config.risk, config.start))
+        _dump(Path(alert_history.ALERTS_DIR) / f"{user_id}.json", alert_records(rng, config.alerts, config.start))
+        _dump(Path(thread_manager.THREADS_DIR) / f"{user_id}_threads.json", thread_index(rng, config.threads, config.start))
+
+        facts_path = Path(memory.MEMORY_DIR) / f"{user_id}.txt"
+        facts_path.parent.mkdir(parents=True, exist_ok=True)
+        facts_path.write_text("".join(f"User fact #{i}: takes medication at breakfast\n" for i in range(config.facts)))
+
+        seeded.append(SeededUser(user_id=user_id, token=token))
+
+    _dump(Path(users.USERS_FILE), user_db)
+    _dump(Path(users.SESSIONS_FILE), sessions)
+    return seeded
@@ -0,0 +1,268 @@
+"""Microbenchmarks for the hot storage functions with scaling curves.
+
+Each benchmark is measured at every size on its axis: history-scaled
+functions at N records for one user, user-scaled functions at N users.
+Results (seconds per call) go to a JSON file; --compare flags any
+benchmark/size that got slower than a stored baseline by more than
+--threshold and exits non-zero so it can gate CI.
+
+Usage:
+    python -m benchmarks.storage_bench --output storage.json
+    python -m benchmarks.storage_bench --full --output storage.json
+    python -m benchmarks.storage_bench --compare storage-baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import secrets
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+import alert_history
+import daily_tracking
+import memory
+import risk_monitor
+import thread_manager
+import tracking_trends
+import users
+from benchmarks._stats import print_table
+from core.codec import write_json
+from benchmarks.seed import alert_records, risk_records, thread_index, tracking_entries
+
+DEFAULT_HISTORY_SIZES = [10, 100, 1_000, 10_000]
+DEFAULT_USER_COUNTS = [10, 100, 1_000, 10_000]
+FULL_HISTORY_SIZES = [10, 100, 1_000, 10_000, 100_000]
+FULL_USER_COUNTS = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+USER_ID = "bench-user"
+
+
+@dataclass
+class Bench:
+    """A storage benchmark: `setup(size)` seeds data and returns the callable to time."""
+
+    name: str
+    axis: str  # "history" or "users"
+    setup: Callable[[int], Callable[[], object]]
+
+
+def _write(path: Path, payload) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, payload)
+
+
+def _setup_verify_session(size: int):
+    expiry = (datetime.now() + timedelta(days=30)).isoformat()
+    sessions = {
+        secrets.token_urlsafe(32): {"username": f"u{i}", "user_id": f"u{i}", "created_at": expiry, "expires_at": expiry}
+        for i in range(size)
+    }
+    token = next(iter(sessions))
+    _write(Path(users.SESSIONS_FILE), sessions)
+    return lambda: users.verify_session(token)
+
+
+def _setup_save_daily_tracking(size: int):
+    rng = random.Random(size)
+    _write(Path(daily_tracking.TRACKING_DIR) / f"{USER_ID}.json", tracking_entries(rng, size, datetime.now()))
+    entry = {"mood": "good", "symptoms": ["headache"], "energy": "medium", "medications": [], "notes": ""}
+    return lambda: daily_tracking.save_daily_tracking(USER_ID, entry)
+
+
+def _setup_save_tracking_batch(size: int):
+    """30 offline check-ins from the last 30 hours, merged into the tail."""
+    rng = random.Random(size)
+    _write(Path(daily_tracking.TRACKING_DIR) / f"{USER_ID}.json", tracking_entries(rng, size, datetime.now()))
+    now = datetime.now()
+    raw = [
+        {"timestamp": (now - timedelta(hours=h)).isoformat(), "mood": "good", "symptoms": ["headache"]}
+        for h in range(30)
+    ]
+    return lambda: daily_tracking.save_tracking_batch(
+        USER_ID, [daily_tracking.parse_batch_entry(r) for r in raw]
+    )
+
+
+def _setup_load_tracking_history(size: int):
+    rng = random.Random(size)
+    _write(Path(daily_tracking.TRACKING_DIR) / f"{USER_ID}.json", tracking_entries(rng, size, datetime.now()))
+    return lambda: daily_tracking.load_tracking_history(USER_ID, days=7)
+
+
+def _setup_load_tracking_page(size: int):
+    rng = random.Random(size)
+    _write(Path(daily_tracking.TRACKING_DIR) / f"{USER_ID}.json", tracking_entries(rng, size, datetime.now()))
+    _, cursor = daily_tracking.load_tracking_page(USER_ID, limit=100)
+    return lambda: daily_tracking.load_tracking_page(USER_ID, limit=100, cursor=cursor)
+
+
+def _setup_get_tracking_trends(size: int):
+    rng = random.Random(size)
+    _write(Path(daily_tracking.TRACKING_DIR) / f"{USER_ID}.json", tracking_entries(rng, size, datetime.now()))
+    return lambda: tracking_trends.get_tracking_trends(USER_ID, days=30)
+
+
+def _setup_get_risk_summary(size: int):
+    rng = random.Random(size)
+    _write(Path(risk_monitor.RISK_DIR) / f"{USER_ID}.json", risk_records(rng, size, datetime.now()))
+    return lambda: risk_monitor.get_risk_summary(USER_ID, days=30)
+
+
+def _setup_get_alerts_summary(size: int):
+    rng = random.Random(size)
+    _write(Path(alert_history.ALERTS_DIR) / f"{USER_ID}.json", alert_records(rng, size, datetime.now()))
+    return lambda: alert_history.get_alerts_summary(USER_ID, days=30)
+
+
+def _setup_save_fact(size: int):
+    path = Path(memory.MEMORY_DIR) / f"{USER_ID}.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"User fact #{i}: takes medication at breakfast\n" for i in range(size)))
+    return lambda: memory.save_fact(USER_ID, "User walks 30 minutes daily")
+
+
+def _setup_load_facts(size: int):
+    path = Path(memory.MEMORY_DIR) / f"{USER_ID}.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"User fact #{i}: takes medication at breakfast\n" for i in range(size)))
+    return lambda: memory.load_facts(USER_ID)
+
+
+def _setup_get_recent_threads(size: int):
+    rng = random.Random(size)
+    _write(Path(thread_manager.THREADS_DIR) / f"{USER_ID}_threads.json", thread_index(rng, size, datetime.now()))
+    return lambda: thread_manager.get_recent_threads(USER_ID, limit=10)
+
+
+def _setup_get_all_users(size: int):
+    memory_dir = Path(memory.MEMORY_DIR)
+    memory_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(size):
+        (memory_dir / f"user-{i}.txt").write_text("User fact: allergic to penicillin\n")
+    return memory.get_all_users
+
+
+BENCHMARKS = [
+    Bench("verify_session", "users", _setup_verify_session),
+    Bench("save_daily_tracking", "history", _setup_save_daily_tracking),
+    Bench("save_tracking_batch(30)", "history", _setup_save_tracking_batch),
+    Bench("load_tracking_history(days=7)", "history", _setup_load_tracking_history),
+    Bench("load_tracking_page(limit=100)", "history", _setup_load_tracking_page),
+    Bench("get_tracking_trends(days=30)", "history", _setup_get_tracking_trends),
+    Bench("get_risk_summary", "history", _setup_get_risk_summary),
+    Bench("get_alerts_summary", "history", _setup_get_alerts_summary),
+    Bench("save_fact", "history", _setup_save_fact),
+    Bench("load_facts", "history", _setup_load_facts),
+    Bench("get_recent_threads", "history", _setup_get_recent_threads),
+    Bench("get_all_users", "users", _setup_get_all_users),
+]
+
+
+def measure(fn: Callable[[], object], min_time: float, max_iterations: int, repeats: int) -> float:
+    """Return the best-of-`repeats` mean seconds per call."""
+    fn()  # warm caches and lazily created directories
+    best = float("inf")
+    for _ in range(repeats):
+        iterations, elapsed = 0, 0.0
+        start = time.perf_counter()
+        while elapsed < min_time and iterations < max_iterations:
+            fn()
+            iterations += 1
+            elapsed = time.perf_counter() - start
+        best = min(best, elapsed / iterations)
+    return best
+
+
+def run_suite(history_sizes, user_counts, only, min_time, max_iterations, repeats) -> dict:
+    results: dict[str, dict[str, float]] = {}
+    root = Path(tempfile.mkdtemp(prefix="zionx-storage-bench-"))
+    for bench in BENCHMARKS:
+        if only and bench.name not in only:
+            continue
+        sizes = history_sizes if bench.axis == "history" else user_counts
+        results[bench.name] = {}
+        for size in sizes:
+            workdir = root / f"{bench.name.split('(')[0]}-{size}"
+            workdir.mkdir()
+            os.chdir(workdir)  # the stores resolve paths relative to cwd
+            fn = bench.setup(size)
+            results[bench.name][str(size)] = measure(fn, min_time, max_iterations, repeats)
+            print(f"{bench.name:<32} {bench.axis}={size:<9} {results[bench.name][str(size)] * 1e3:10.3f} ms/op")
+    return results
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Return every benchmark/size that regressed by more than `threshold` (fractional)."""
+    regressions = []
+    for name, sizes in current.items():
+        for size, seconds in sizes.items():
+            base = baseline.get(name, {}).get(size)
+            if base and seconds > base * (1 + threshold):
+                regressions.append({"benchmark": name, "size": size, "baseline_s": base,
+                                    "current_s": seconds, "ratio": seconds / base})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="history up to 100k records and up to 1M users")
+    parser.add_argument("--history-sizes", help="comma-separated history sizes (overrides defaults)")
+    parser.add_argument("--user-counts", help="comma-separated user counts (overrides defaults)")
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend per measurement")
+    parser.add_argument("--max-iterations", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    def sizes(spec, full, default):
+        return [int(s) for s in spec.split(",")] if spec else (full if args.full else default)
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    results = run_suite(
+        sizes(args.history_sizes, FULL_HISTORY_SIZES, DEFAULT_HISTORY_SIZES),
+        sizes(args.user_counts, FULL_USER_COUNTS, DEFAULT_USER_COUNTS),
+        set(args.only.split(",")) if args.only else None,
+        args.min_time, args.max_iterations, args.repeats,
+    )
+    payload = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if output:
+        Path(output).write_text(json.dumps(payload, indent=2))
+        print(f"\nResults written to {output}")
+
+    if not baseline_path:
+        return 0
+
+    baseline = json.loads(Path(baseline_path).read_text())["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {baseline_path}")
+        return 0
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+    print_table(
+        ["benchmark", "size", "baseline ms", "current ms", "ratio"],
+        [[r["benchmark"], r["size"], r["baseline_s"] * 1e3, r["current_s"] * 1e3, r["ratio"]] for r in regressions],
+    )
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Split long extracted text into overlapping chunks on natural boundaries.
+
+Text from document_extractor is split at the coarsest boundary that fits:
+pages ("--- Page N ---" headers), then paragraphs (blank lines), then
+lines, then spaces; only a run of text with no space at all is cut
+mid-word. Consecutive small pieces are packed into one chunk, but a piece
+that was split never shares a chunk with its neighbours, so chunks start
+on page boundaries wherever pages fit.
+
+Each chunk after the first is prefixed with up to `overlap` characters
+from the end of the previous one (starting at a line or word), so a fact
+that straddles a boundary is seen whole by at least one chunk.
+"""
+import re
+
+# Coarsest first. Page breaks keep their header with the page that follows.
+_BOUNDARIES = (
+    (re.compile(r"\n\n(?=--- Page \d+ ---)"), "\n\n"),
+    (re.compile(r"\n\s*\n"), "\n\n"),
+    (re.compile(r"\n"), "\n"),
+    (re.compile(r" +"), " "),
+)
+
+
+def _split(text: str, max_chars: int, level: int = 0) -> list[str]:
+    """Pieces of at most max_chars, split at boundary `level` or finer."""
+    if len(text) <= max_chars:
+        return [text]
+    if level == len(_BOUNDARIES):
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+    pattern, joiner = _BOUNDARIES[level]
+    pieces, current = [], ""
+    for part in pattern.split(text):
+        if not part.strip():
+            continue
+        if len(part) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.extend(_split(part, max_chars, level + 1))
+        elif not current:
+            current = part
+        elif len(current) + len(joiner) + len(part) <= max_chars:
+            current += joiner + part
+        else:
+            pieces.append(current)
+            current = part
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _tail(text: str, overlap: int) -> str:
+    """The last `overlap` characters of text, starting at a line or word."""
+    if overlap <= 0 or not text:
+        return ""
+    tail = text[-overlap:]
+    if len(tail) == len(text):
+        return tail
+    for boundary in ("\n", " "):
+        cut = tail.find(boundary)
+        if cut >= 0:
+            return tail[cut + 1:]
+    return tail
+
+
+def split_chunks(text: str, max_chars: int, overlap: int = 0) -> list[str]:
+    """Split text into chunks of at most max_chars (plus up to `overlap` repeated).
+
+    Args:
+        text: Text to split
+        max_chars: Size of each chunk before the overlap is added
+        overlap: Characters of the previous chunk repeated at the start
+            of each chunk
+
+    Returns:
+        The chunks in order; empty if the text is blank
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    pieces = [piece.strip() for piece in _split(text.strip(), max_chars)] if text.strip() else []
+    pieces = [piece for piece in pieces if piece]
+    chunks = []
+    for index, piece in enumerate(pieces):
+        prefix = _tail(pieces[index - 1], overlap) if index else ""
+        chunks.append(f"{prefix}\n{piece}" if prefix else piece)
+    return chunks
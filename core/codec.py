@@ -0,0 +1,187 @@
+"""JSON codec shared by the file stores and HTTP responses.
+
+Uses the fastest installed backend: orjson, then ujson, then the stdlib
+`json`. Everything is bytes in, bytes out:
+  - `dumps(obj)` returns compact UTF-8 bytes (no indentation, no ASCII
+    escaping); `dumps_text` is the same as str for text columns
+  - `loads(data)` accepts bytes, bytearray, memoryview or str
+  - `read_json(path)` decodes a file straight from its bytes; files of at
+    least MMAP_MIN_BYTES are memory-mapped and handed to orjson as a buffer
+    without an intermediate copy
+  - `write_json(path, obj)` writes compactly to a temp file and renames it
+    over `path`, so readers never see a half-written file
+  - `iter_json_array(path)` yields the elements of an array file one at a
+    time, holding only one element and one read chunk in memory
+
+Decode errors raise ValueError whatever the backend.
+"""
+import codecs
+import dataclasses
+import json
+import mmap
+import os
+import re
+import threading
+from decimal import Decimal
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to ujson or the stdlib
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+BACKEND = "orjson" if orjson else "ujson" if ujson else "json"
+
+# Below this size a plain read is cheaper than setting up a mapping.
+MMAP_MIN_BYTES = 64 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+_MISSING = object()
+
+
+def _default(obj):
+    """Encode the types the stdlib-compatible Flask provider also accepts."""
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _std_dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+
+
+if orjson:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj) -> bytes:
+        try:
+            return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder handles
+            return _std_dumps(obj)
+
+    def loads(data):
+        return orjson.loads(data)
+
+elif ujson:
+    def dumps(obj) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False, default=_default).encode()
+
+    def loads(data):
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        return ujson.loads(data)
+
+else:
+    dumps = _std_dumps
+
+    def loads(data):
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        return json.loads(data)
+
+
+def dumps_text(obj) -> str:
+    """Compact JSON for `obj` as str (for text columns and headers)."""
+    return dumps(obj).decode()
+
+
+def read_json(path: Path | str, default=_MISSING):
+    """Decode a JSON file; return `default` (if given) when it does not exist."""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        if default is _MISSING:
+            raise
+        return default
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if orjson is None or size < MMAP_MIN_BYTES:
+            return loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            return orjson.loads(view)
+
+
+def write_json(path: Path | str, obj) -> os.stat_result:
+    """Atomically replace `path` with the compact JSON encoding of `obj`.
+
+    Returns the stat of the written file (taken before the rename, so it
+    describes this write even if another writer replaces `path` right after).
+    """
+    path = Path(path)
+    data = dumps(obj)
+    # Unique per writer, so concurrent saves never share a temp file.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            st = os.fstat(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return st
+
+
+def iter_json_array(path: Path | str, chunk_size: int = STREAM_CHUNK_BYTES):
+    """Yield the elements of a JSON array file without loading the whole file.
+
+    Elements are decoded incrementally from `chunk_size` reads, so memory
+    stays proportional to the largest element. Raises ValueError if the file
+    is not a well-formed array.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        buf, pos, eof, opened = "", 0, False, False
+
+        def more() -> None:
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+
+        while True:
+            pos = _SEPARATORS.match(buf, pos).end()
+            if pos == len(buf):
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                more()
+                continue
+            if not opened:
+                if buf[pos] != "[":
+                    raise ValueError(f"Expected a JSON array in {path}")
+                opened, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more()
+                continue
+            # A value ending exactly at the buffer end may be cut short (e.g. a number)
+            if end == len(buf) and not eof:
+                more()
+                continue
+            pos = end
+            yield value
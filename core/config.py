@@ -7,3 +7,122 @@ import os
 MODEL_NAME: str = os.getenv("AGENT_MODEL_NAME", "gemini-3-flash-preview")
 TEMPERATURE: float = float(os.getenv("AGENT_TEMPERATURE", "0.1"))
 SPECIALIST_TEMPERATURE: float = float(os.getenv("SPECIALIST_TEMPERATURE", "0.1"))
+SPECIALIST_MODEL: str = os.getenv("SPECIALIST_MODEL", MODEL_NAME)
+
+# Faster/cheaper tier used when load is high (unset disables downgrading).
+FAST_MODEL_NAME: str | None = os.getenv("FAST_MODEL_NAME") or None
+
+# Opt-in startup warm-up: build the agent and all specialists (and open their
+# connections) before /health reports ready. PRIME also sends a tiny request.
+WARMUP_ON_STARTUP: bool = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+WARMUP_PRIME_REQUEST: bool = os.getenv("WARMUP_PRIME_REQUEST", "false").lower() == "true"
+
+# Provider-side caching of static prompt prefixes: 'gemini', 'local' or 'off'.
+PROMPT_CACHE_BACKEND: str = os.getenv("PROMPT_CACHE_BACKEND", "off").lower()
+PROMPT_CACHE_TTL_SECONDS: int = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+PROMPT_CACHE_REFRESH_MARGIN_SECONDS: int = int(os.getenv("PROMPT_CACHE_REFRESH_MARGIN_SECONDS", "300"))
+
+# /chat admission control: global concurrency, bounded fair queue, per-user rate.
+CHAT_MAX_CONCURRENCY: int = int(os.getenv("CHAT_MAX_CONCURRENCY", "8"))
+CHAT_MAX_QUEUE: int = int(os.getenv("CHAT_MAX_QUEUE", "32"))
+CHAT_MAX_QUEUE_WAIT_SECONDS: float = float(os.getenv("CHAT_MAX_QUEUE_WAIT_SECONDS", "30"))
+CHAT_USER_RATE_PER_MINUTE: float = float(os.getenv("CHAT_USER_RATE_PER_MINUTE", "20"))
+CHAT_USER_BURST: float = float(os.getenv("CHAT_USER_BURST", "5"))
+
+# Specialist call resilience: hedge after the observed latency percentile
+# (within a budget of extra calls), and retry retryable errors with
+# jittered exponential backoff.
+HEDGING_ENABLED: bool = os.getenv("HEDGING_ENABLED", "true").lower() == "true"
+HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "90"))
+HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_BUDGET_RATIO: float = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))
+SPECIALIST_MAX_RETRIES: int = int(os.getenv("SPECIALIST_MAX_RETRIES", "2"))
+SPECIALIST_RETRY_BASE_SECONDS: float = float(os.getenv("SPECIALIST_RETRY_BASE_SECONDS", "0.5"))
+SPECIALIST_RETRY_MAX_SECONDS: float = float(os.getenv("SPECIALIST_RETRY_MAX_SECONDS", "8"))
+
+# Circuit breakers around Gemini (orchestrator, specialists, translation) and
+# Spitch. A breaker opens when, over the last BREAKER_WINDOW calls (at least
+# BREAKER_MIN_CALLS), the failure rate or the share of calls slower than
+# BREAKER_SLOW_CALL_SECONDS reaches its threshold. While open, calls fail
+# fast for BREAKER_OPEN_SECONDS, then a probe call decides whether to close.
+# At most BREAKER_MAX_CONCURRENT calls per dependency run at once.
+BREAKER_FAILURE_RATE: float = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_SLOW_CALL_SECONDS: float = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "30"))
+BREAKER_SLOW_CALL_RATE: float = float(os.getenv("BREAKER_SLOW_CALL_RATE", "0.8"))
+BREAKER_WINDOW: int = int(os.getenv("BREAKER_WINDOW", "20"))
+BREAKER_MIN_CALLS: int = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_OPEN_SECONDS: float = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_MAX_CONCURRENT: int = int(os.getenv("BREAKER_MAX_CONCURRENT", "16"))
+
+# Secondary model tried when a role's primary model fails or its breaker is
+# open (unset disables model fallback).
+FALLBACK_MODEL_NAME: str | None = os.getenv("FALLBACK_MODEL_NAME") or None
+
+# Request deadlines. Clients may send X-Request-Timeout (seconds) to shorten
+# an endpoint's default; values above REQUEST_TIMEOUT_MAX_SECONDS are capped.
+CHAT_TIMEOUT_SECONDS: float = float(os.getenv("CHAT_TIMEOUT_SECONDS", "60"))
+SPEECH_TIMEOUT_SECONDS: float = float(os.getenv("SPEECH_TIMEOUT_SECONDS", "30"))
+UPLOAD_TIMEOUT_SECONDS: float = float(os.getenv("UPLOAD_TIMEOUT_SECONDS", "120"))
+REQUEST_TIMEOUT_MAX_SECONDS: float = float(os.getenv("REQUEST_TIMEOUT_MAX_SECONDS", "300"))
+# Longest a single model call may take. Within a request each call is also
+# capped at the time left before the deadline.
+LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+
+# Durable background jobs (SQLite). Side effects of a chat (memory, risk
+# records, emergency alerts) run here after the response is returned.
+JOB_QUEUE_PATH: str = os.getenv("JOB_QUEUE_PATH", "jobs.db")
+JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETENTION_HOURS: float = float(os.getenv("JOB_RETENTION_HOURS", "168"))
+
+# Emergency alert email: pooled, authenticated SMTP connections shared by
+# concurrent sends. Idle connections are health-checked (NOOP) and recycled
+# after ALERT_SMTP_MAX_AGE_SECONDS; ALERT_SMTP_MIN_IDLE are kept open.
+ALERT_SMTP_POOL_SIZE: int = int(os.getenv("ALERT_SMTP_POOL_SIZE", "4"))
+ALERT_SMTP_MIN_IDLE: int = int(os.getenv("ALERT_SMTP_MIN_IDLE", "1"))
+ALERT_SMTP_HEALTH_CHECK_SECONDS: float = float(os.getenv("ALERT_SMTP_HEALTH_CHECK_SECONDS", "30"))
+ALERT_SMTP_MAX_AGE_SECONDS: float = float(os.getenv("ALERT_SMTP_MAX_AGE_SECONDS", "240"))
+ALERT_SMTP_TIMEOUT_SECONDS: float = float(os.getenv("ALERT_SMTP_TIMEOUT_SECONDS", "15"))
+ALERT_SMTP_MAX_RETRIES: int = int(os.getenv("ALERT_SMTP_MAX_RETRIES", "2"))
+
+# Emergency alert storm suppression: after an alert, further alerts for the
+# same user within the window are coalesced (unless severity escalates) and
+# reported in a digest at most every ALERT_DIGEST_INTERVAL_MINUTES.
+# A window of 0 disables suppression.
+ALERT_SUPPRESSION_WINDOW_MINUTES: float = float(os.getenv("ALERT_SUPPRESSION_WINDOW_MINUTES", "30"))
+ALERT_DIGEST_INTERVAL_MINUTES: float = float(os.getenv("ALERT_DIGEST_INTERVAL_MINUTES", "10"))
+
+# Response compression (gzip, or br when the brotli package is installed) for
+# JSON/text bodies of at least RESPONSE_COMPRESSION_MIN_BYTES. Level is 1-9.
+RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_COMPRESSION_LEVEL: int = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "6"))
+
+# Days of daily tracking summarized as trends in the chat context.
+TRACKING_TRENDS_DAYS: int = int(os.getenv("TRACKING_TRENDS_DAYS", "30"))
+
+# Document text extraction: PDF pages (in batches of DOCUMENT_PAGES_PER_TASK)
+# and large DOCX files are parsed in a pool of this many processes; 0
+# extracts in the request thread.
+DOCUMENT_EXTRACT_WORKERS: int = int(os.getenv("DOCUMENT_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+DOCUMENT_PAGES_PER_TASK: int = int(os.getenv("DOCUMENT_PAGES_PER_TASK", "8"))
+
+# Document fact extraction: text is split into chunks of FACT_CHUNK_CHARS
+# (overlapping by FACT_CHUNK_OVERLAP_CHARS) that are sent to the extractor
+# in parallel, at most FACT_EXTRACTION_CONCURRENCY at a time. Text past
+# DOCUMENT_FACTS_MAX_CHARS is not extracted from the document at all.
+FACT_CHUNK_CHARS: int = int(os.getenv("FACT_CHUNK_CHARS", "4000"))
+FACT_CHUNK_OVERLAP_CHARS: int = int(os.getenv("FACT_CHUNK_OVERLAP_CHARS", "300"))
+FACT_EXTRACTION_CONCURRENCY: int = int(os.getenv("FACT_EXTRACTION_CONCURRENCY", "4"))
+DOCUMENT_FACTS_MAX_CHARS: int = int(os.getenv("DOCUMENT_FACTS_MAX_CHARS", "200000"))
+
+# Content-addressed cache of extracted document text and facts, so a
+# re-uploaded document is neither parsed nor sent to the model again.
+# Least recently used entries are evicted beyond DOCUMENT_CACHE_MAX_MB (0 disables).
+DOCUMENT_CACHE_DIR: str = os.getenv("DOCUMENT_CACHE_DIR", "document_cache")
+DOCUMENT_CACHE_MAX_MB: float = float(os.getenv("DOCUMENT_CACHE_MAX_MB", "256"))
+
+# Uploaded documents are processed in the background on a queue of their
+# own (SQLite at UPLOAD_QUEUE_PATH), by UPLOAD_WORKERS threads.
+UPLOAD_QUEUE_PATH: str = os.getenv("UPLOAD_QUEUE_PATH", "uploads.db")
+UPLOAD_WORKERS: int = int(os.getenv("UPLOAD_WORKERS", "2"))
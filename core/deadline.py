@@ -0,0 +1,114 @@
+"""Per-request deadlines carried in a context variable.
+
+app.py starts a deadline for each request (from the X-Request-Timeout header
+or the endpoint's default). Everything below it — admission, main.run, the
+agent middleware, specialist calls, Spitch — reads the same deadline, checks
+the remaining budget before each expensive step and bounds its waits by it,
+so no work is started for a client that has already given up.
+
+Worker threads see the deadline as long as they run in a copy of the
+caller's context (contextvars.copy_context().run).
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before `step` could run or finish."""
+
+    def __init__(self, step: str):
+        super().__init__(f"Request deadline exceeded before {step}")
+        self.step = step
+
+
+def start(seconds: float) -> Token:
+    """Set a deadline `seconds` from now (never later than an enclosing one)."""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    return _deadline.set(deadline)
+
+
+def reset(token: Token) -> None:
+    _deadline.reset(token)
+
+
+@contextmanager
+def scope(seconds: float | None):
+    """Run a block under a deadline; None leaves the current deadline as is."""
+    if seconds is None:
+        yield
+        return
+    token = start(seconds)
+    try:
+        yield
+    finally:
+        reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline (may be negative), or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def check(step: str) -> float | None:
+    """Raise DeadlineExceeded if the deadline has passed; otherwise return remaining()."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(step)
+    return left
+
+
+def bounded(seconds: float | None) -> float | None:
+    """`seconds` capped at the remaining budget (either may be None for unbounded)."""
+    left = remaining()
+    if left is None:
+        return seconds
+    left = max(0.0, left)
+    return left if seconds is None else min(seconds, left)
+
+
+def call_timeout(step: str, limit: float | None) -> float | None:
+    """Timeout for one network call: `limit` capped at the remaining budget.
+
+    Raises DeadlineExceeded if the deadline has already passed.
+    """
+    check(step)
+    return bounded(limit)
+
+
+@contextmanager
+def expiring(step: str):
+    """Re-raise an error from a block as DeadlineExceeded once the deadline has passed.
+
+    A call sent with call_timeout() fails with its client's own timeout error
+    when the budget runs out; callers should see the deadline, not a model
+    failure to retry or count against a circuit breaker.
+    """
+    try:
+        yield
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(step) from e
+        raise
+
+
+def parse_timeout(header: str | None, default: float | None, maximum: float) -> float | None:
+    """Timeout in seconds for a request: the header value if valid, else `default`, capped at `maximum`."""
+    seconds = default
+    if header:
+        try:
+            value = float(header)
+            if value > 0:
+                seconds = value
+        except ValueError:
+            pass
+    return None if seconds is None else min(seconds, maximum)
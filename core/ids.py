@@ -0,0 +1,51 @@
+"""Time-ordered record IDs (ULID format).
+
+A ULID is 26 Crockford base32 characters: a 48-bit millisecond timestamp
+followed by 80 random bits. IDs sort lexicographically in creation order,
+and within one millisecond the random part is incremented, so IDs from
+this process are strictly increasing and never collide.
+"""
+import secrets
+import threading
+import time
+from datetime import datetime
+
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def new_id() -> str:
+    """Return a new ULID, greater than every ID previously returned by this process."""
+    global _last_ms, _last_random
+    with _lock:
+        ms = int(time.time() * 1000)
+        if ms <= _last_ms:
+            ms, random_part = _last_ms, _last_random + 1
+            if random_part >> _RANDOM_BITS:
+                ms, random_part = ms + 1, secrets.randbits(_RANDOM_BITS)
+        else:
+            random_part = secrets.randbits(_RANDOM_BITS)
+        _last_ms, _last_random = ms, random_part
+    return encode_id(ms, random_part)
+
+
+def encode_id(ms: int, random_part: int) -> str:
+    """ULID for a millisecond timestamp and 80 random bits (e.g. for backfilled records)."""
+    value = (ms << _RANDOM_BITS) | (random_part & ((1 << _RANDOM_BITS) - 1))
+    chars = []
+    for _ in range(26):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def id_datetime(record_id: str) -> datetime:
+    """Creation time encoded in a ULID (local time)."""
+    value = 0
+    for char in record_id[:10]:
+        value = value * 32 + _ALPHABET.index(char)
+    return datetime.fromtimestamp(value / 1000)
@@ -0,0 +1,58 @@
+"""Parsed-JSON cache for read-mostly store files.
+
+History files are rewritten in full on every save, so a file's
+(inode, mtime, size) identifies its content. Readers that only need a
+slice of a history (pagination) get the parsed list from here instead of
+re-parsing the whole file on every request; any write changes the stat
+key and the next read re-parses. Writers that go through
+`write_json_cached` leave their new content in the cache, so the next
+read-modify-write of the same file does not parse it again.
+
+Returned objects are shared: callers must not mutate them.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from core.codec import read_json, write_json
+
+MAX_CACHED_FILES = 256
+
+_cache: "OrderedDict[str, tuple[tuple, object]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def load_json_cached(path: Path, default=None):
+    """Parsed content of a JSON file, re-read only when the file changed."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return default
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    name = str(path)
+    with _lock:
+        hit = _cache.get(name)
+        if hit is not None and hit[0] == key:
+            _cache.move_to_end(name)
+            return hit[1]
+    data = read_json(path)
+    _put(name, key, data)
+    return data
+
+
+def write_json_cached(path: Path, data) -> None:
+    """Write `data` with codec.write_json and cache it as the file's content.
+
+    `data` becomes shared: the caller must not mutate it afterwards.
+    """
+    st = write_json(path, data)
+    _put(str(path), (st.st_ino, st.st_mtime_ns, st.st_size), data)
+
+
+def _put(name: str, key: tuple, data) -> None:
+    with _lock:
+        _cache[name] = (key, data)
+        _cache.move_to_end(name)
+        while len(_cache) > MAX_CACHED_FILES:
+            _cache.popitem(last=False)
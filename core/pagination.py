@@ -0,0 +1,77 @@
+"""Cursor pagination over time-ordered record lists.
+
+History stores append records in time order, so a page is found by binary
+search on (timestamp, id) instead of a scan. Pages walk backwards from
+the newest record; records within a page stay in chronological order, as
+the unpaginated endpoints returned them. The cursor is an opaque token
+encoding the (timestamp, id) of the oldest record already returned.
+"""
+import base64
+import binascii
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from core import codec
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 500
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not produced by encode_cursor."""
+
+
+def encode_cursor(timestamp: str, record_id: str) -> str:
+    raw = codec.dumps([timestamp, record_id])
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, record_id = codec.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(timestamp, str) or not isinstance(record_id, str):
+        raise InvalidCursor("Invalid cursor")
+    return timestamp, record_id
+
+
+def parse_limit(value: int | None) -> int:
+    """Clamp a requested page size to 1..MAX_PAGE_LIMIT (default DEFAULT_PAGE_LIMIT)."""
+    if value is None:
+        return DEFAULT_PAGE_LIMIT
+    return max(1, min(value, MAX_PAGE_LIMIT))
+
+
+def paginate(
+    records: list[dict],
+    id_field: str,
+    limit: int = DEFAULT_PAGE_LIMIT,
+    cursor: str | None = None,
+    days: int | None = None,
+) -> tuple[list[dict], str | None]:
+    """Return one page of `records` (sorted by timestamp) and the cursor for the next, older page.
+
+    Args:
+        records: Records with ISO 'timestamp' and `id_field`, oldest first.
+        id_field: Name of the record ID field ('entry_id', 'alert_id', ...).
+        limit: Page size.
+        cursor: Token from a previous page; None starts at the newest record.
+        days: Only include records from the last `days` days.
+    """
+    def key(record: dict) -> tuple[str, str]:
+        return record.get("timestamp", ""), str(record.get(id_field) or "")
+
+    end = len(records)
+    if cursor:
+        end = bisect_left(records, decode_cursor(cursor), key=key)
+    floor = 0
+    if days:
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        floor = bisect_left(records, (cutoff, ""), hi=end, key=key)
+    start = max(floor, end - limit)
+
+    page = records[start:end]
+    next_cursor = encode_cursor(*key(page[0])) if page and start > floor else None
+    return page, next_cursor
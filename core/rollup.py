@@ -0,0 +1,112 @@
+"""Per-user daily rollups kept next to a history file.
+
+A rollup is a small JSON document with one bucket of counters per day and
+a few bounded "recent records" rings. Stores update it on every save, so a
+summary for the last N days reads at most N buckets instead of the whole
+history.
+
+The rollup records the (size, mtime) of the history file it reflects. If
+the history changed without the rollup (a crash between the two writes, a
+restored backup, seeded data) or the rollup is missing, it is rebuilt from
+the history on the next read.
+
+Buckets are per calendar day, so a `days` window covers whole days: it
+starts at the beginning of the day `days` days ago.
+"""
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from core.codec import read_json, write_json
+from core.json_cache import load_json_cached
+
+ROLLUP_SUBDIR = "_rollups"
+ROLLUP_VERSION = 1
+
+
+def rollup_path(history_path: Path) -> Path:
+    return history_path.parent / ROLLUP_SUBDIR / history_path.name
+
+
+def _source_key(history_path: Path) -> list | None:
+    try:
+        st = os.stat(history_path)
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_rollup(history_path: Path, build: Callable[[list], dict], shared: bool = False) -> dict:
+    """Return the rollup for a history file, rebuilding it if stale or missing.
+
+    `build(records)` creates a rollup from the full list of records. With
+    `shared`, the rollup may come from the parsed-JSON cache and must not be
+    mutated; summaries read it this way, writers load a private copy.
+    """
+    source = _source_key(history_path)
+    path = rollup_path(history_path)
+    try:
+        rollup = load_json_cached(path, {}) if shared else read_json(path)
+        if rollup.get("version") == ROLLUP_VERSION and rollup.get("source") == source:
+            return rollup
+    except (FileNotFoundError, ValueError):
+        pass
+
+    records = []
+    if source is not None:
+        records = read_json(history_path)
+    rollup = build(records)
+    save_rollup(history_path, rollup)
+    return rollup
+
+
+def save_rollup(history_path: Path, rollup: dict) -> None:
+    """Write a rollup reflecting the current content of `history_path`."""
+    rollup["version"] = ROLLUP_VERSION
+    rollup["source"] = _source_key(history_path)
+    path = rollup_path(history_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, rollup)
+
+
+def bucket(rollup: dict, day: str) -> dict:
+    """The counters for one day ('YYYY-MM-DD'), created empty if needed."""
+    return rollup.setdefault("days", {}).setdefault(day, {})
+
+
+def increment(counters: dict, key: str, amount: int = 1) -> None:
+    counters[key] = counters.get(key, 0) + amount
+
+
+def push_recent(rollup: dict, ring: str, record: dict, size: int) -> None:
+    """Append a record to a bounded ring of the most recent records."""
+    items = rollup.setdefault(ring, [])
+    items.append(record)
+    del items[:-size]
+
+
+def window_start(days: int) -> datetime:
+    """Start of the window a `days` summary covers (midnight, `days` days ago)."""
+    return (datetime.now() - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def buckets_in_window(rollup: dict, days: int) -> list[dict]:
+    """Day buckets inside the window, reading at most `days` + 1 of them."""
+    start = window_start(days).date()
+    today = datetime.now().date()
+    all_days = rollup.get("days", {})
+    if len(all_days) <= days + 1:
+        return [b for d, b in all_days.items() if d >= start.isoformat()]
+    result = []
+    for offset in range((today - start).days + 1):
+        b = all_days.get((start + timedelta(days=offset)).isoformat())
+        if b:
+            result.append(b)
+    return result
+
+
+def recent_in_window(rollup: dict, ring: str, days: int) -> list[dict]:
+    """Ring entries inside the window, oldest first."""
+    cutoff = window_start(days).isoformat()
+    return [r for r in rollup.get(ring, []) if r.get("timestamp", "") >= cutoff]
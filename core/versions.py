@@ -0,0 +1,45 @@
+"""Version tokens for per-user stores, used to validate cached responses.
+
+A token changes whenever the data behind it changes, and reading it never
+reads the data itself:
+  - file stores are rewritten in full on every save, so a file's
+    (inode, mtime, size) is its version; this holds across processes
+  - in-process state (the chat checkpointer) has a `VersionCounter`
+    bumped on every write; its tokens include a per-process boot id, so
+    tokens from before a restart never match
+"""
+import os
+import threading
+import uuid
+from pathlib import Path
+
+BOOT_ID = uuid.uuid4().hex[:12]
+
+
+def file_version(path: Path | str) -> str:
+    """Version of a store file ('missing' when it does not exist)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return "missing"
+    return f"{st.st_ino:x}.{st.st_mtime_ns:x}.{st.st_size:x}"
+
+
+class VersionCounter:
+    """Per-key write counters for state that lives in this process."""
+
+    def __init__(self):
+        self._counts: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, key: str) -> None:
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def version(self, key: str) -> str:
+        with self._lock:
+            return f"{BOOT_ID}.{self._counts.get(key, 0)}"
+
+
+# Chat history per thread_id (the checkpointer is in-memory).
+thread_versions = VersionCounter()
@@ -1,10 +1,44 @@
-"""Daily health tracking system for storing and analyzing user updates."""
+"""Daily health tracking system for storing and analyzing user updates.
 
-import json
+Entries are kept in (timestamp, entry_id) order: pagination and batch
+merges binary-search on it, so both save paths insert in order rather than
+append, and no entry is ever timestamped later than the server's clock.
+Offline clients submit queued check-ins with `save_tracking_batch`, which
+merges them into the tail of the history in one write.
+"""
+
+import heapq
+import secrets
+import threading
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from core.codec import read_json, write_json
+from core.ids import encode_id, new_id
+from core.json_cache import load_json_cached, write_json_cached
+from core.pagination import DEFAULT_PAGE_LIMIT, paginate
+from core.versions import file_version
 
 TRACKING_DIR = "tracking"
+TRACKING_FIELDS = ("mood", "symptoms", "energy", "medications", "notes")
+MAX_BATCH_ENTRIES = 500
+MAX_CLIENT_ENTRY_ID_LENGTH = 128
+# Client clocks may run slightly ahead of ours; such timestamps are clamped to now.
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+_user_locks: dict[str, threading.Lock] = {}
+_user_locks_guard = threading.Lock()
+
+
+def _user_lock(user_id: str) -> threading.Lock:
+    """Serializes this process's read-modify-write saves of one user's history."""
+    with _user_locks_guard:
+        return _user_locks.setdefault(user_id, threading.Lock())
+
+
+def _order_key(entry: dict) -> tuple[str, str]:
+    return entry["timestamp"], entry.get("entry_id") or ""
 
 
 def _ensure_tracking_dir():
@@ -23,29 +57,130 @@ def save_daily_tracking(user_id: str, tracking_data: dict) -> dict:
         dict with saved entry including timestamp and entry_id
     """
     _ensure_tracking_dir()
+    path = Path(TRACKING_DIR) / f"{user_id}.json"
     
-    # Load existing entries
-    entries = load_tracking_history(user_id)
+    try:
+        with _user_lock(user_id):
+            # Shared parsed copy: extended into a new list, never mutated
+            entries = load_json_cached(path, default=[])
+            
+            # Create new entry
+            now = datetime.now()
+            entry = {
+                "entry_id": new_id(),
+                "timestamp": now.isoformat(timespec="microseconds"),
+                "date": now.strftime("%Y-%m-%d"),
+                **tracking_data
+            }
+            
+            # Normally the end; earlier only if the stored tail is ahead of the clock
+            at = bisect_right(entries, _order_key(entry), key=_order_key)
+            write_json_cached(path, [*entries[:at], entry, *entries[at:]])
+        return entry
+    except Exception as e:
+        print(f"Error saving tracking data for {user_id}: {e}")
+        return {}
+
+
+def parse_batch_entry(raw) -> dict:
+    """Validate one client-submitted entry and shape it like a stored entry.
+    
+    The entry needs an ISO 8601 `timestamp` (client time; converted to
+    server-local time if it has an offset) and may carry a
+    `client_entry_id` used to drop resubmissions.
+    
+    Raises:
+        ValueError: with a message describing the first problem found
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("entry must be an object")
+    
+    try:
+        timestamp = datetime.fromisoformat(str(raw.get("timestamp", "")))
+    except ValueError:
+        raise ValueError("timestamp must be an ISO 8601 date-time") from None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    now = datetime.now()
+    if timestamp > now + MAX_CLOCK_SKEW:
+        raise ValueError("timestamp is in the future")
+    # A slightly fast client clock must not place the entry after live entries saved later.
+    timestamp = min(timestamp, now)
+    
+    client_entry_id = raw.get("client_entry_id")
+    if client_entry_id is not None and (
+        not isinstance(client_entry_id, str) or not 0 < len(client_entry_id) <= MAX_CLIENT_ENTRY_ID_LENGTH
+    ):
+        raise ValueError(f"client_entry_id must be a string of 1-{MAX_CLIENT_ENTRY_ID_LENGTH} characters")
+    
+    for field in ("symptoms", "medications"):
+        value = raw.get(field, [])
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            raise ValueError(f"{field} must be a list of strings")
+    for field in ("mood", "energy", "notes"):
+        value = raw.get(field)
+        if value is not None and not isinstance(value, (str, int, float)):
+            raise ValueError(f"{field} must be a string or number")
     
-    # Create new entry
     entry = {
-        "entry_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
-        "timestamp": datetime.now().isoformat(),
-        "date": datetime.now().strftime("%Y-%m-%d"),
-        **tracking_data
+        # ID from the client time, so IDs follow timestamp order like live entries
+        "entry_id": encode_id(int(timestamp.timestamp() * 1000), secrets.randbits(80)),
+        "timestamp": timestamp.isoformat(timespec="microseconds"),
+        "date": timestamp.strftime("%Y-%m-%d"),
+        "mood": raw.get("mood"),
+        "symptoms": raw.get("symptoms", []),
+        "energy": raw.get("energy"),
+        "medications": raw.get("medications", []),
+        "notes": raw.get("notes", ""),
     }
+    if client_entry_id is not None:
+        entry["client_entry_id"] = client_entry_id
+    return entry
+
+
+def save_tracking_batch(user_id: str, entries: list[dict]) -> dict:
+    """Merge already validated entries (see parse_batch_entry) into a user's history.
     
-    entries.append(entry)
+    Entries are merged in time order, and any whose client_entry_id is
+    already stored (or repeated in the batch) is skipped. A stored copy of
+    a resubmitted entry is at most MAX_CLOCK_SKEW older than the
+    resubmission: both carry the same client timestamp unless it was ahead
+    of the server clock, in which case each was clamped to the server time
+    of its own submission. So only the stored entries from MAX_CLOCK_SKEW
+    before the batch's earliest timestamp (the tail) are searched. Merging
+    costs O(batch + tail), and the history is written once per batch.
     
-    # Save to file
+    Returns:
+        Dict with 'saved' (the stored entries) and 'duplicates' (skipped client_entry_ids)
+    """
+    _ensure_tracking_dir()
     path = Path(TRACKING_DIR) / f"{user_id}.json"
-    try:
-        with path.open("w") as f:
-            json.dump(entries, f, indent=2)
-        return entry
-    except Exception as e:
-        print(f"Error saving tracking data for {user_id}: {e}")
-        return {}
+    batch = sorted(entries, key=_order_key)
+    if not batch:
+        return {"saved": [], "duplicates": []}
+    
+    with _user_lock(user_id):
+        # Shared parsed copy: sliced into a new list, never mutated
+        records = load_json_cached(path, default=[])
+        since = datetime.fromisoformat(batch[0]["timestamp"]) - MAX_CLOCK_SKEW
+        split = bisect_left(records, (since.isoformat(timespec="microseconds"), ""), key=_order_key)
+        tail = records[split:]
+        
+        seen = {r["client_entry_id"] for r in tail if r.get("client_entry_id")}
+        saved, duplicates = [], []
+        for entry in batch:
+            client_entry_id = entry.get("client_entry_id")
+            if client_entry_id in seen:
+                duplicates.append(client_entry_id)
+                continue
+            if client_entry_id:
+                seen.add(client_entry_id)
+            saved.append(entry)
+        
+        if saved:
+            merged = heapq.merge(tail, saved, key=_order_key)
+            write_json_cached(path, [*records[:split], *merged])
+    return {"saved": saved, "duplicates": duplicates}
 
 
 def load_tracking_history(user_id: str, days: int = None) -> list:
@@ -62,11 +197,7 @@ def load_tracking_history(user_id: str, days: int = None) -> list:
     path = Path(TRACKING_DIR) / f"{user_id}.json"
     
     try:
-        if not path.exists():
-            return []
-        
-        with path.open() as f:
-            entries = json.load(f)
+        entries = read_json(path, default=[])
         
         # Filter by days if specified
         if days:
@@ -82,6 +213,27 @@ def load_tracking_history(user_id: str, days: int = None) -> list:
         return []
 
 
+def tracking_version(user_id: str) -> str:
+    """Version token of a user's tracking history; changes on every save."""
+    return file_version(Path(TRACKING_DIR) / f"{user_id}.json")
+
+
+def load_tracking_page(
+    user_id: str, limit: int = DEFAULT_PAGE_LIMIT, cursor: str | None = None, days: int = None
+) -> tuple[list, str | None]:
+    """Load one page of tracking history, newest page first.
+    
+    Returns:
+        (entries in chronological order, cursor for the next older page or None)
+    """
+    try:
+        records = load_json_cached(Path(TRACKING_DIR) / f"{user_id}.json", default=[])
+    except Exception as e:
+        print(f"Error loading tracking history for {user_id}: {e}")
+        records = []
+    return paginate(records, "entry_id", limit, cursor, days)
+
+
 def get_tracking_summary(user_id: str, days: int = 7) -> str:
     """Get a formatted summary of recent tracking data for AI context.
     
@@ -0,0 +1,154 @@
+"""Content-addressed disk cache for document text and extracted facts.
+
+Uploading the same document again should not parse it or call the fact
+extractor again. Entries are keyed by a SHA-256 over the input bytes and
+the version of the code that produced them:
+  - text: the raw upload bytes, EXTRACTOR_VERSION and the character budget
+  - facts: the extracted text, FACTS_VERSION and the chunking settings
+
+so a different file with identical text also reuses the facts. Bump a
+version whenever its extractor's output changes; stale entries are then
+never read and age out.
+
+Entries are small JSON files in DOCUMENT_CACHE_DIR. A hit refreshes the
+file's mtime, and once the directory grows past DOCUMENT_CACHE_MAX_MB the
+least recently used entries are deleted. Transient failures (extraction
+errors, partially extracted facts) are never cached.
+"""
+import hashlib
+import io
+import os
+import threading
+import time
+from pathlib import Path
+
+from core import codec
+from core.config import (
+    DOCUMENT_CACHE_DIR,
+    DOCUMENT_CACHE_MAX_MB,
+    FACT_CHUNK_CHARS,
+    FACT_CHUNK_OVERLAP_CHARS,
+)
+from document_extractor import extract_document_content
+
+EXTRACTOR_VERSION = "1"
+FACTS_VERSION = "1"
+
+# Eviction trims the cache to this fraction of its limit, so it does not
+# run again on the very next write.
+TRIM_TO = 0.9
+
+
+def content_key(kind: str, version: str, data: bytes, *params) -> str:
+    """SHA-256 key for `data` as input to `kind` at `version` with `params`."""
+    digest = hashlib.sha256(f"{kind}:{version}:{params!r}\0".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class DocumentCache:
+    """JSON entries on disk, evicted least recently used beyond `max_bytes`."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size: int | None = None  # bytes on disk, scanned on first write
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> dict | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            entry = codec.read_json(path)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            print(f"Discarding unreadable document cache entry {key}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            try:
+                old_size = path.stat().st_size  # an overwrite replaces these bytes
+            except FileNotFoundError:
+                old_size = 0
+            st = codec.write_json(path, {**entry, "cached_at": time.time()})
+            with self._lock:
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += st.st_size - old_size
+                if self._size > self.max_bytes:
+                    self._evict()
+        except Exception as e:
+            print(f"Error writing document cache entry {key}: {e}")
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:  # evicted by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> None:
+        """Delete least recently used entries down to TRIM_TO of the limit (lock held)."""
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes * TRIM_TO:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+        self._size = size
+
+
+document_cache = DocumentCache(DOCUMENT_CACHE_DIR, int(DOCUMENT_CACHE_MAX_MB * 1024 * 1024))
+
+
+def extract_document_content_cached(data: bytes, filename: str, max_chars: int | None = None) -> str:
+    """extract_document_content for raw upload bytes, reusing text extracted before."""
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    key = content_key("text", EXTRACTOR_VERSION, data, extension, max_chars)
+    entry = document_cache.get(key)
+    if entry is not None:
+        return entry["text"]
+
+    text = extract_document_content(io.BytesIO(data), filename, max_chars=max_chars)
+    if not text.startswith("[Error"):
+        document_cache.put(key, {"kind": "text", "text": text})
+    return text
+
+
+def facts_key(content: str) -> str:
+    return content_key("facts", FACTS_VERSION, content.encode(), FACT_CHUNK_CHARS, FACT_CHUNK_OVERLAP_CHARS)
+
+
+def get_cached_facts(content: str) -> list[str] | None:
+    """Facts extracted before from exactly this text, or None."""
+    entry = document_cache.get(facts_key(content))
+    return None if entry is None else entry["facts"]
+
+
+def cache_facts(content: str, facts: list[str]) -> None:
+    document_cache.put(facts_key(content), {"kind": "facts", "facts": facts})
@@ -1,85 +1,320 @@
-"""Extract text content from various document formats."""
+"""Extract text content from various document formats.
 
-import pypdf
-from docx import Document
+pypdf and python-docx are imported on first use so that importing this
+module (and therefore the app) stays cheap.
 
+PDF pages and large DOCX files are parsed in a shared process pool, so the
+CPU-bound work does not hold the request thread's GIL and long PDFs use
+several cores. `iter_document_text` yields text in reading order as it is
+extracted and stops once a `max_chars` budget is met: pages past the
+budget are never parsed. At most DOCUMENT_EXTRACT_WORKERS * 2 batches of
+DOCUMENT_PAGES_PER_TASK pages are in flight, so early termination wastes
+little work.
+"""
+import io
+import os
+import tempfile
+import threading
+from collections import deque
 
-def extract_text_from_pdf(file_stream) -> str:
+from core.config import DOCUMENT_EXTRACT_WORKERS, DOCUMENT_PAGES_PER_TASK
+
+# Smaller documents are parsed in the calling process: a pool round trip
+# costs more than the parsing.
+PARALLEL_MIN_PAGES = 8
+PARALLEL_MIN_DOCX_BYTES = 256 * 1024
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """The shared extraction process pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # forkserver children start from a clean process instead of
+            # forking the threaded server; spawn where it is unavailable.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(
+                max_workers=DOCUMENT_EXTRACT_WORKERS, mp_context=multiprocessing.get_context(method)
+            )
+        return _pool
+
+
+def _discard_pool(pool) -> None:
+    """Drop a broken pool so the next extraction starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _use_pool() -> bool:
+    return DOCUMENT_EXTRACT_WORKERS > 0
+
+
+# ── Worker functions (run in the pool) ──
+
+# The PDF this worker last opened: consecutive batches of one document
+# usually land on the same worker, and parsing the file again is costly.
+# Dropped after the batch that ends the document or meets the budget, so an
+# idle worker does not keep a parsed PDF alive.
+_worker_pdf = (None, None)
+
+
+def _open_pdf(path: str):
+    global _worker_pdf
+    st = os.stat(path)
+    key = (path, st.st_ino, st.st_mtime_ns)
+    cached_key, reader = _worker_pdf
+    if cached_key != key:
+        import pypdf
+
+        reader = pypdf.PdfReader(path)
+        _worker_pdf = (key, reader)
+    return reader
+
+
+def _pdf_pages_text(path: str, start: int, stop: int, max_chars: int | None) -> list[tuple[int, str]]:
+    """(page number, text) for pages [start, stop), stopping once max_chars is reached.
+
+    Returns no pages if the file is gone: the caller stopped early and
+    deleted it, so nobody reads this batch's result.
+    """
+    global _worker_pdf
+    try:
+        reader = _open_pdf(path)
+    except FileNotFoundError:
+        _worker_pdf = (None, None)
+        return []
+    pages, chars, done = [], 0, stop >= len(reader.pages)
+    for index in range(start, stop):
+        text = reader.pages[index].extract_text().strip()
+        pages.append((index + 1, text))
+        chars += len(text)
+        if max_chars is not None and chars >= max_chars:
+            done = True
+            break
+    if done:
+        _worker_pdf = (None, None)
+    return pages
+
+
+def _docx_parts(source, max_chars: int | None) -> list[str]:
+    """Paragraphs, then table rows, of a DOCX, stopping once max_chars is reached."""
+    from docx import Document
+
+    doc = Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+    parts, chars = [], 0
+
+    def texts():
+        for para in doc.paragraphs:
+            yield para.text.strip()
+        for table in doc.tables:
+            for row in table.rows:
+                yield " | ".join(cell.text.strip() for cell in row.cells)
+
+    for text in texts():
+        if not text.strip():
+            continue
+        parts.append(text)
+        chars += len(text)
+        if max_chars is not None and chars >= max_chars:
+            break
+    return parts
+
+
+# ── Streaming extraction ──
+
+def _iter_pdf_pages_parallel(path: str, page_count: int, max_chars: int | None):
+    """Yield (page number, text) in order from batches extracted in the pool."""
+    pool = _get_pool()
+    batches = iter(range(0, page_count, DOCUMENT_PAGES_PER_TASK))
+    in_flight = deque()
+
+    def submit_next() -> None:
+        start = next(batches, None)
+        if start is not None:
+            stop = min(start + DOCUMENT_PAGES_PER_TASK, page_count)
+            in_flight.append(pool.submit(_pdf_pages_text, path, start, stop, max_chars))
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    try:
+        for _ in range(DOCUMENT_EXTRACT_WORKERS * 2):
+            submit_next()
+        while in_flight:
+            pages = in_flight.popleft().result()
+            submit_next()
+            yield from pages
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+    finally:
+        # Reached when the caller stops early: drop the batches not started yet.
+        for future in in_flight:
+            future.cancel()
+
+
+def _iter_pdf_parts(file_stream, max_chars: int | None):
+    import pypdf
+
+    data = file_stream.read()
+    reader = pypdf.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+
+    if not _use_pool() or page_count < PARALLEL_MIN_PAGES:
+        pages = ((n, page.extract_text().strip()) for n, page in enumerate(reader.pages, 1))
+        for page_num, text in pages:
+            if text:
+                yield f"--- Page {page_num} ---\n{text}"
+        return
+
+    # Workers open the PDF from disk instead of receiving its bytes with every batch.
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        for page_num, text in _iter_pdf_pages_parallel(tmp.name, page_count, max_chars):
+            if text:
+                yield f"--- Page {page_num} ---\n{text}"
+    finally:
+        os.unlink(tmp.name)
+
+
+def _iter_docx_parts(file_stream, max_chars: int | None):
+    data = file_stream.read()
+    if not _use_pool() or len(data) < PARALLEL_MIN_DOCX_BYTES:
+        yield from _docx_parts(data, max_chars)
+        return
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    pool = _get_pool()
+    try:
+        yield from pool.submit(_docx_parts, data, max_chars).result()
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
+
+
+def _iter_txt_parts(file_stream, max_chars: int | None):
+    content = file_stream.read()
+    if isinstance(content, bytes):
+        for encoding in ['utf-8', 'latin-1', 'cp1252']:
+            try:
+                content = content.decode(encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            raise ValueError("Unable to decode text file")
+    yield content
+
+
+def _budgeted(parts, max_chars: int | None):
+    """Pass parts through until max_chars characters have been yielded."""
+    if max_chars is None:
+        yield from parts
+        return
+    remaining = max_chars
+    try:
+        for part in parts:
+            if len(part) >= remaining:
+                yield part[:remaining]
+                return
+            remaining -= len(part)
+            yield part
+    finally:
+        parts.close()
+
+
+def iter_document_text(file_stream, filename: str, max_chars: int | None = None):
+    """
+    Yield a document's text in reading order as it is extracted.
+
+    PDFs yield one "--- Page N ---" part per page with text, DOCX files one
+    part per paragraph or table row, text files a single part. Extraction
+    stops once `max_chars` characters (not counting separators) have been
+    yielded; the last part is cut to fit.
+
+    Args:
+        file_stream: File-like object (from request.files)
+        filename: Original filename with extension
+        max_chars: Character budget, or None for the whole document
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    file_ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    file_stream.seek(0)
+
+    if file_ext in ['txt', 'md']:
+        parts = _iter_txt_parts(file_stream, max_chars)
+    elif file_ext == 'pdf':
+        parts = _iter_pdf_parts(file_stream, max_chars)
+    elif file_ext == 'docx':
+        parts = _iter_docx_parts(file_stream, max_chars)
+    else:
+        raise ValueError(f"Unsupported file type: {file_ext}")
+    yield from _budgeted(parts, max_chars)
+
+
+def extract_text_from_pdf(file_stream, max_chars: int | None = None) -> str:
     """Extract text from a PDF file stream."""
     try:
-        pdf_reader = pypdf.PdfReader(file_stream)
-        text_parts = []
-        
-        for page_num, page in enumerate(pdf_reader.pages, 1):
-            text = page.extract_text()
-            if text.strip():
-                text_parts.append(f"--- Page {page_num} ---\n{text.strip()}")
-        
+        text_parts = list(_budgeted(_iter_pdf_parts(file_stream, max_chars), max_chars))
         return "\n\n".join(text_parts) if text_parts else "[PDF content could not be extracted]"
     except Exception as e:
         return f"[Error extracting PDF: {str(e)}]"
 
 
-def extract_text_from_docx(file_stream) -> str:
+def extract_text_from_docx(file_stream, max_chars: int | None = None) -> str:
     """Extract text from a Word DOCX file stream."""
     try:
-        doc = Document(file_stream)
-        paragraphs = []
-        
-        for para in doc.paragraphs:
-            text = para.text.strip()
-            if text:
-                paragraphs.append(text)
-        
-        # Also extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = " | ".join(cell.text.strip() for cell in row.cells)
-                if row_text.strip():
-                    paragraphs.append(row_text)
-        
+        paragraphs = list(_budgeted(_iter_docx_parts(file_stream, max_chars), max_chars))
         return "\n\n".join(paragraphs) if paragraphs else "[Document appears to be empty]"
     except Exception as e:
         return f"[Error extracting DOCX: {str(e)}]"
 
 
-def extract_text_from_txt(file_stream) -> str:
+def extract_text_from_txt(file_stream, max_chars: int | None = None) -> str:
     """Extract text from a plain text file stream."""
     try:
-        content = file_stream.read()
-        if isinstance(content, bytes):
-            for encoding in ['utf-8', 'latin-1', 'cp1252']:
-                try:
-                    return content.decode(encoding)
-                except UnicodeDecodeError:
-                    continue
-            return "[Error: Unable to decode text file]"
-        return content
+        return "".join(_budgeted(_iter_txt_parts(file_stream, max_chars), max_chars))
+    except ValueError:
+        return "[Error: Unable to decode text file]"
     except Exception as e:
         return f"[Error reading text file: {str(e)}]"
 
 
-def extract_document_content(file_stream, filename: str) -> str:
+def extract_document_content(file_stream, filename: str, max_chars: int | None = None) -> str:
     """
     Extract text content from a document based on its file extension.
-    
+
     Args:
         file_stream: File-like object (from request.files)
         filename: Original filename with extension
-        
+        max_chars: Stop extracting once this many characters are read
+            (None extracts the whole document)
+
     Returns:
         Extracted text content as string
     """
     file_ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
-    
+
     file_stream.seek(0)
-    
+
     if file_ext in ['txt', 'md']:
-        return extract_text_from_txt(file_stream)
+        return extract_text_from_txt(file_stream, max_chars)
     elif file_ext == 'pdf':
-        return extract_text_from_pdf(file_stream)
+        return extract_text_from_pdf(file_stream, max_chars)
     elif file_ext in ['docx']:
-        return extract_text_from_docx(file_stream)
+        return extract_text_from_docx(file_stream, max_chars)
     elif file_ext == 'doc':
         return "[Legacy .doc format not supported. Please save as .docx or .pdf]"
     else:
@@ -1,10 +1,15 @@
-"""Emergency alert system for notifying emergency contacts via email."""
+"""Emergency alert system for notifying emergency contacts via email.
 
-import os
-import smtplib
+The alert is rendered once and sent to every contact concurrently over
+pooled SMTP connections (services.alert_dispatcher).
+"""
+
+from dataclasses import dataclass
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
+from string import Template
+from services.alert_dispatcher import get_alert_dispatcher
 from users import get_emergency_contacts, has_emergency_consent
 
 
@@ -45,18 +50,24 @@ def send_emergency_alert(username: str, alert_data: dict) -> tuple[bool, str]:
     if not emails_to_notify:
         return False, "No emergency contact emails configured"
     
-    # Send emails
+    dispatcher = get_alert_dispatcher()
+    settings = dispatcher.pool.settings
+    if not settings.configured:
+        print("Email credentials not configured (SMTP_EMAIL, SMTP_PASSWORD)")
+        return False, "Failed to send emergency alerts"
+    
+    # Render once, then send to every contact at the same time
+    rendered = render_alert(username, alert_data, settings.email)
+    messages = [rendered.message_for(c["email"], c["name"], c["type"]) for c in emails_to_notify]
+    errors = dispatcher.send_all(messages)
+    
     sent_count = 0
-    for contact in emails_to_notify:
-        success = _send_email(
-            to_email=contact["email"],
-            to_name=contact["name"],
-            username=username,
-            alert_data=alert_data,
-            contact_type=contact["type"]
-        )
-        if success:
+    for contact, error in zip(emails_to_notify, errors):
+        if error is None:
+            print(f"Emergency alert sent to {contact['email']}")
             sent_count += 1
+        else:
+            print(f"Failed to send email to {contact['email']}: {error}")
     
     if sent_count > 0:
         return True, f"Emergency alert sent to {sent_count} contact(s)"
@@ -64,40 +75,62 @@ def send_emergency_alert(username: str, alert_data: dict) -> tuple[bool, str]:
         return False, "Failed to send emergency alerts"
 
 
-def _send_email(to_email: str, to_name: str, username: str, alert_data: dict, contact_type: str) -> bool:
-    """Send individual emergency email.
-    
-    Returns:
-        bool indicating success
-    """
-    # Email configuration from environment variables
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    sender_email = os.getenv("SMTP_EMAIL")
-    sender_password = os.getenv("SMTP_PASSWORD")
-    
-    if not sender_email or not sender_password:
-        print("Email credentials not configured (SMTP_EMAIL, SMTP_PASSWORD)")
-        return False
-    
-    try:
-        # Create message
+# Per-recipient parts of an otherwise identical alert, filled in with
+# string.Template. Every other value is passed through _literal() first, so
+# user text (symptoms are the user's own message) cannot create a slot.
+NAME_SLOT = "${name}"
+ROLE_SLOT = "${role}"
+
+ROLE_LINES = {
+    "doctor": "As their designated doctor, please review this case immediately.",
+    "loved_one": "As their emergency contact, please check on them as soon as possible.",
+}
+ROLE_LINES_HTML = {
+    "doctor": "📋 As their designated doctor, please review this case immediately.",
+    "loved_one": "❤️ As their emergency contact, please check on them as soon as possible.",
+}
+
+
+@dataclass(frozen=True)
+class RenderedAlert:
+    """An alert email rendered once; only the greeting and role line vary per recipient."""
+
+    subject: str
+    sender: str
+    text_body: Template
+    html_body: Template
+
+    def message_for(self, to_email: str, to_name: str, contact_type: str) -> MIMEMultipart:
+        role = "doctor" if contact_type == "doctor" else "loved_one"
         msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"⚠️ URGENT: Health Alert for {username}"
-        msg["From"] = f"ZionX Health Alert <{sender_email}>"
+        msg["Subject"] = self.subject
+        msg["From"] = self.sender
         msg["To"] = to_email
-        
-        # Email body
-        severity = alert_data.get("severity", "high")
-        symptoms = alert_data.get("symptoms", "Not specified")
-        ai_assessment = alert_data.get("ai_assessment", "User requires immediate medical attention")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        location = alert_data.get("user_location", "Not provided")
-        
-        text_body = f"""
+        # Attach both plain text and HTML versions
+        msg.attach(MIMEText(self.text_body.substitute(name=to_name, role=ROLE_LINES[role]), "plain"))
+        msg.attach(MIMEText(self.html_body.substitute(name=to_name, role=ROLE_LINES_HTML[role]), "html"))
+        return msg
+
+
+def _literal(value) -> str:
+    """A value as text that string.Template leaves unchanged ("$" is doubled)."""
+    return str(value).replace("$", "$$")
+
+
+def render_alert(username: str, alert_data: dict, sender_email: str) -> RenderedAlert:
+    """Render the alert email for all of a user's contacts at once."""
+    subject_name = username
+    username = _literal(username)
+    severity = _literal(alert_data.get("severity", "high"))
+    symptoms = _literal(alert_data.get("symptoms", "Not specified"))
+    ai_assessment = _literal(alert_data.get("ai_assessment", "User requires immediate medical attention"))
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    location = _literal(alert_data.get("user_location", "Not provided"))
+
+    text_body = f"""
 URGENT HEALTH ALERT
 
-Dear {to_name},
+Dear {NAME_SLOT},
 
 This is an automated emergency alert from ZionX Health Platform.
 
@@ -113,7 +146,7 @@ AI HEALTH ASSESSMENT:
 
 LOCATION: {location}
 
-{'As their designated doctor, please review this case immediately.' if contact_type == 'doctor' else 'As their emergency contact, please check on them as soon as possible.'}
+{ROLE_SLOT}
 
 This alert was sent because {username} has given prior consent to notify you in emergency situations.
 
@@ -123,14 +156,14 @@ If this is a life-threatening emergency, please call emergency services (911 or
 ZionX Health Platform
 Automated Emergency Alert System
 """
-        
-        html_body = f"""
+
+    html_body = f"""
 <html>
 <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
     <div style="max-width: 600px; margin: 0 auto; padding: 20px; border: 3px solid #dc2626; border-radius: 10px; background-color: #fef2f2;">
         <h2 style="color: #dc2626; margin-top: 0;">⚠️ URGENT HEALTH ALERT</h2>
         
-        <p>Dear <strong>{to_name}</strong>,</p>
+        <p>Dear <strong>{NAME_SLOT}</strong>,</p>
         
         <p>This is an automated emergency alert from <strong>ZionX Health Platform</strong>.</p>
         
@@ -168,7 +201,7 @@ Automated Emergency Alert System
         
         <div style="background: #fef2f2; border-left: 4px solid #dc2626; padding: 15px; margin: 15px 0;">
             <p style="margin: 0; font-weight: bold;">
-                {'📋 As their designated doctor, please review this case immediately.' if contact_type == 'doctor' else '❤️ As their emergency contact, please check on them as soon as possible.'}
+                {ROLE_SLOT}
             </p>
         </div>
         
@@ -192,25 +225,13 @@ Automated Emergency Alert System
 </body>
 </html>
 """
-        
-        # Attach both plain text and HTML versions
-        part1 = MIMEText(text_body, "plain")
-        part2 = MIMEText(html_body, "html")
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        # Send email
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-        
-        print(f"Emergency alert sent to {to_email}")
-        return True
-        
-    except Exception as e:
-        print(f"Failed to send email to {to_email}: {e}")
-        return False
+
+    return RenderedAlert(
+        subject=f"⚠️ URGENT: Health Alert for {subject_name}",
+        sender=f"ZionX Health Alert <{sender_email}>",
+        text_body=Template(text_body),
+        html_body=Template(html_body),
+    )
 
 
 def should_trigger_emergency_alert(risk_level: str, urgency: str) -> bool:
@@ -0,0 +1,147 @@
+"""Streaming NDJSON export of a user's complete health record.
+
+`export_stream(user)` yields the export as newline-delimited JSON, one
+record per line, section by section:
+
+    {"type": "export", "user_id": ..., "format": "zionx-export/1", ...}
+    {"type": "profile", "cursor": "...", "data": {...}}
+    {"type": "facts", "cursor": "...", "data": {"fact": "..."}}
+    ... threads, tracking, risk, alerts ...
+    {"type": "end", "counts": {"profile": 1, "facts": 12, ...}}
+
+History files are read with codec.iter_json_array and lines are sent in
+small batches, so memory stays flat whatever the history size.
+
+Every record line carries a cursor. A client that drops mid-stream passes
+the last cursor it received to resume right after that record. In the
+time-ordered sections (tracking, risk, alerts) the cursor holds the
+record's (timestamp, id), so records inserted into a history between
+attempts (offline tracking sync merges older entries into the middle)
+never shift the resume point: nothing is sent twice or skipped. A record
+inserted before the cursor is not part of the resumed export; a new export
+includes it. The other sections are append-only and resume by position.
+"""
+import base64
+import binascii
+from datetime import datetime
+from pathlib import Path
+
+from alert_history import ALERTS_DIR
+from core import codec
+from core.pagination import InvalidCursor
+from daily_tracking import TRACKING_DIR
+from memory import MEMORY_DIR
+from risk_monitor import RISK_DIR
+from thread_manager import THREADS_DIR
+from users import get_user_info
+
+EXPORT_FORMAT = "zionx-export/1"
+SECTIONS = ("profile", "facts", "threads", "tracking", "risk", "alerts")
+# Sections resumed by (timestamp, id) instead of position, with their id field.
+KEYED_SECTIONS = {"tracking": "entry_id", "risk": "assessment_id", "alerts": "alert_id"}
+
+# Lines are grouped into chunks of about this size before being sent.
+BATCH_BYTES = 32 * 1024
+
+
+def encode_export_cursor(section: int, *position) -> str:
+    """Cursor for a record: its index, or its (timestamp, id) in a keyed section."""
+    return base64.urlsafe_b64encode(codec.dumps([section, *position])).decode().rstrip("=")
+
+
+def decode_export_cursor(cursor: str) -> tuple[int, int | tuple[str, str]]:
+    """(section number, record index or (timestamp, id)) of an export cursor; raises InvalidCursor."""
+    try:
+        section, *position = codec.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid export cursor") from e
+    if not (isinstance(section, int) and 0 <= section < len(SECTIONS)):
+        raise InvalidCursor("Invalid export cursor")
+    if SECTIONS[section] in KEYED_SECTIONS:
+        if len(position) != 2 or not all(isinstance(p, str) for p in position):
+            raise InvalidCursor("Invalid export cursor")
+        return section, tuple(position)
+    if len(position) != 1 or not isinstance(position[0], int):
+        raise InvalidCursor("Invalid export cursor")
+    return section, position[0]
+
+
+def _array_records(path: Path):
+    if path.exists():
+        yield from codec.iter_json_array(path)
+
+
+def _records(user: dict, section: str):
+    """The records of one section, in a stable order."""
+    user_id = user["user_id"]
+    if section == "profile":
+        info = get_user_info(user["username"])
+        if info:
+            yield info
+    elif section == "facts":
+        path = Path(MEMORY_DIR) / f"{user_id}.txt"
+        if path.exists():
+            with path.open() as f:
+                for line in f:
+                    if line.strip():
+                        yield {"fact": line.strip()}
+    elif section == "threads":
+        threads = codec.read_json(Path(THREADS_DIR) / f"{user_id}_threads.json", default={})
+        yield from threads.values()
+    elif section == "tracking":
+        yield from _array_records(Path(TRACKING_DIR) / f"{user_id}.json")
+    elif section == "risk":
+        yield from _array_records(Path(RISK_DIR) / f"{user_id}.json")
+    elif section == "alerts":
+        yield from _array_records(Path(ALERTS_DIR) / f"{user_id}.json")
+
+
+def _lines(user: dict, cursor: str | None):
+    start_section, start_position = decode_export_cursor(cursor) if cursor else (0, None)
+    yield codec.dumps({
+        "type": "export",
+        "format": EXPORT_FORMAT,
+        "user_id": user["user_id"],
+        "generated_at": datetime.now().isoformat(),
+        "resumed_from": cursor,
+    })
+
+    counts = {}
+    for number, section in enumerate(SECTIONS):
+        if number < start_section:
+            continue
+        after = start_position if number == start_section else None
+        if isinstance(after, int):
+            after = (after,)
+        id_field = KEYED_SECTIONS.get(section)
+        counts[section] = 0
+        try:
+            for index, record in enumerate(_records(user, section)):
+                position = (record.get("timestamp", ""), str(record.get(id_field) or "")) if id_field else (index,)
+                if after is not None and position <= after:
+                    continue
+                cursor = encode_export_cursor(number, *position)
+                yield codec.dumps({"type": section, "cursor": cursor, "data": record})
+                counts[section] += 1
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band and go on.
+            print(f"Error exporting {section} for {user['user_id']}: {e}")
+            yield codec.dumps({"type": "error", "section": section, "error": str(e)})
+    yield codec.dumps({"type": "end", "counts": counts})
+
+
+def export_stream(user: dict, cursor: str | None = None):
+    """Yield the NDJSON export of `user` in chunks, resuming after `cursor` if given.
+
+    Validate `cursor` with decode_export_cursor before streaming: an invalid
+    cursor raises InvalidCursor on the first iteration.
+    """
+    batch, size = [], 0
+    for line in _lines(user, cursor):
+        batch.append(line)
+        size += len(line) + 1
+        if size >= BATCH_BYTES:
+            yield b"\n".join(batch) + b"\n"
+            batch, size = [], 0
+    if batch:
+        yield b"\n".join(batch) + b"\n"
@@ -0,0 +1,165 @@
+"""Conditional GETs, response compression and JSON encoding for the Flask app.
+
+`conditional(version_fn)` wraps a read endpoint with a strong ETag built
+from store version tokens (core.versions). The view only runs when the
+client's If-None-Match does not match; otherwise the response is a 304 and
+the store is never read.
+
+`init_compression(app)` gzip- or brotli-encodes JSON and text responses
+above a size threshold, negotiated per request from Accept-Encoding.
+Brotli is used when the `brotli` package is installed. Streamed responses
+are left alone; `gzip_stream` compresses a stream as it is generated. A compressed
+response's ETag gets an encoding suffix ("<tag>-gzip"), and `conditional`
+accepts any suffix of its own tag.
+
+`CodecJSONProvider` encodes responses and decodes request bodies with
+core.codec instead of the stdlib encoder: compact bytes, keys in insertion
+order.
+"""
+import gzip
+import hashlib
+import zlib
+from functools import wraps
+
+from flask import make_response, request
+from flask.json.provider import JSONProvider
+
+from core import codec
+from core.config import RESPONSE_COMPRESSION_LEVEL, RESPONSE_COMPRESSION_MIN_BYTES
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+ENCODING_SUFFIXES = ("", "-gzip", "-br")
+
+_brotli = None
+
+
+def _load_brotli():
+    """The brotli module, or False when it is not installed (checked once)."""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli
+
+
+def compute_etag(*parts) -> str:
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def _matching_tag(tag: str) -> str | None:
+    """The variant of `tag` (with its encoding suffix) the client already has, if any."""
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+    # If-None-Match uses weak comparison (proxies may weaken a tag they re-encode)
+    for suffix in ENCODING_SUFFIXES:
+        if if_none_match.contains_weak(f"{tag}{suffix}"):
+            return f"{tag}{suffix}"
+    return None
+
+
+def conditional(version_fn):
+    """Serve a GET view with an ETag derived from `version_fn(*args, **kwargs)`.
+
+    `version_fn` receives the view's arguments and returns the version
+    tokens of everything the response depends on. The tag also covers the
+    path and query string, so each page or filter is cached separately.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tag = compute_etag(
+                request.path, sorted(request.args.items(multi=True)), version_fn(*args, **kwargs)
+            )
+            headers = {"ETag": f'"{tag}"', "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+            matched = _matching_tag(tag)
+            if matched:
+                return "", 304, {**headers, "ETag": f'"{matched}"'}
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.headers.update(headers)
+            return response
+        return wrapper
+    return decorator
+
+
+def _choose_encoding() -> str | None:
+    accepted = request.accept_encodings
+    if accepted["br"] and _load_brotli():
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def compress_response(response):
+    """after_request hook: compress the body if the client accepts it and it is worth it."""
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or not (response.mimetype or "").startswith(COMPRESSIBLE_TYPES)
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < RESPONSE_COMPRESSION_MIN_BYTES:
+        return response
+
+    if encoding == "br":
+        # Brotli quality 0-11; map the gzip-style 1-9 level onto it.
+        quality = min(11, max(0, round(RESPONSE_COMPRESSION_LEVEL * 11 / 9)))
+        data = _brotli.compress(body, quality=quality)
+    else:
+        data = gzip.compress(body, compresslevel=RESPONSE_COMPRESSION_LEVEL, mtime=0)
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+
+def gzip_stream(chunks):
+    """Gzip a stream of byte chunks on the fly.
+
+    Each chunk is sync-flushed, so a client can decode everything received
+    so far if the connection drops.
+    """
+    compressor = zlib.compressobj(RESPONSE_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def init_compression(app) -> None:
+    app.after_request(compress_response)
+
+
+class CodecJSONProvider(JSONProvider):
+    """Flask JSON provider backed by core.codec."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs) -> str:
+        return codec.dumps_text(obj)
+
+    def loads(self, s, **kwargs):
+        return codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(codec.dumps(obj), mimetype=self.mimetype)
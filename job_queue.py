@@ -0,0 +1,311 @@
+"""Durable background job queue backed by SQLite.
+
+Jobs survive restarts and are delivered at least once:
+  - `enqueue` commits the job before returning
+  - a worker claims a job by leasing it for `lease_seconds`; a job whose
+    worker died is picked up again once the lease expires
+  - a handler that raises is retried with exponential backoff until
+    `max_attempts`, after which the job is marked failed
+
+Higher `priority` runs first, and `reserved_workers` threads only take
+high-priority jobs, so emergency alerts never wait behind routine
+persistence. Jobs sharing a `lane` (e.g. writes to one user's history file)
+run one at a time.
+
+Handlers are registered per job kind with `register(kind, handler)`;
+`handler(payload, job)` may return a JSON-serializable result, stored on
+the job, and may report progress with `set_progress`.
+"""
+import contextvars
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+from core import codec
+from core.config import (
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_QUEUE_PATH,
+    JOB_RETENTION_HOURS,
+    JOB_WORKERS,
+)
+
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 300
+PRUNE_INTERVAL_SECONDS = 600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    lane TEXT,
+    user_id TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    locked_until REAL,
+    progress REAL,
+    result TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, id);
+CREATE INDEX IF NOT EXISTS jobs_user ON jobs (user_id, kind, status);
+CREATE INDEX IF NOT EXISTS jobs_lane ON jobs (lane, status);
+"""
+
+
+class JobQueue:
+    """SQLite-backed job queue with a pool of worker threads."""
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 2,
+        reserved_workers: int = 1,
+        lease_seconds: float = 300,
+        max_attempts: int = 5,
+        retention_hours: float = 168,
+    ):
+        # Absolute, so connections opened after a chdir still reach the same database.
+        self.path = os.path.abspath(path)
+        self.workers = max(workers, 1)
+        self.reserved_workers = min(reserved_workers, self.workers)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_hours * 3600
+
+        self._handlers: dict[str, Callable[[dict, dict], object]] = {}
+        self._local = threading.local()
+        self._wakeup = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._last_prune = 0.0
+
+    # ── Public API ──
+
+    def register(self, kind: str, handler) -> None:
+        """Run `handler(payload, job)` for jobs of this kind."""
+        self._handlers[kind] = handler
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict,
+        priority: int = PRIORITY_NORMAL,
+        user_id: str | None = None,
+        lane: str | None = None,
+        max_attempts: int | None = None,
+        delay_seconds: float = 0,
+    ) -> int:
+        """Persist a job (to run after `delay_seconds`) and wake a worker; returns the job id."""
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT INTO jobs (kind, payload, priority, lane, user_id, max_attempts, run_after, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                kind, codec.dumps_text(payload), priority, lane, user_id, max_attempts or self.max_attempts,
+                now + delay_seconds, now, now,
+            ),
+        )
+        self.start()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        return cur.lastrowid
+
+    def get(self, job_id: int) -> dict | None:
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def unfinished(self, kind: str, user_id: str) -> list[dict]:
+        """A user's pending or running jobs of one kind, oldest first."""
+        rows = self._conn().execute(
+            "SELECT * FROM jobs WHERE user_id = ? AND kind = ? AND status IN (?, ?) ORDER BY id",
+            (user_id, kind, PENDING, RUNNING),
+        ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def set_progress(self, job_id: int, progress: float) -> None:
+        """Record progress (0..1) for a running job."""
+        self._conn().execute(
+            "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?", (progress, time.time(), job_id)
+        )
+
+    def stats(self) -> dict:
+        rows = self._conn().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return {"workers": len(self._threads), **counts}
+
+    def start(self) -> None:
+        """Start the worker threads (idempotent; enqueue() calls this)."""
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.workers):
+                high_only = i < self.reserved_workers and self.workers > 1
+                # A fresh context: workers must not inherit the enqueuing request's deadline.
+                thread = threading.Thread(
+                    target=contextvars.Context().run,
+                    args=(self._work, high_only),
+                    name=f"job-worker-{i}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_pending(self) -> int:
+        """Run every ready job in the calling thread; returns how many ran."""
+        count = 0
+        while (job := self._claim(high_only=False)) is not None:
+            self._execute(job)
+            count += 1
+        return count
+
+    # ── Internals ──
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            # Every connection ensures the schema (cheap with IF NOT EXISTS): the
+            # database file may have been removed or replaced since the last one.
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["payload"] = codec.loads(job["payload"])
+        job["result"] = codec.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _claim(self, high_only: bool) -> dict | None:
+        """Lease the next ready job, or return None when there is none."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT * FROM jobs AS j
+                WHERE ((j.status = ? AND j.run_after <= ?) OR (j.status = ? AND j.locked_until < ?))
+                  AND j.priority >= ?
+                  AND (j.lane IS NULL OR NOT EXISTS (
+                      SELECT 1 FROM jobs AS o
+                      WHERE o.lane = j.lane AND o.status = ? AND o.locked_until >= ? AND o.id != j.id))
+                ORDER BY j.priority DESC, j.id
+                LIMIT 1
+                """,
+                (PENDING, now, RUNNING, now, PRIORITY_HIGH if high_only else PRIORITY_NORMAL - 1_000, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] == RUNNING and row["attempts"] >= row["max_attempts"]:
+                # Its worker died on the last attempt.
+                conn.execute(
+                    "UPDATE jobs SET status = ?, locked_until = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                    (FAILED, "lease expired on final attempt", now, row["id"]),
+                )
+                conn.execute("COMMIT")
+                return self._claim(high_only)
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, locked_until = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, now + self.lease_seconds, now, row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        job = self._to_dict(row)
+        job["attempts"] += 1
+        return job
+
+    def _execute(self, job: dict) -> None:
+        handler = self._handlers.get(job["kind"])
+        now = time.time()
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job['kind']}'")
+            result = handler(job["payload"], job)
+        except Exception as e:
+            print(f"Job {job['id']} ({job['kind']}) failed on attempt {job['attempts']}: {e}")
+            if job["attempts"] >= job["max_attempts"]:
+                status, run_after = FAILED, now
+            else:
+                status = PENDING
+                run_after = now + min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1))
+            self._conn().execute(
+                "UPDATE jobs SET status = ?, run_after = ?, locked_until = NULL, last_error = ?, updated_at = ?"
+                " WHERE id = ?",
+                (status, run_after, str(e), time.time(), job["id"]),
+            )
+            return
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, locked_until = NULL, progress = 1, result = ?, updated_at = ? WHERE id = ?",
+            (DONE, codec.dumps_text(result) if result is not None else None, time.time(), job["id"]),
+        )
+
+    def _prune(self) -> None:
+        now = time.time()
+        if now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        self._conn().execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+            (DONE, FAILED, now - self.retention_seconds),
+        )
+
+    def _work(self, high_only: bool) -> None:
+        while not self._stopping.is_set():
+            try:
+                job = self._claim(high_only)
+                if job is not None:
+                    self._execute(job)
+                    continue
+                self._prune()
+            except Exception as e:
+                print(f"Job worker error: {e}")
+            # Nothing ready: sleep until an enqueue, or poll for retries and expired leases.
+            with self._wakeup:
+                self._wakeup.wait(timeout=1.0)
+
+
+job_queue = JobQueue(
+    JOB_QUEUE_PATH,
+    workers=JOB_WORKERS,
+    lease_seconds=JOB_LEASE_SECONDS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    retention_hours=JOB_RETENTION_HOURS,
+)
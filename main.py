@@ -1,23 +1,166 @@
-from agent import create_zionx_agent
-from core.models import Chat
+import threading
+from datetime import datetime
+from typing import TYPE_CHECKING
+
 from memory import load_facts, save_fact
 from users import get_user_profile_context
-from daily_tracking import get_tracking_summary
+from tracking_trends import get_trend_context
 from emergency_alerts import send_emergency_alert, should_trigger_emergency_alert
 from risk_monitor import save_risk_assessment
-from alert_history import save_alert_record
+from alert_history import load_alert_history, pending_alert_record, save_alert_record, update_alert_record
+from alert_suppression import SUPPRESS, alert_suppressor
+from job_queue import PRIORITY_HIGH, job_queue
+from users import has_emergency_consent
+from core import deadline
+from core.config import TRACKING_TRENDS_DAYS
+from core.ids import new_id
+from core.versions import thread_versions
+from core.deadline import DeadlineExceeded
+from services.fallbacks import degraded_chat_response
+from services.model_router import get_model_router
+
+if TYPE_CHECKING:
+    from core.models import Chat
 
 _agent = None
+_agent_lock = threading.Lock()
+_ready = threading.Event()
 
 
-def get_agent():
-    """Return the singleton ZionX agent, creating it on first call."""
+def get_agent(warm: bool = False):
+    """Return the singleton ZionX agent, creating it on first call.
+
+    The agent module (langchain, langgraph and the Gemini client) is only
+    imported here, so importing main stays cheap for worker startup.
+    """
     global _agent
     if _agent is None:
-        _agent = create_zionx_agent()
+        with _agent_lock:
+            if _agent is None:
+                from agent import create_zionx_agent
+
+                _agent = create_zionx_agent(warm=warm)
     return _agent
 
 
+def warm_up(prime: bool = False) -> None:
+    """Build the orchestrator, every specialist and the alert SMTP pool before the first request.
+
+    Opens each client's HTTP connection and, with prime=True, sends a tiny
+    request through the agent. Always marks the service ready when done: a
+    failed step only means that work happens lazily on first use instead.
+    """
+    try:
+        from services.alert_dispatcher import get_alert_dispatcher
+        from tools.specialist_utils import warm_specialists
+
+        agent = get_agent(warm=True)
+        warm_specialists(prime=prime)
+        get_alert_dispatcher()  # opens the alert SMTP pool when SMTP is configured
+        if prime:
+            agent.invoke(
+                {"messages": [{"role": "user", "content": "Hello"}]},
+                config={"configurable": {"thread_id": "__warmup__"}},
+            )
+    except Exception as e:
+        print(f"Error during warm-up: {e}")
+    finally:
+        _ready.set()
+
+
+def is_ready() -> bool:
+    """Whether warm_up() has finished."""
+    return _ready.is_set()
+
+
+# ── Background jobs: side effects of a chat, run after the response ──
+
+def _save_fact_job(payload: dict, job: dict) -> None:
+    save_fact(payload["user_id"], payload["fact"])
+
+
+def _save_risk_assessment_job(payload: dict, job: dict) -> None:
+    save_risk_assessment(payload["user_id"], payload["risk_data"])
+
+
+def _recorded_outcome(user_id: str, alert_key: str | None) -> dict | None:
+    """Outcome of an alert already recorded under alert_key, if any.
+
+    Delivery is at-least-once, so a retried job checks this before sending
+    again. Alerts are matched by the random alert_key in the job payload,
+    not the job ID: IDs restart when the job database is recreated, while
+    the alert history is kept.
+    """
+    if alert_key is None:
+        return None
+    for record in load_alert_history(user_id):
+        if record.get("alert_key") == alert_key:
+            return {"success": record["success"], "message": record["message"]}
+    return None
+
+
+def _emergency_alert_job(payload: dict, job: dict) -> dict:
+    """Send an emergency alert and record the outcome in the alert history."""
+    user_id, alert_data, alert_key = payload["user_id"], payload["alert_data"], payload.get("alert_key")
+    recorded = _recorded_outcome(user_id, alert_key)
+    if recorded is not None:
+        return recorded
+    success, alert_message = send_emergency_alert(user_id, alert_data)
+    save_alert_record(user_id, alert_data, success, alert_message, job_id=job["id"], alert_key=alert_key)
+    return {"success": success, "message": alert_message}
+
+
+def _alert_suppressed_job(payload: dict, job: dict) -> None:
+    """Record how many repeat alerts were coalesced into the alert that opened the window."""
+    # Jobs queued before alert keys existed name the alert by a job ID, which cannot be matched safely.
+    if payload.get("alert_key") is not None:
+        update_alert_record(payload["user_id"], payload["alert_key"], suppressed_count=payload["suppressed_count"])
+
+
+def _alert_digest_job(payload: dict, job: dict) -> dict | None:
+    """Send one summary of the alerts suppressed since the last notice, if any."""
+    user_id, alert_key = payload["user_id"], payload.get("alert_key")
+    recorded = _recorded_outcome(user_id, alert_key)
+    if recorded is not None:
+        return recorded
+    digest = alert_suppressor.pending_digest(user_id)
+    if digest is None:
+        return None
+    latest = digest["alert_data"]
+    since = datetime.fromtimestamp(digest["window_started_at"]).strftime("%H:%M")
+    alert_data = {
+        **latest,
+        "symptoms": (
+            f"{digest['count']} further urgent message(s) since the alert at {since}. "
+            f"Most recent:\n{latest.get('symptoms', '')}"
+        ),
+    }
+    success, alert_message = send_emergency_alert(user_id, alert_data)
+    save_alert_record(
+        user_id, alert_data, success, alert_message,
+        job_id=job["id"], alert_key=alert_key, kind="digest", suppressed_count=digest["count"],
+    )
+    alert_suppressor.digest_sent(user_id, digest["count"])
+    return {"success": success, "message": alert_message}
+
+
+job_queue.register("save_fact", _save_fact_job)
+job_queue.register("save_risk_assessment", _save_risk_assessment_job)
+job_queue.register("emergency_alert", _emergency_alert_job)
+job_queue.register("alert_suppressed", _alert_suppressed_job)
+job_queue.register("alert_digest", _alert_digest_job)
+
+
+def get_pending_alerts(user_id: str) -> list[dict]:
+    """Emergency alerts queued or being sent for a user, shaped like alert records."""
+    return [pending_alert_record(job) for job in job_queue.unfinished("emergency_alert", user_id)]
+
+
+def pending_alerts_version(user_id: str) -> tuple:
+    """IDs of a user's unfinished alert jobs; changes whenever get_pending_alerts would."""
+    return tuple(job["id"] for job in job_queue.unfinished("emergency_alert", user_id))
+
+
 def run(message: str, thread_id: str = "default", user_id: str = "guest") -> dict:
     """Send a message to the orchestrator and return its response.
 
@@ -26,10 +169,24 @@ def run(message: str, thread_id: str = "default", user_id: str = "guest") -> dic
         thread_id: Conversation thread identifier for short-term memory isolation.
         user_id: User identifier for long-term memory isolation.
         
+    Memory, risk records and emergency alerts are written by background
+    jobs after this returns; alerts run ahead of other jobs.
+
     Returns:
         dict with keys: response, risk_level, urgency, emergency_alert_sent
+        (always False: alerts are sent in the background) and
+        emergency_alert_pending (whether an alert job was queued).
+        If the orchestrator cannot answer, a degraded response (safety
+        guidance when the message looks like an emergency) with degraded=True.
+
+    Raises:
+        DeadlineExceeded: the request deadline passed before the agent
+            answered. Once there is an answer, it is returned and the
+            emergency alert and persistence jobs are queued; a job that
+            cannot be queued is logged.
     """
     try:
+        deadline.check("loading context")
         config = {"configurable": {"thread_id": thread_id}}
 
         messages: list = [{"role": "user", "content": message}]
@@ -47,70 +204,143 @@ def run(message: str, thread_id: str = "default", user_id: str = "guest") -> dic
         if profile_context:
             context_parts.append(f"[User Profile - From Onboarding]\n{profile_context}")
         
-        # 3. Recent tracking data (daily health updates)
-        tracking_summary = get_tracking_summary(user_id, days=7)
-        if tracking_summary:
-            context_parts.append(f"[Recent Health Tracking]\n{tracking_summary}")
+        # 3. Tracking trends (daily health updates, analyzed)
+        tracking_trends = get_trend_context(user_id, days=TRACKING_TRENDS_DAYS)
+        if tracking_trends:
+            context_parts.append(f"[Health Tracking Trends]\n{tracking_trends}")
         
         # Combine all context
         if context_parts:
             full_context = "\n\n".join(context_parts)
             messages.insert(0, {"role": "system", "content": full_context})
 
-        result = get_agent().invoke({"messages": messages}, config=config)
+        deadline.check("calling the agent")
+        # Feeds the router's in-flight count and p95 used for model downgrades.
+        with get_model_router().track_request():
+            try:
+                result = get_agent().invoke({"messages": messages}, config=config)
+            finally:
+                # The checkpointer may hold new messages even if the call failed.
+                thread_versions.bump(thread_id)
 
         structured: Chat = result["structured_response"]
-        
-        # Save new facts to long-term memory
-        if structured.fact:
-            save_fact(user_id, structured.fact)
-        
-        # Save risk assessment if risk level or urgency is present
-        if structured.risk_level or structured.urgency:
-            save_risk_assessment(user_id, {
-                "risk_level": structured.risk_level,
-                "urgency": structured.urgency,
-                "message": message,
-                "ai_response": structured.normal_response,
-                "emergency_alert_sent": False  # Will update if alert is sent
-            })
-        
-        # Check if emergency alert should be triggered
-        emergency_alert_sent = False
-        if should_trigger_emergency_alert(structured.risk_level, structured.urgency):
-            # Attempt to send emergency alert
-            alert_data = {
-                "severity": structured.risk_level,
-                "symptoms": message,
-                "ai_assessment": structured.normal_response,
-                "user_location": "Not provided"  # Could be enhanced with location tracking
-            }
-            success, alert_message = send_emergency_alert(user_id, alert_data)
-            emergency_alert_sent = success
-            
-            # Record alert attempt in history
-            save_alert_record(user_id, alert_data, success, alert_message)
-            
-            if success:
-                # Append alert confirmation to response
-                structured.normal_response += f"\n\n **Emergency Alert Sent**: {alert_message}"
-
-        return {
-            "response": structured.normal_response,
-            "risk_level": structured.risk_level,
-            "urgency": structured.urgency,
-            "emergency_alert_sent": emergency_alert_sent
-        }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Error in run(): {e}")
         import traceback
         traceback.print_exc()
-        return {
-            "response": f"I encountered an error processing your request. Please try rephrasing or contact support if this persists.",
-            "risk_level": None,
-            "urgency": None,
-            "emergency_alert_sent": False
+        return degraded_chat_response(message)
+
+    # The answer stands even if a side effect cannot be queued. The alert goes first.
+    answer = structured.normal_response  # recorded without the alert notes appended below
+    emergency_alert_pending = _queue_emergency_alert(message, user_id, structured)
+    _queue_persistence(message, user_id, structured, answer)
+
+    return {
+        "response": structured.normal_response,
+        "risk_level": structured.risk_level,
+        "urgency": structured.urgency,
+        "emergency_alert_sent": False,
+        "emergency_alert_pending": emergency_alert_pending,
+    }
+
+
+def _enqueue(kind: str, payload: dict, **options) -> int | None:
+    """job_queue.enqueue(), logging a failure (locked or full database) instead of raising."""
+    try:
+        return job_queue.enqueue(kind, payload, **options)
+    except Exception as e:
+        print(f"Error queuing {kind} job for {payload.get('user_id')}: {e}")
+        return None
+
+
+def _queue_emergency_alert(message: str, user_id: str, structured: "Chat") -> bool:
+    """Queue or coalesce the emergency alert for a turn, if it needs one.
+
+    Appends a note for the user to structured.normal_response.
+
+    Returns:
+        Whether an alert job was queued
+    """
+    if not should_trigger_emergency_alert(structured.risk_level, structured.urgency):
+        return False
+    alert_data = {
+        "severity": structured.risk_level,
+        "symptoms": message,
+        "ai_assessment": structured.normal_response,
+        "user_location": "Not provided"  # Could be enhanced with location tracking
+    }
+    decision = alert_suppressor.decide(user_id, structured.risk_level, structured.urgency, alert_data)
+    if decision.action == SUPPRESS:
+        # Contacts were alerted recently at this severity: count it, and
+        # let a digest report repeats instead of alerting everyone again.
+        if decision.last_alert_key is not None:
+            _enqueue(
+                "alert_suppressed",
+                {
+                    "user_id": user_id,
+                    "alert_key": decision.last_alert_key,
+                    "suppressed_count": decision.suppressed_in_window,
+                },
+                user_id=user_id, lane=f"alerts:{user_id}",
+            )
+        if decision.schedule_digest_in is not None:
+            _enqueue(
+                "alert_digest", {"user_id": user_id, "alert_key": new_id()},
+                priority=PRIORITY_HIGH, user_id=user_id, lane=f"alerts:{user_id}",
+                delay_seconds=decision.schedule_digest_in,
+            )
+        if has_emergency_consent(user_id):
+            since = datetime.fromtimestamp(decision.window_started_at).strftime("%H:%M")
+            structured.normal_response += (
+                f"\n\n **Emergency Alert**: Your emergency contacts were already notified at {since} "
+                "and will receive an update."
+            )
+        return False
+
+    # Sent (and recorded in alert history) by a high-priority background job.
+    alert_key = new_id()
+    alert_suppressor.attach_job(user_id, decision.window_started_at, alert_key)
+    job_id = _enqueue(
+        "emergency_alert", {"user_id": user_id, "alert_key": alert_key, "alert_data": alert_data},
+        priority=PRIORITY_HIGH, user_id=user_id, lane=f"alerts:{user_id}",
+    )
+    if job_id is None:
+        # Nothing was sent: the next alert for this user must not be suppressed.
+        alert_suppressor.release(user_id, decision.window_started_at)
+        return False
+
+    if has_emergency_consent(user_id):
+        structured.normal_response += (
+            "\n\n **Emergency Alert**: Your emergency contacts are being notified. "
+            "Delivery status appears in your alert history."
+        )
+    return True
+
+
+def _queue_persistence(message: str, user_id: str, structured: "Chat", answer: str) -> None:
+    """Queue the memory and risk-history writes for a turn."""
+    # Save new facts to long-term memory
+    if structured.fact:
+        _enqueue(
+            "save_fact", {"user_id": user_id, "fact": structured.fact},
+            user_id=user_id, lane=f"memory:{user_id}",
+        )
+
+    # Save risk assessment if risk level or urgency is present
+    if structured.risk_level or structured.urgency:
+        risk_data = {
+            "risk_level": structured.risk_level,
+            "urgency": structured.urgency,
+            "message": message,
+            "ai_response": answer,
+            "emergency_alert_sent": False  # Alerts are sent in the background
         }
+        _enqueue(
+            "save_risk_assessment", {"user_id": user_id, "risk_data": risk_data},
+            user_id=user_id, lane=f"risk:{user_id}",
+        )
 
 
 def get_chat_history(thread_id: str = "default") -> list[dict]:
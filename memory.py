@@ -29,6 +29,41 @@ def save_fact(user_id: str, fact: str) -> None:
         print(f"Error saving fact for {user_id}: {e}")
 
 
+def _fact_key(line: str) -> str:
+    return " ".join(line.lower().split())
+
+
+def save_new_facts(user_id: str, facts: str) -> int:
+    """Append the "- fact" lines of a fact block that the user does not already have.
+
+    Other lines of the block (the "--- filename ---" header) are written only
+    when at least one fact is new, so saving the same block twice adds nothing.
+    Returns the number of facts appended.
+    """
+    try:
+        path = Path(MEMORY_DIR) / f"{user_id}.txt"
+        known = set()
+        if path.exists():
+            with path.open() as f:
+                known = {_fact_key(line) for line in f if line.strip()}
+
+        lines, new = [], 0
+        for line in (line.strip() for line in facts.strip().splitlines()):
+            if line.startswith("- "):
+                if _fact_key(line) in known:
+                    continue
+                known.add(_fact_key(line))
+                new += 1
+            if line:
+                lines.append(line)
+        if new:
+            save_fact(user_id, "\n".join(lines))
+        return new
+    except Exception as e:
+        print(f"Error saving facts for {user_id}: {e}")
+        return 0
+
+
 def get_all_users() -> list[dict]:
     """Get a list of all users with their memory metadata."""
     try:
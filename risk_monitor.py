@@ -1,10 +1,29 @@
-"""Risk monitoring system for tracking health risk assessments."""
+"""Risk monitoring system for tracking health risk assessments.
+
+Each save also updates a per-user daily rollup (core.rollup), which
+get_risk_summary reads instead of the full history.
+"""
 
-import json
 from pathlib import Path
 from datetime import datetime
 
+from core.codec import read_json, write_json
+from core.ids import new_id
+from core.json_cache import load_json_cached
+from core.pagination import DEFAULT_PAGE_LIMIT, paginate
+from core.rollup import (
+    bucket,
+    buckets_in_window,
+    increment,
+    load_rollup,
+    push_recent,
+    recent_in_window,
+    save_rollup,
+)
+from core.versions import file_version
+
 RISK_DIR = "risk_assessments"
+HIGH_RISK_EVENTS = 5
 
 
 def _ensure_risk_dir():
@@ -24,12 +43,15 @@ def save_risk_assessment(user_id: str, risk_data: dict) -> dict:
     """
     _ensure_risk_dir()
     
+    path = Path(RISK_DIR) / f"{user_id}.json"
+    rollup = _load_rollup(path)
+    
     # Load existing assessments
     assessments = load_risk_history(user_id)
     
     # Create new assessment
     assessment = {
-        "assessment_id": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "assessment_id": new_id(),
         "timestamp": datetime.now().isoformat(),
         "date": datetime.now().strftime("%Y-%m-%d"),
         "risk_level": risk_data.get("risk_level"),
@@ -42,14 +64,47 @@ def save_risk_assessment(user_id: str, risk_data: dict) -> dict:
     assessments.append(assessment)
     
     # Save to file
-    path = Path(RISK_DIR) / f"{user_id}.json"
     try:
-        with path.open("w") as f:
-            json.dump(assessments, f, indent=2)
-        return assessment
+        write_json(path, assessments)
     except Exception as e:
         print(f"Error saving risk assessment for {user_id}: {e}")
         return {}
+    
+    # A failed rollup update is repaired by a rebuild on the next read
+    if rollup is not None:
+        try:
+            _add_to_rollup(rollup, assessment)
+            save_rollup(path, rollup)
+        except Exception as e:
+            print(f"Error updating risk rollup for {user_id}: {e}")
+    return assessment
+
+
+def _add_to_rollup(rollup: dict, assessment: dict) -> None:
+    counters = bucket(rollup, assessment.get("date") or assessment["timestamp"][:10])
+    increment(counters, "total")
+    if assessment.get("risk_level"):
+        increment(counters.setdefault("risk_level", {}), assessment["risk_level"])
+    if assessment.get("urgency"):
+        increment(counters.setdefault("urgency", {}), assessment["urgency"])
+    push_recent(rollup, "latest", assessment, 1)
+    if assessment.get("risk_level") == "high":
+        push_recent(rollup, "high_risk", assessment, HIGH_RISK_EVENTS)
+
+
+def _build_rollup(assessments: list) -> dict:
+    rollup = {}
+    for assessment in assessments:
+        _add_to_rollup(rollup, assessment)
+    return rollup
+
+
+def _load_rollup(path: Path, shared: bool = False) -> dict | None:
+    try:
+        return load_rollup(path, _build_rollup, shared=shared)
+    except Exception as e:
+        print(f"Error loading risk rollup from {path}: {e}")
+        return None
 
 
 def load_risk_history(user_id: str, days: int = None) -> list:
@@ -66,11 +121,7 @@ def load_risk_history(user_id: str, days: int = None) -> list:
     path = Path(RISK_DIR) / f"{user_id}.json"
     
     try:
-        if not path.exists():
-            return []
-        
-        with path.open() as f:
-            assessments = json.load(f)
+        assessments = read_json(path, default=[])
         
         # Filter by days if specified
         if days:
@@ -86,15 +137,40 @@ def load_risk_history(user_id: str, days: int = None) -> list:
         return []
 
 
+def risk_version(user_id: str) -> str:
+    """Version token of a user's risk history; changes on every save."""
+    return file_version(Path(RISK_DIR) / f"{user_id}.json")
+
+
+def load_risk_page(
+    user_id: str, limit: int = DEFAULT_PAGE_LIMIT, cursor: str | None = None, days: int = None
+) -> tuple[list, str | None]:
+    """Load one page of risk history, newest page first.
+    
+    Returns:
+        (assessments in chronological order, cursor for the next older page or None)
+    """
+    try:
+        records = load_json_cached(Path(RISK_DIR) / f"{user_id}.json", default=[])
+    except Exception as e:
+        print(f"Error loading risk history for {user_id}: {e}")
+        records = []
+    return paginate(records, "assessment_id", limit, cursor, days)
+
+
 def get_risk_summary(user_id: str, days: int = 30) -> dict:
     """Get a summary of risk assessments for display.
     
+    Answered from the daily rollup, so `days` covers whole calendar days.
+    
     Returns:
         Dict with risk statistics and recent high-risk events
     """
-    assessments = load_risk_history(user_id, days=days)
+    rollup = _load_rollup(Path(RISK_DIR) / f"{user_id}.json", shared=True) or {}
+    buckets = buckets_in_window(rollup, days)
+    total = sum(b.get("total", 0) for b in buckets)
     
-    if not assessments:
+    if not total:
         return {
             "total_assessments": 0,
             "high_risk_count": 0,
@@ -104,24 +180,26 @@ def get_risk_summary(user_id: str, days: int = 30) -> dict:
             "high_risk_events": []
         }
     
-    # Count risk levels
-    high_risk = [a for a in assessments if a.get("risk_level") == "high"]
-    medium_risk = [a for a in assessments if a.get("risk_level") == "medium"]
-    low_risk = [a for a in assessments if a.get("risk_level") == "low"]
+    # Count risk levels and urgencies
+    levels: dict = {}
+    urgencies: dict = {}
+    for b in buckets:
+        for level, count in b.get("risk_level", {}).items():
+            increment(levels, level, count)
+        for urgency, count in b.get("urgency", {}).items():
+            increment(urgencies, urgency, count)
     
-    # Get recent high-risk events
-    high_risk_events = sorted(
-        high_risk,
-        key=lambda x: x["timestamp"],
-        reverse=True
-    )[:5]  # Last 5 high-risk events
+    # Most recent first
+    high_risk_events = recent_in_window(rollup, "high_risk", days)[::-1][:HIGH_RISK_EVENTS]
+    latest = recent_in_window(rollup, "latest", days)
     
     return {
-        "total_assessments": len(assessments),
-        "high_risk_count": len(high_risk),
-        "medium_risk_count": len(medium_risk),
-        "low_risk_count": len(low_risk),
-        "latest_assessment": assessments[-1] if assessments else None,
+        "total_assessments": total,
+        "high_risk_count": levels.get("high", 0),
+        "medium_risk_count": levels.get("medium", 0),
+        "low_risk_count": levels.get("low", 0),
+        "urgency_counts": urgencies,
+        "latest_assessment": latest[-1] if latest else None,
         "high_risk_events": high_risk_events,
         "days_monitored": days
     }
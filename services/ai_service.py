@@ -1,24 +1,118 @@
 """AI-powered document analysis and translation services.
 
 These functions use the shared specialist LLM factory so they benefit from
-the same caching and configuration as the specialist tools.
+the same caching and configuration as the specialist tools. The factory (and
+with it the LLM client libraries) is imported on first use.
 """
-from tools.specialist_utils import get_specialist
+
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from core.chunking import split_chunks
+from core.config import FACT_CHUNK_CHARS, FACT_CHUNK_OVERLAP_CHARS, FACT_EXTRACTION_CONCURRENCY
+from document_cache import cache_facts, get_cached_facts
+
+_BULLET = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s*")
+_NO_FACTS = {"none", "none.", "n/a", "no significant health facts found."}
+
+# Facts whose word sets overlap at least this much (Jaccard) are duplicates,
+# e.g. the same fact extracted from two overlapping chunks.
+DUPLICATE_SIMILARITY = 0.8
+
+
+def _chunk_prompt(chunk: str, filename: str, part: int, parts: int) -> str:
+    section = f" (part {part} of {parts})" if parts > 1 else ""
+    return (
+        f"Analyze the following document{section} and extract ONLY important long-term facts "
+        f"that should be remembered about the user's health.\n\n"
+        f"Document: {filename}\n\n"
+        f"Content:\n{chunk}\n\n"
+        f"List one fact per line, each starting with '- '. "
+        f"If no significant health information is found, return the text 'None'."
+    )
+
+
+def _extract_chunk(llm, prompt: str) -> str:
+    from tools.specialist_utils import call_with_breaker, hedged_call, invoke_within_deadline
+
+    return call_with_breaker(
+        "doc_extractor", llm, hedged_call, "doc_extractor",
+        lambda: invoke_within_deadline(llm, "doc_extractor specialist call", prompt),
+    ).content
+
+
+def _words(fact: str) -> frozenset[str]:
+    return frozenset(re.findall(r"\w+", fact.lower()))
+
+
+def merge_facts(responses: list[str]) -> list[str]:
+    """Reduce per-chunk responses to one list of distinct facts, in document order."""
+    facts, seen = [], []
+    for response in responses:
+        for line in response.splitlines():
+            fact = _BULLET.sub("", line).strip()
+            if not fact or fact.lower() in _NO_FACTS:
+                continue
+            words = _words(fact)
+            if not words or any(
+                len(words & other) / len(words | other) >= DUPLICATE_SIMILARITY for other in seen
+            ):
+                continue
+            facts.append(fact)
+            seen.append(words)
+    return facts
+
+
+def _extract_facts(content: str, filename: str) -> tuple[list[str], bool]:
+    """Facts from every chunk of `content`, and whether every chunk succeeded."""
+    from tools.specialist_utils import get_specialist
+
+    llm = get_specialist("doc_extractor")
+    chunks = split_chunks(content, FACT_CHUNK_CHARS, FACT_CHUNK_OVERLAP_CHARS)
+    prompts = [_chunk_prompt(chunk, filename, i, len(chunks)) for i, chunk in enumerate(chunks, 1)]
+    if len(prompts) <= 1:
+        return merge_facts([_extract_chunk(llm, prompt) for prompt in prompts]), True
+
+    with ThreadPoolExecutor(
+        max_workers=min(FACT_EXTRACTION_CONCURRENCY, len(prompts)), thread_name_prefix="fact-extract"
+    ) as pool:
+        # Each call runs in a copy of this context so it sees the request deadline.
+        futures = [pool.submit(contextvars.copy_context().run, _extract_chunk, llm, prompt) for prompt in prompts]
+    responses = []
+    for number, future in enumerate(futures, 1):
+        try:
+            responses.append(future.result())
+        except Exception as e:
+            print(f"Error extracting facts from part {number}/{len(futures)} of {filename}: {e}")
+    return merge_facts(responses), len(responses) == len(futures)
 
 
 def extract_health_facts_with_ai(content: str, filename: str) -> str:
-    """Extract important long-term health facts from a document using AI."""
+    """Extract important long-term health facts from a document using AI.
+
+    Long documents are split into overlapping chunks on page or paragraph
+    boundaries (core.chunking). Chunks are sent to the extractor in parallel,
+    at most FACT_EXTRACTION_CONCURRENCY at a time, and their facts are merged
+    and deduplicated. A document of up to FACT_CHUNK_CHARS characters takes
+    a single call; a chunk that fails is skipped and the others still count.
+    Facts for text seen before come from the document cache without any call.
+
+    Returns:
+        The facts as a "--- filename ---" block of "- fact" lines, or an
+        empty string if none were found
+    """
     try:
-        llm = get_specialist("doc_extractor")
-        prompt = (
-            f"Analyze the following document and extract ONLY important long-term facts "
-            f"that should be remembered about the user's health.\n\n"
-            f"Document: {filename}\n\n"
-            f"Content:\n{content[:4000]}\n\n"
-            f"If no significant health information is found, return the text 'None'."
-        )
-        response = llm.invoke(prompt).content
-        return f"\n--- {filename} ---\n{response}\n\n"
+        facts = get_cached_facts(content)
+        if facts is None:
+            facts, complete = _extract_facts(content, filename)
+            # Facts missing a failed chunk are not cached, so the next upload retries it.
+            if complete:
+                cache_facts(content, facts)
+        if not facts:
+            return ""
+        fact_lines = "\n".join(f"- {fact}" for fact in facts)
+        return f"\n--- {filename} ---\n{fact_lines}\n\n"
     except Exception as e:
         print(f"Error extracting facts with AI: {e}")
         return ""
@@ -27,8 +121,8 @@ def extract_health_facts_with_ai(content: str, filename: str) -> str:
 def translate_to_english(text: str, source_language: str) -> str:
     """Translate text from a supported Nigerian language to English using AI.
 
-    Returns the original text unchanged if the source language is English
-    or if translation fails.
+    Returns the original text unchanged if the source language is English,
+    if translation fails, or if the translator's circuit breaker is open.
     """
     if source_language == "en":
         return text
@@ -37,14 +131,19 @@ def translate_to_english(text: str, source_language: str) -> str:
     lang_name = language_names.get(source_language, source_language)
 
     try:
-        llm = get_specialist("translator", temperature=0.1)
+        from tools.specialist_utils import call_with_breaker, get_specialist, hedged_call, invoke_within_deadline
+
+        llm = get_specialist("translator")
         prompt = (
             f"Translate the following {lang_name} text to English.\n"
             f"Provide ONLY the English translation, nothing else.\n\n"
             f"{lang_name} text: {text}\n\n"
             f"English translation:"
         )
-        return llm.invoke(prompt).content.strip()
+        return call_with_breaker(
+            "translator", llm, hedged_call, "translator",
+            lambda: invoke_within_deadline(llm, "translator specialist call", prompt),
+        ).content.strip()
     except Exception as e:
         print(f"Translation error: {e}")
         return text
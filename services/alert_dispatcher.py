@@ -0,0 +1,266 @@
+"""Pooled, concurrent SMTP delivery for emergency alerts.
+
+`SMTPConnectionPool` keeps authenticated (STARTTLS + login) connections
+open between alerts. A connection idle for longer than the health-check
+interval gets a NOOP before reuse, connections older than `max_age_seconds`
+are replaced, and a background thread keeps `min_idle` connections warm so
+an alert does not start with a handshake.
+
+`AlertDispatcher.send_all` sends one message per recipient in parallel,
+each over its own pooled connection, retrying transient SMTP failures
+(disconnects, 4xx replies, socket errors) with jittered backoff.
+"""
+import os
+import random
+import smtplib
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.message import Message
+
+from core.config import (
+    ALERT_SMTP_HEALTH_CHECK_SECONDS,
+    ALERT_SMTP_MAX_AGE_SECONDS,
+    ALERT_SMTP_MAX_RETRIES,
+    ALERT_SMTP_MIN_IDLE,
+    ALERT_SMTP_POOL_SIZE,
+    ALERT_SMTP_TIMEOUT_SECONDS,
+)
+
+RETRY_BASE_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class SMTPSettings:
+    """Where and as whom to send alert email."""
+
+    server: str
+    port: int
+    email: str | None
+    password: str | None
+
+    @classmethod
+    def from_env(cls) -> "SMTPSettings":
+        return cls(
+            server=os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+            port=int(os.getenv("SMTP_PORT", "587")),
+            email=os.getenv("SMTP_EMAIL"),
+            password=os.getenv("SMTP_PASSWORD"),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.email and self.password)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """Bounded pool of authenticated SMTP connections."""
+
+    def __init__(
+        self,
+        settings: SMTPSettings,
+        size: int = 4,
+        min_idle: int = 1,
+        health_check_seconds: float = 30,
+        max_age_seconds: float = 240,
+        timeout_seconds: float = 15,
+        connect=None,
+    ):
+        self.settings = settings
+        self.size = max(size, 1)
+        self.min_idle = min(min_idle, self.size)
+        self.health_check_seconds = health_check_seconds
+        self.max_age_seconds = max_age_seconds
+        self.timeout_seconds = timeout_seconds
+        self._connect = connect or self._open
+        self._idle: list[_PooledConnection] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._maintainer: threading.Thread | None = None
+        self._counters = {"opened": 0, "reused": 0, "discarded": 0}
+
+    def _open(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.settings.server, self.settings.port, timeout=self.timeout_seconds)
+        try:
+            smtp.starttls()
+            smtp.login(self.settings.email, self.settings.password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    def _new_connection(self) -> _PooledConnection:
+        conn = _PooledConnection(self._connect())
+        with self._lock:
+            self._counters["opened"] += 1
+        return conn
+
+    def _usable(self, conn: _PooledConnection) -> bool:
+        """Whether an idle connection can be reused (NOOP-checked when idle a while)."""
+        now = time.monotonic()
+        if now - conn.created_at > self.max_age_seconds:
+            return False
+        if now - conn.last_used < self.health_check_seconds:
+            return True
+        try:
+            code, _ = conn.smtp.noop()
+            return code == 250
+        except Exception:
+            return False
+
+    def _discard(self, conn: _PooledConnection) -> None:
+        with self._lock:
+            self._counters["discarded"] += 1
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is discarded instead of returned if the block raises."""
+        self._slots.acquire()
+        conn = None
+        try:
+            while conn is None:
+                with self._lock:
+                    candidate = self._idle.pop() if self._idle else None
+                if candidate is None:
+                    conn = self._new_connection()
+                elif self._usable(candidate):
+                    conn = candidate
+                    with self._lock:
+                        self._counters["reused"] += 1
+                else:
+                    self._discard(candidate)
+            try:
+                yield conn.smtp
+            except Exception:
+                self._discard(conn)
+                raise
+            conn.last_used = time.monotonic()
+            with self._lock:
+                self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def maintain(self) -> None:
+        """Drop dead or old idle connections and refill up to min_idle."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        alive = []
+        for conn in idle:
+            if self._usable(conn):
+                conn.last_used = time.monotonic()
+                alive.append(conn)
+            else:
+                self._discard(conn)
+        while len(alive) < self.min_idle:
+            try:
+                alive.append(self._new_connection())
+            except Exception as e:
+                print(f"Error opening SMTP connection: {e}")
+                break
+        with self._lock:
+            self._idle.extend(alive)
+
+    def start_maintenance(self) -> None:
+        """Warm the pool now and keep it warm from a daemon thread."""
+        with self._lock:
+            if self._maintainer is not None:
+                return
+            self._maintainer = threading.Thread(target=self._maintain_forever, name="smtp-pool", daemon=True)
+        self._maintainer.start()
+
+    def _maintain_forever(self) -> None:
+        while True:
+            self.maintain()
+            time.sleep(self.health_check_seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"idle": len(self._idle), "size": self.size, **self._counters}
+
+
+def is_transient(exc: Exception) -> bool:
+    """Whether an SMTP send error is worth retrying."""
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, socket.timeout, ConnectionError)):
+        return True
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return False
+    code = getattr(exc, "smtp_code", None)
+    return isinstance(code, int) and 400 <= code < 500
+
+
+class AlertDispatcher:
+    """Sends alert messages to many recipients at once over pooled connections."""
+
+    def __init__(self, pool: SMTPConnectionPool, max_retries: int = 2):
+        self.pool = pool
+        self.max_retries = max_retries
+        self._executor = ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="smtp-send")
+
+    def send(self, message: Message) -> None:
+        """Send one message, retrying transient failures; raises the last error."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.pool.connection() as smtp:
+                    smtp.send_message(message)
+                return
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    raise
+                time.sleep(random.uniform(0, RETRY_BASE_SECONDS * 2 ** attempt))
+
+    def send_all(self, messages: list[Message]) -> list[Exception | None]:
+        """Send every message concurrently; returns None or the error for each, in order."""
+        def attempt(message: Message) -> Exception | None:
+            try:
+                self.send(message)
+                return None
+            except Exception as e:
+                return e
+
+        return list(self._executor.map(attempt, messages))
+
+
+_dispatcher: AlertDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_alert_dispatcher() -> AlertDispatcher:
+    """Return the process-wide dispatcher for the SMTP settings in the environment."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                pool = SMTPConnectionPool(
+                    SMTPSettings.from_env(),
+                    size=ALERT_SMTP_POOL_SIZE,
+                    min_idle=ALERT_SMTP_MIN_IDLE,
+                    health_check_seconds=ALERT_SMTP_HEALTH_CHECK_SECONDS,
+                    max_age_seconds=ALERT_SMTP_MAX_AGE_SECONDS,
+                    timeout_seconds=ALERT_SMTP_TIMEOUT_SECONDS,
+                )
+                if pool.settings.configured:
+                    pool.start_maintenance()
+                _dispatcher = AlertDispatcher(pool, max_retries=ALERT_SMTP_MAX_RETRIES)
+    return _dispatcher
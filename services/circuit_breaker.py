@@ -0,0 +1,208 @@
+"""Circuit breakers for external dependencies (Gemini models, Spitch).
+
+A `CircuitBreaker` wraps calls to one dependency:
+  - closed: calls pass through; outcomes are kept in a sliding window
+  - open: once the window's failure rate or slow-call rate reaches its
+    threshold, calls fail immediately with CircuitOpenError
+  - half-open: after `open_seconds` one probe call is let through; success
+    closes the breaker, failure opens it again
+
+Each breaker also caps concurrent calls, so a hanging dependency ties up at
+most `max_concurrent` worker threads instead of all of them.
+
+Breakers are shared per name through `get_breaker(name)`; names are
+'<role>:<model>' for LLM calls and 'spitch' for the speech API.
+"""
+import math
+import threading
+import time
+from collections import deque
+
+from core.config import (
+    BREAKER_FAILURE_RATE,
+    BREAKER_MAX_CONCURRENT,
+    BREAKER_MIN_CALLS,
+    BREAKER_OPEN_SECONDS,
+    BREAKER_SLOW_CALL_RATE,
+    BREAKER_SLOW_CALL_SECONDS,
+    BREAKER_WINDOW,
+)
+from core.deadline import DeadlineExceeded
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open or saturated."""
+
+    def __init__(self, name: str, reason: str, retry_after: float):
+        super().__init__(f"{name} unavailable: {reason}")
+        self.name = name
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class CircuitBreaker:
+    """Error-rate and latency circuit breaker with a concurrency cap."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 30.0,
+        slow_call_rate: float = 0.8,
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        max_concurrent: int = 16,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.max_concurrent = max_concurrent
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._in_flight = 0
+        self._outcomes: deque[tuple[bool, bool]] = deque(maxlen=window)  # (failed, slow)
+        self._counters = {"calls": 0, "failures": 0, "rejected_open": 0, "rejected_saturated": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def call(self, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) through the breaker.
+
+        Raises CircuitOpenError without calling fn when the breaker is open
+        or the dependency already has max_concurrent calls in flight.
+        """
+        probe = self._before()
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except DeadlineExceeded:
+            # The caller gave up; says nothing about the dependency's health.
+            self._abandon(probe)
+            raise
+        except Exception:
+            self._after(probe, failed=True, seconds=time.monotonic() - start)
+            raise
+        self._after(probe, failed=False, seconds=time.monotonic() - start)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            failed = sum(1 for f, _ in self._outcomes if f)
+            slow = sum(1 for _, s in self._outcomes if s)
+            return {
+                "state": state,
+                "in_flight": self._in_flight,
+                "window_calls": len(self._outcomes),
+                "window_failures": failed,
+                "window_slow": slow,
+                **self._counters,
+            }
+
+    # ── Internals ──
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def _before(self) -> bool:
+        """Admit a call or raise; returns whether it is the half-open probe."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == OPEN or (state == HALF_OPEN and self._probing):
+                self._counters["rejected_open"] += 1
+                retry_after = self.open_seconds - (now - self._opened_at) if state == OPEN else 1
+                raise CircuitOpenError(self.name, "circuit open", retry_after)
+            if self._in_flight >= self.max_concurrent:
+                self._counters["rejected_saturated"] += 1
+                raise CircuitOpenError(self.name, "too many calls in flight", 1)
+            self._in_flight += 1
+            self._counters["calls"] += 1
+            probe = state == HALF_OPEN
+            if probe:
+                self._probing = True
+            return probe
+
+    def _after(self, probe: bool, failed: bool, seconds: float) -> None:
+        slow = seconds >= self.slow_call_seconds
+        with self._lock:
+            self._in_flight -= 1
+            if failed:
+                self._counters["failures"] += 1
+            if probe:
+                self._probing = False
+                if failed or slow:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+            # Calls that started before the breaker opened don't count.
+            if self._state != CLOSED:
+                return
+            self._outcomes.append((failed, slow))
+            if len(self._outcomes) < self.min_calls:
+                return
+            total = len(self._outcomes)
+            failures = sum(1 for f, _ in self._outcomes if f)
+            slow_calls = sum(1 for _, s in self._outcomes if s)
+            if failures / total >= self.failure_rate or slow_calls / total >= self.slow_call_rate:
+                self._open()
+
+    def _abandon(self, probe: bool) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if probe:
+                self._probing = False
+
+    def _open(self) -> None:
+        print(f"Circuit breaker '{self.name}' opened")
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._counters["opened"] += 1
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the shared breaker for `name`, creating it from the BREAKER_* settings."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(
+                name,
+                failure_rate=BREAKER_FAILURE_RATE,
+                slow_call_seconds=BREAKER_SLOW_CALL_SECONDS,
+                slow_call_rate=BREAKER_SLOW_CALL_RATE,
+                window=BREAKER_WINDOW,
+                min_calls=BREAKER_MIN_CALLS,
+                open_seconds=BREAKER_OPEN_SECONDS,
+                max_concurrent=BREAKER_MAX_CONCURRENT,
+            )
+        return _breakers[name]
+
+
+def breaker_stats() -> dict:
+    """State and counters for every breaker created so far."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.stats() for b in breakers}
@@ -0,0 +1,64 @@
+"""Degraded responses used when the language models are unavailable.
+
+When the orchestrator or a specialist cannot be reached (its circuit breaker
+is open, or the primary and fallback models both failed), users still get a
+safe answer: messages that look like an emergency get fixed safety guidance,
+everything else gets a short "try again" notice.
+"""
+import re
+
+# Deliberately broad: a false positive only adds safety advice.
+EMERGENCY_KEYWORDS = (
+    "chest pain", "can't breathe", "cannot breathe", "difficulty breathing", "shortness of breath",
+    "not breathing", "unconscious", "passed out", "fainted", "seizure", "convulsion", "stroke",
+    "face drooping", "slurred speech", "severe bleeding", "bleeding heavily", "heavy bleeding",
+    "suicide", "kill myself", "overdose", "poison", "anaphylaxis", "throat swelling",
+    "heart attack", "severe headache", "vision loss", "baby not moving", "water broke",
+)
+
+_EMERGENCY_PATTERN = re.compile("|".join(re.escape(k) for k in EMERGENCY_KEYWORDS), re.IGNORECASE)
+
+EMERGENCY_SAFETY_RESPONSE = (
+    "I'm having trouble reaching my medical assistant right now, but what you describe "
+    "may be a medical emergency.\n\n"
+    "**Call your local emergency number (112 / 199 in Nigeria, 911 in the US) or go to the "
+    "nearest emergency department now.** Do not wait for symptoms to get worse.\n\n"
+    "- If someone is with you, tell them what is happening.\n"
+    "- Do not drive yourself if you feel faint, confused or have chest pain.\n"
+    "- If you are thinking about harming yourself, contact emergency services or a crisis line immediately."
+)
+
+DEGRADED_CHAT_RESPONSE = (
+    "I'm temporarily unable to answer because my medical assistant service is unavailable. "
+    "Please try again in a few minutes. If your symptoms are severe or getting worse, "
+    "contact a healthcare provider or your local emergency number."
+)
+
+SPECIALIST_UNAVAILABLE = (
+    "The {name} specialist is temporarily unavailable. Answer from general guidance, "
+    "say that specialist input could not be obtained, and advise the user to consult a healthcare provider."
+)
+
+
+def looks_like_emergency(text: str) -> bool:
+    """Whether the text mentions a red-flag symptom."""
+    return bool(text and _EMERGENCY_PATTERN.search(text))
+
+
+def degraded_chat_response(message: str) -> dict:
+    """run()-shaped response for when the orchestrator cannot answer."""
+    return {
+        "response": EMERGENCY_SAFETY_RESPONSE if looks_like_emergency(message) else DEGRADED_CHAT_RESPONSE,
+        "risk_level": None,
+        "urgency": None,
+        "emergency_alert_sent": False,
+        "emergency_alert_pending": False,
+        "degraded": True,
+    }
+
+
+def specialist_fallback(specialist_type: str, question: str) -> str:
+    """Tool output returned to the orchestrator when a specialist cannot answer."""
+    if specialist_type == "emergency" or looks_like_emergency(question):
+        return EMERGENCY_SAFETY_RESPONSE
+    return SPECIALIST_UNAVAILABLE.format(name=specialist_type.replace("_", " "))
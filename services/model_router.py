@@ -0,0 +1,94 @@
+"""Per-role model selection with automatic downgrade under load.
+
+`ModelRouter.select(role)` returns the model configured for a role in
+AgentConfig, or the fast tier while the service is overloaded: too many
+chats waiting or in flight, or the recent p95 chat latency above target.
+Pinned roles (emergency triage by default) never downgrade.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable
+
+from agent_config import AgentConfig
+
+# Latency samples older than this no longer influence the p95.
+LATENCY_WINDOW_SECONDS = 300
+LATENCY_WINDOW_SIZE = 500
+
+
+class ModelRouter:
+    """Chooses a model per role from the config and current load."""
+
+    def __init__(self, config: AgentConfig):
+        self.config = config
+        self._in_flight = 0
+        self._latencies: deque[tuple[float, float]] = deque(maxlen=LATENCY_WINDOW_SIZE)
+        self._queue_depth_source: Callable[[], int] | None = None
+        self._lock = threading.Lock()
+
+    def set_queue_depth_source(self, source: Callable[[], int]) -> None:
+        """Count requests waiting outside the router (e.g. an admission queue)."""
+        self._queue_depth_source = source
+
+    @contextmanager
+    def track_request(self):
+        """Count a chat request as in flight and record its latency."""
+        with self._lock:
+            self._in_flight += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                self._in_flight -= 1
+                self._latencies.append((now, now - start))
+
+    def queue_depth(self) -> int:
+        waiting = self._queue_depth_source() if self._queue_depth_source else 0
+        return self._in_flight + waiting
+
+    def p95_ms(self) -> float:
+        cutoff = time.monotonic() - LATENCY_WINDOW_SECONDS
+        with self._lock:
+            recent = sorted(seconds for at, seconds in self._latencies if at >= cutoff)
+        if not recent:
+            return 0.0
+        return recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000
+
+    def overloaded(self, config: AgentConfig | None = None) -> bool:
+        cfg = config or self.config
+        if cfg.downgrade_queue_depth and self.queue_depth() > cfg.downgrade_queue_depth:
+            return True
+        return bool(cfg.latency_target_p95_ms and self.p95_ms() > cfg.latency_target_p95_ms)
+
+    def select(self, role: str, config: AgentConfig | None = None) -> str:
+        """Model to use for `role` right now (per `config`, default the router's own)."""
+        cfg = config or self.config
+        model = cfg.model_for(role)
+        if role in cfg.pinned_roles or not cfg.fast_model_name:
+            return model
+        return cfg.fast_model_name if self.overloaded(cfg) else model
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue_depth(),
+            "p95_ms": self.p95_ms(),
+            "overloaded": self.overloaded(),
+        }
+
+
+_router: ModelRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide ModelRouter built from AgentConfig.from_env()."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter(AgentConfig.from_env())
+    return _router
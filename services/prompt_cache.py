@@ -0,0 +1,210 @@
+"""Provider-side context caching for static prompt prefixes.
+
+The orchestrator prompt with its tool schemas, and each specialist's
+SYSTEM_PROMPT, are identical on every call. `PromptCache` registers each
+prefix once with the provider's context-cache facility and hands out the
+cache name, refreshing the TTL shortly before it expires. Requests then send
+only the dynamic part and reference the cached prefix.
+
+Backends:
+  - GeminiContextCache: Gemini `caches` API via google-genai
+  - LocalContextCache: in-memory stand-in for tests and benchmarks
+
+A prefix the provider refuses (e.g. below its minimum cacheable size) is not
+retried until `failure_backoff_seconds` have passed; callers then fall back
+to sending the full prompt.
+"""
+import hashlib
+import itertools
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+
+from core import deadline
+from core.config import (
+    PROMPT_CACHE_BACKEND,
+    PROMPT_CACHE_REFRESH_MARGIN_SECONDS,
+    PROMPT_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass
+class CacheHandle:
+    """A provider cache entry and when it expires (epoch seconds)."""
+
+    name: str
+    expires_at: float
+
+
+class LocalContextCache:
+    """In-memory stand-in for the provider cache; records what was cached."""
+
+    def __init__(self):
+        self.entries: dict[str, dict] = {}
+        self.creates = 0
+        self.refreshes = 0
+        self._ids = itertools.count(1)
+
+    def create(self, model: str, system_instruction: str, tools: list[dict] | None, ttl_seconds: int) -> CacheHandle:
+        name = f"cachedContents/local-{next(self._ids)}"
+        self.entries[name] = {"model": model, "system_instruction": system_instruction, "tools": tools or []}
+        self.creates += 1
+        return CacheHandle(name=name, expires_at=time.time() + ttl_seconds)
+
+    def refresh(self, handle: CacheHandle, ttl_seconds: int) -> CacheHandle:
+        if handle.name not in self.entries:
+            raise KeyError(handle.name)
+        self.refreshes += 1
+        return CacheHandle(name=handle.name, expires_at=time.time() + ttl_seconds)
+
+
+class GeminiContextCache:
+    """Gemini context caching through the google-genai client."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        return self._client
+
+    def create(self, model: str, system_instruction: str, tools: list[dict] | None, ttl_seconds: int) -> CacheHandle:
+        from google.genai import types
+
+        config = types.CreateCachedContentConfig(
+            system_instruction=system_instruction,
+            ttl=f"{ttl_seconds}s",
+            display_name="zionx-prompt-prefix",
+        )
+        if tools:
+            config.tools = [types.Tool(function_declarations=[
+                types.FunctionDeclaration(
+                    name=t["name"],
+                    description=t.get("description", ""),
+                    parameters_json_schema=t.get("parameters"),
+                )
+                for t in tools
+            ])]
+        cache = self.client.caches.create(model=model, config=config)
+        return CacheHandle(name=cache.name, expires_at=time.time() + ttl_seconds)
+
+    def refresh(self, handle: CacheHandle, ttl_seconds: int) -> CacheHandle:
+        from google.genai import types
+
+        self.client.caches.update(name=handle.name, config=types.UpdateCachedContentConfig(ttl=f"{ttl_seconds}s"))
+        return CacheHandle(name=handle.name, expires_at=time.time() + ttl_seconds)
+
+
+class PromptCache:
+    """Hands out provider cache names for static prefixes, keeping them fresh."""
+
+    def __init__(
+        self,
+        backend,
+        ttl_seconds: int = 3600,
+        refresh_margin_seconds: int = 300,
+        failure_backoff_seconds: int = 3600,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.failure_backoff_seconds = failure_backoff_seconds
+        self._handles: dict[str, CacheHandle] = {}
+        self._failed_until: dict[str, float] = {}
+        # Creates and refreshes in progress, so concurrent requests for the
+        # same prefix wait for one provider call instead of each making one.
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model: str, system_instruction: str, tools: list[dict] | None) -> str:
+        digest = hashlib.sha256(system_instruction.encode())
+        for tool in tools or []:
+            digest.update(repr(sorted(tool.items())).encode())
+        return f"{model}:{digest.hexdigest()}"
+
+    def get(self, model: str, system_instruction: str, tools: list[dict] | None = None) -> str | None:
+        """Return the cache name for this prefix, creating or refreshing it as needed.
+
+        The provider call runs outside the lock. Other callers for the same
+        prefix keep using the current handle while it is still valid, or wait
+        for the call (within the request deadline).
+
+        Returns None when the prefix cannot be cached right now.
+        """
+        key = self._key(model, system_instruction, tools)
+        now = time.time()
+        with self._lock:
+            if self._failed_until.get(key, 0) > now:
+                return None
+            handle = self._handles.get(key)
+            if handle is not None and handle.expires_at - now > self.refresh_margin_seconds:
+                return handle.name
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = future = Future()
+        if pending is not None:
+            if handle is not None and handle.expires_at > now:
+                return handle.name
+            try:
+                return pending.result(timeout=deadline.bounded(None))
+            except FutureTimeout:
+                return None
+
+        try:
+            if handle is None or handle.expires_at <= now:
+                handle = self.backend.create(model, system_instruction, tools, self.ttl_seconds)
+            else:
+                try:
+                    handle = self.backend.refresh(handle, self.ttl_seconds)
+                except Exception:
+                    handle = self.backend.create(model, system_instruction, tools, self.ttl_seconds)
+        except Exception as e:
+            print(f"Error caching prompt prefix for {model}: {e}")
+            handle = None
+        with self._lock:
+            del self._pending[key]
+            if handle is None:
+                self._handles.pop(key, None)
+                self._failed_until[key] = now + self.failure_backoff_seconds
+            else:
+                self._handles[key] = handle
+        name = handle.name if handle else None
+        future.set_result(name)
+        return name
+
+    def invalidate(self, model: str, system_instruction: str, tools: list[dict] | None = None) -> None:
+        """Stop using a prefix the provider rejected at request time."""
+        key = self._key(model, system_instruction, tools)
+        with self._lock:
+            self._handles.pop(key, None)
+            self._failed_until[key] = time.time() + self.failure_backoff_seconds
+
+
+_prompt_cache: PromptCache | None = None
+_prompt_cache_lock = threading.Lock()
+
+
+def get_prompt_cache() -> PromptCache | None:
+    """Return the process-wide PromptCache, or None when caching is disabled.
+
+    The backend comes from PROMPT_CACHE_BACKEND: 'gemini', 'local' or 'off'.
+    """
+    global _prompt_cache
+    if PROMPT_CACHE_BACKEND not in ("gemini", "local"):
+        return None
+    if _prompt_cache is None:
+        with _prompt_cache_lock:
+            if _prompt_cache is None:
+                backend = GeminiContextCache() if PROMPT_CACHE_BACKEND == "gemini" else LocalContextCache()
+                _prompt_cache = PromptCache(
+                    backend,
+                    ttl_seconds=PROMPT_CACHE_TTL_SECONDS,
+                    refresh_margin_seconds=PROMPT_CACHE_REFRESH_MARGIN_SECONDS,
+                )
+    return _prompt_cache
@@ -0,0 +1,11 @@
+import pytest
+
+from core import json_cache
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    """Run in an empty directory, where the file stores create their folders."""
+    monkeypatch.chdir(tmp_path)
+    json_cache._cache.clear()
+    return tmp_path
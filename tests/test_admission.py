@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+def controller(**overrides) -> AdmissionController:
+    settings = dict(max_concurrent=1, max_queue=4, user_rate_per_minute=600, user_burst=10, max_wait_seconds=5)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def wait_for(condition, timeout: float = 2.0) -> None:
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.005)
+
+
+def test_rejects_users_over_their_rate():
+    admission = controller(user_rate_per_minute=1, user_burst=2)
+    for _ in range(2):
+        with admission.admit("u"):
+            pass
+    with pytest.raises(AdmissionRejected) as rejected:
+        with admission.admit("u"):
+            pass
+    assert rejected.value.retry_after >= 1
+    assert admission.metrics()["rejected_rate"] == 1
+    with admission.admit("other"):
+        pass
+
+
+def test_queue_full_rejection_does_not_use_a_rate_token():
+    admission = controller(max_queue=0, user_rate_per_minute=1, user_burst=1)
+    with admission.admit("busy"):
+        for _ in range(3):
+            with pytest.raises(AdmissionRejected, match="busy"):
+                with admission.admit("u"):
+                    pass
+    with admission.admit("u"):
+        pass
+    metrics = admission.metrics()
+    assert metrics["rejected_queue_full"] == 3
+    assert metrics["rejected_rate"] == 0
+
+
+def test_queued_request_runs_when_a_slot_frees():
+    admission = controller()
+    admitted = threading.Event()
+
+    def queued():
+        with admission.admit("waiter"):
+            admitted.set()
+
+    with admission.admit("holder"):
+        thread = threading.Thread(target=queued)
+        thread.start()
+        wait_for(lambda: admission.queue_depth() == 1)
+        assert not admitted.is_set()
+    thread.join(2)
+    assert admitted.is_set()
+    assert admission.metrics()["queued"] == 1
+    assert admission.queue_depth() == 0
+
+
+def test_queue_wait_times_out():
+    admission = controller(max_wait_seconds=0.05)
+    with admission.admit("holder"):
+        with pytest.raises(AdmissionRejected, match="Timed out"):
+            with admission.admit("waiter"):
+                pass
+    assert admission.queue_depth() == 0
+    assert admission.metrics()["rejected_timeout"] == 1
+
+
+def test_queue_is_served_round_robin_across_users():
+    admission = controller()
+    order = []
+    threads = []
+
+    def queued(user_id):
+        with admission.admit(user_id):
+            order.append(user_id)
+
+    with admission.admit("holder"):
+        for user_id in ("busy", "busy", "busy", "quiet"):
+            thread = threading.Thread(target=queued, args=(user_id,))
+            thread.start()
+            threads.append(thread)
+            wait_for(lambda: admission.queue_depth() == len(threads))
+    for thread in threads:
+        thread.join(2)
+    assert order == ["busy", "quiet", "busy", "busy"]
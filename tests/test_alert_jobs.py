@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from alert_history import load_alert_history, save_alert_record
+from alert_suppression import AlertSuppressor
+
+
+@pytest.fixture
+def sent(store_dir, monkeypatch):
+    """Alerts passed to send_emergency_alert, which always succeeds."""
+    calls = []
+
+    def send(user_id, alert_data):
+        calls.append((user_id, alert_data))
+        return True, "delivered"
+
+    monkeypatch.setattr(main, "send_emergency_alert", send)
+    return calls
+
+
+def test_alert_is_matched_by_key_not_by_reused_job_id(sent):
+    # Recorded before the job database was recreated and its IDs restarted.
+    save_alert_record("u1", {"severity": "critical"}, True, "delivered", job_id=1, alert_key="old")
+
+    payload = {"user_id": "u1", "alert_key": "new", "alert_data": {"severity": "critical"}}
+    main._emergency_alert_job(payload, {"id": 1})
+    main._emergency_alert_job(payload, {"id": 1})  # retried after recording
+
+    assert len(sent) == 1
+    assert [r["alert_key"] for r in load_alert_history("u1")] == ["old", "new"]
+
+
+def test_suppressed_count_is_written_to_the_keyed_alert(sent):
+    save_alert_record("u1", {"severity": "critical"}, True, "delivered", job_id=1, alert_key="old")
+    save_alert_record("u1", {"severity": "critical"}, True, "delivered", job_id=1, alert_key="new")
+    main._alert_suppressed_job({"user_id": "u1", "alert_key": "new", "suppressed_count": 2}, {"id": 5})
+    assert [r["suppressed_count"] for r in load_alert_history("u1")] == [0, 2]
+
+
+class FakeAgent:
+    def __init__(self, structured):
+        self.structured = structured
+
+    def invoke(self, state, config=None):
+        return {"structured_response": self.structured}
+
+
+@pytest.fixture
+def critical_turn(store_dir, monkeypatch):
+    """run() answers a critical turn; returns the job kinds queued, in order."""
+    structured = SimpleNamespace(
+        normal_response="Call emergency services now.", fact="has asthma", risk_level="critical", urgency="call_emergency"
+    )
+    monkeypatch.setattr(main, "get_agent", lambda: FakeAgent(structured))
+    monkeypatch.setattr(main, "alert_suppressor", AlertSuppressor("alert_suppression", 3600, 600))
+    queued = []
+
+    def enqueue(kind, payload, **options):
+        queued.append(kind)
+        return len(queued)
+
+    monkeypatch.setattr(main.job_queue, "enqueue", enqueue)
+    return queued
+
+
+def test_alert_is_queued_before_persistence(critical_turn):
+    result = main.run("I can't breathe", user_id="u1")
+    assert critical_turn == ["emergency_alert", "save_fact", "save_risk_assessment"]
+    assert result["emergency_alert_pending"] is True
+    assert main.alert_suppressor._states["u1"].last_alert_key is not None
+
+
+def test_failed_enqueue_keeps_the_answer(critical_turn, monkeypatch):
+    def enqueue(kind, payload, **options):
+        critical_turn.append(kind)
+        if kind == "save_fact":
+            raise RuntimeError("database is locked")
+        return 1
+
+    monkeypatch.setattr(main.job_queue, "enqueue", enqueue)
+    result = main.run("I can't breathe", user_id="u1")
+    assert result["response"] == "Call emergency services now."
+    assert "degraded" not in result
+    assert result["emergency_alert_pending"] is True
+    assert critical_turn == ["emergency_alert", "save_fact", "save_risk_assessment"]
+
+
+def test_alert_that_cannot_be_queued_is_not_pending_and_not_suppressed(critical_turn, monkeypatch):
+    def enqueue(kind, payload, **options):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(main.job_queue, "enqueue", enqueue)
+    result = main.run("I can't breathe", user_id="u1")
+    assert result["response"] == "Call emergency services now."
+    assert result["emergency_alert_pending"] is False
+
+    # The window was released, so the next critical turn is sent rather than suppressed.
+    monkeypatch.setattr(main.job_queue, "enqueue", lambda kind, payload, **options: 1)
+    assert main.run("Still can't breathe", user_id="u1")["emergency_alert_pending"] is True
@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("pypdf")
+
+import document_extractor  # noqa: E402
+from benchmarks.extract_bench import synthetic_pdf  # noqa: E402
+
+
+@pytest.fixture
+def pdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_extractor, "_worker_pdf", (None, None))
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(synthetic_pdf(12))
+    return str(path)
+
+
+def test_worker_keeps_the_reader_between_batches_and_drops_it_at_the_end(pdf):
+    pages = document_extractor._pdf_pages_text(pdf, 0, 4, None)
+    assert [n for n, _ in pages] == [1, 2, 3, 4]
+    assert document_extractor._worker_pdf[0] is not None
+
+    pages = document_extractor._pdf_pages_text(pdf, 8, 12, None)
+    assert [n for n, _ in pages] == [9, 10, 11, 12]
+    assert document_extractor._worker_pdf == (None, None)
+
+
+def test_worker_drops_the_reader_once_the_budget_is_met(pdf):
+    pages = document_extractor._pdf_pages_text(pdf, 0, 4, max_chars=1)
+    assert len(pages) == 1
+    assert document_extractor._worker_pdf == (None, None)
+
+
+def test_batch_after_the_file_was_deleted_returns_nothing(pdf, tmp_path):
+    document_extractor._pdf_pages_text(pdf, 0, 4, None)
+    (tmp_path / "doc.pdf").unlink()
+    assert document_extractor._pdf_pages_text(pdf, 4, 8, None) == []
+    assert document_extractor._worker_pdf == (None, None)
@@ -0,0 +1,26 @@
+from emergency_alerts import render_alert
+
+
+def bodies(message) -> list[str]:
+    return [part.get_payload(decode=True).decode() for part in message.get_payload()]
+
+
+def test_user_text_cannot_fill_recipient_slots():
+    symptoms = "pain \ue000name\ue000 ${name} $role $$ 5$"
+    rendered = render_alert("ada$", {"severity": "critical", "symptoms": symptoms}, "alerts@example.com")
+    message = rendered.message_for("doc@example.com", "Dr. Obi", "doctor")
+
+    text, html = bodies(message)
+    for body in (text, html):
+        assert symptoms in body
+        assert body.count("Dr. Obi") == 1
+        assert "ada$" in body
+    assert "As their designated doctor" in text
+    assert message["Subject"] == "⚠️ URGENT: Health Alert for ada$"
+
+
+def test_role_line_follows_contact_type():
+    rendered = render_alert("ada", {"severity": "high"}, "alerts@example.com")
+    text, _ = bodies(rendered.message_for("kin@example.com", "Bola", "family"))
+    assert "Dear Bola," in text
+    assert "As their emergency contact" in text
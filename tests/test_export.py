@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import daily_tracking
+from core.pagination import InvalidCursor
+from export import decode_export_cursor, encode_export_cursor, export_stream
+
+USER = {"user_id": "u1", "username": "nobody"}
+
+
+def export_lines(cursor=None) -> list[dict]:
+    return [json.loads(line) for line in b"".join(export_stream(USER, cursor)).splitlines()]
+
+
+def records(lines: list[dict], section: str) -> list[dict]:
+    return [line for line in lines if line["type"] == section]
+
+
+def batch_entry(when: datetime, client_entry_id: str) -> dict:
+    return daily_tracking.parse_batch_entry(
+        {"timestamp": when.isoformat(), "client_entry_id": client_entry_id, "mood": "ok"}
+    )
+
+
+def test_export_lists_every_record_with_counts(store_dir):
+    for mood in ("good", "tired", "fine"):
+        daily_tracking.save_daily_tracking("u1", {"mood": mood})
+    lines = export_lines()
+    assert lines[0]["type"] == "export"
+    assert [r["data"]["mood"] for r in records(lines, "tracking")] == ["good", "tired", "fine"]
+    assert lines[-1]["type"] == "end"
+    assert lines[-1]["counts"]["tracking"] == 3
+    assert lines[-1]["counts"]["risk"] == 0
+
+
+def test_resume_after_cursor_is_not_shifted_by_inserted_records(store_dir):
+    now = datetime.now()
+    daily_tracking.save_tracking_batch(
+        "u1", [batch_entry(now - timedelta(hours=h), f"c{h}") for h in (5, 4, 3, 2, 1)]
+    )
+    first = records(export_lines(), "tracking")
+    cursor = first[1]["cursor"]  # the client received two records, then dropped
+
+    # An offline sync merges an older entry in front of the cursor, and one after it.
+    daily_tracking.save_tracking_batch("u1", [
+        batch_entry(now - timedelta(hours=6), "early"),
+        batch_entry(now - timedelta(hours=2, minutes=30), "late"),
+    ])
+    resumed = export_lines(cursor)
+    assert resumed[0]["resumed_from"] == cursor
+    assert [r["data"]["client_entry_id"] for r in records(resumed, "tracking")] == ["c3", "late", "c2", "c1"]
+    assert resumed[-1]["counts"]["tracking"] == 4
+
+
+def test_resume_by_position_in_append_only_sections(store_dir):
+    (store_dir / "memory").mkdir()
+    (store_dir / "memory" / "u1.txt").write_text("fact one\nfact two\nfact three\n")
+    facts = records(export_lines(), "facts")
+    resumed = export_lines(facts[0]["cursor"])
+    assert [r["data"]["fact"] for r in records(resumed, "facts")] == ["fact two", "fact three"]
+
+
+def test_cursor_round_trip_and_validation():
+    assert decode_export_cursor(encode_export_cursor(1, 4)) == (1, 4)
+    assert decode_export_cursor(encode_export_cursor(3, "2026-01-01T00:00:00", "abc")) == (
+        3, ("2026-01-01T00:00:00", "abc")
+    )
+    for bad in ("not base64!", encode_export_cursor(3, 4), encode_export_cursor(1, "x", "y"),
+                encode_export_cursor(99, 0)):
+        with pytest.raises(InvalidCursor):
+            decode_export_cursor(bad)
@@ -0,0 +1,132 @@
+import time
+
+import pytest
+
+import job_queue
+from job_queue import DONE, FAILED, PENDING, PRIORITY_HIGH, RUNNING, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """A queue whose jobs run only when a test claims or runs them."""
+    q = JobQueue(str(tmp_path / "jobs.db"), workers=2, reserved_workers=1, max_attempts=3)
+    monkeypatch.setattr(q, "start", lambda: None)
+    return q
+
+
+def test_runs_job_and_stores_result(queue):
+    queue.register("add", lambda payload, job: payload["a"] + payload["b"])
+    job_id = queue.enqueue("add", {"a": 2, "b": 3}, user_id="u")
+    assert queue.unfinished("add", "u")[0]["id"] == job_id
+
+    assert queue.run_pending() == 1
+    job = queue.get(job_id)
+    assert job["status"] == DONE
+    assert job["result"] == 5
+    assert job["attempts"] == 1
+    assert queue.unfinished("add", "u") == []
+
+
+def test_failed_job_is_retried_with_backoff(queue):
+    calls = []
+
+    def flaky(payload, job):
+        calls.append(job["attempts"])
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return "ok"
+
+    queue.register("flaky", flaky)
+    job_id = queue.enqueue("flaky", {})
+    before = time.time()
+    queue.run_pending()
+
+    job = queue.get(job_id)
+    assert job["status"] == PENDING
+    assert job["last_error"] == "transient"
+    assert job["run_after"] >= before + job_queue.RETRY_BASE_SECONDS
+    assert queue.run_pending() == 0  # not due yet
+
+    queue._conn().execute("UPDATE jobs SET run_after = 0 WHERE id = ?", (job_id,))
+    queue.run_pending()
+    job = queue.get(job_id)
+    assert job["status"] == DONE
+    assert calls == [1, 2]
+
+
+def test_job_fails_after_max_attempts(queue, monkeypatch):
+    monkeypatch.setattr(job_queue, "RETRY_BASE_SECONDS", 0)
+
+    def broken(payload, job):
+        raise RuntimeError("permanent")
+
+    queue.register("broken", broken)
+    job_id = queue.enqueue("broken", {})
+    assert queue.run_pending() == 3
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["attempts"] == 3
+
+
+def test_expired_lease_is_claimed_again(queue):
+    queue.lease_seconds = 0.05
+    job_id = queue.enqueue("work", {})
+
+    first = queue._claim(high_only=False)
+    assert first["id"] == job_id
+    assert queue.get(job_id)["status"] == RUNNING
+    assert queue._claim(high_only=False) is None  # still leased
+
+    time.sleep(0.1)
+    second = queue._claim(high_only=False)
+    assert second["id"] == job_id
+    assert second["attempts"] == 2
+
+
+def test_expired_lease_on_final_attempt_fails_the_job(queue):
+    queue.lease_seconds = 0.05
+    job_id = queue.enqueue("work", {}, max_attempts=1)
+    queue._claim(high_only=False)
+
+    time.sleep(0.1)
+    assert queue._claim(high_only=False) is None
+    job = queue.get(job_id)
+    assert job["status"] == FAILED
+    assert job["last_error"] == "lease expired on final attempt"
+
+
+def test_jobs_in_one_lane_run_one_at_a_time(queue):
+    queue.register("write", lambda payload, job: None)
+    first = queue.enqueue("write", {}, lane="user:a")
+    second = queue.enqueue("write", {}, lane="user:a")
+    other = queue.enqueue("write", {}, lane="user:b")
+
+    assert queue._claim(high_only=False)["id"] == first
+    assert queue._claim(high_only=False)["id"] == other
+    assert queue._claim(high_only=False) is None
+
+    queue._execute({**queue.get(first), "attempts": 1})
+    assert queue._claim(high_only=False)["id"] == second
+
+
+def test_high_priority_first_and_reserved_workers_take_only_high(queue):
+    normal = queue.enqueue("work", {})
+    high = queue.enqueue("work", {}, priority=PRIORITY_HIGH)
+
+    assert queue._claim(high_only=True)["id"] == high
+    assert queue._claim(high_only=True) is None
+    assert queue._claim(high_only=False)["id"] == normal
+
+
+def test_relative_path_survives_chdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    queue = JobQueue("jobs.db")
+    monkeypatch.setattr(queue, "start", lambda: None)
+    job_id = queue.enqueue("work", {})
+
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    queue._local.conn = None  # as in a worker thread started after the chdir
+    assert queue.get(job_id)["id"] == job_id
+    assert not (elsewhere / "jobs.db").exists()
@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field, replace
+from types import SimpleNamespace
+from typing import TypedDict
+
+import pytest
+
+structured_output = pytest.importorskip("langchain.agents.structured_output")
+from langchain_core.messages import HumanMessage, SystemMessage  # noqa: E402
+
+from agent_middleware import PromptCacheMiddleware  # noqa: E402
+from services.prompt_cache import LocalContextCache, PromptCache  # noqa: E402
+
+
+@dataclass
+class FakeRequest:
+    """The ModelRequest fields PromptCacheMiddleware reads or overrides."""
+
+    model: object
+    system_prompt: str | None
+    messages: list
+    tools: list
+    response_format: object = None
+    model_settings: dict = field(default_factory=dict)
+
+    def override(self, **changes):
+        return replace(self, **changes)
+
+
+class Answer(TypedDict):
+    """Structured response schema standing in for core.models.Chat."""
+
+    text: str
+
+
+def lookup(query: str) -> str:
+    """Look up a health topic."""
+    return query
+
+
+def run_middleware(response_format):
+    cache = PromptCache(LocalContextCache())
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return "answer"
+
+    request = FakeRequest(
+        model=SimpleNamespace(model="gemini-test"),
+        system_prompt="You are the orchestrator.",
+        messages=[SystemMessage(content="User profile"), HumanMessage(content="Hi")],
+        tools=[lookup],
+        response_format=response_format,
+    )
+    PromptCacheMiddleware(cache).wrap_model_call(request, handler)
+    return cache, request, sent
+
+
+def test_cached_request_carries_no_system_prompt_tools_or_tool_strategy():
+    cache, request, sent = run_middleware(structured_output.AutoStrategy(Answer))
+    assert len(sent) == 1
+    final = sent[0]
+    assert final.model_settings["cached_content"] in cache.backend.entries
+    assert final.system_prompt is None
+    assert final.tools == []
+    assert not any(isinstance(m, SystemMessage) for m in final.messages)
+    assert isinstance(final.response_format, structured_output.ProviderStrategy)
+    assert final.response_format.schema is Answer
+    assert cache.backend.entries[final.model_settings["cached_content"]]["tools"][0]["name"] == "lookup"
+
+
+def test_tool_strategy_is_sent_uncached():
+    cache, request, sent = run_middleware(structured_output.ToolStrategy(Answer))
+    assert sent == [request]
+    assert cache.backend.creates == 0
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+import alert_history
+import risk_monitor
+from core.rollup import load_rollup, rollup_path
+
+
+def without_zero_counters(value):
+    """A rollup with zero counters dropped: an update can leave one that a rebuild would not create."""
+    if isinstance(value, dict):
+        return {k: without_zero_counters(v) for k, v in value.items() if v != 0}
+    return value
+
+
+def stored_rollup(history_path: Path, build) -> dict:
+    """The rollup on disk, failing the test if it is stale or differs from a rebuild."""
+    def rebuild(records):
+        raise AssertionError("rollup is out of date with its history")
+
+    rollup = load_rollup(history_path, rebuild)
+    stored = {k: v for k, v in rollup.items() if k not in ("version", "source")}
+    rebuilt = build(json.loads(history_path.read_text()))
+    assert without_zero_counters(stored) == without_zero_counters(rebuilt)
+    return rollup
+
+
+def test_risk_rollup_matches_history_after_saves(store_dir):
+    for level in ("low", "high", "medium", "high"):
+        risk_monitor.save_risk_assessment("u1", {"risk_level": level, "urgency": "routine", "message": level})
+
+    path = Path(risk_monitor.RISK_DIR) / "u1.json"
+    stored_rollup(path, risk_monitor._build_rollup)
+    summary = risk_monitor.get_risk_summary("u1")
+    assert summary["total_assessments"] == 4
+    assert summary["high_risk_count"] == 2
+    assert summary["latest_assessment"]["user_message"] == "high"
+
+
+def test_alert_rollup_matches_history_after_update(store_dir):
+    alert_history.save_alert_record("u1", {"severity": "high"}, True, "sent", job_id=1, alert_key="a1")
+    alert_history.save_alert_record("u1", {"severity": "critical"}, False, "queued", job_id=2, alert_key="a2")
+    assert alert_history.update_alert_record(
+        "u1", "a2", success=True, status="sent", message="delivered", suppressed_count=4
+    )
+
+    path = Path(alert_history.ALERTS_DIR) / "u1.json"
+    stored_rollup(path, alert_history._build_rollup)
+    summary = alert_history.get_alerts_summary("u1")
+    assert summary["total_alerts"] == 2
+    assert summary["successful_alerts"] == 2
+    assert summary["failed_alerts"] == 0
+    assert summary["suppressed_alerts"] == 4
+    assert summary["latest_alert"]["message"] == "delivered"
+
+
+def test_update_of_unknown_job_leaves_history_and_rollup(store_dir):
+    alert_history.save_alert_record("u1", {"severity": "high"}, True, "sent", job_id=1, alert_key="a1")
+    assert not alert_history.update_alert_record("u1", "missing", suppressed_count=3)
+    stored_rollup(Path(alert_history.ALERTS_DIR) / "u1.json", alert_history._build_rollup)
+    assert alert_history.get_alerts_summary("u1")["suppressed_alerts"] == 0
+
+
+def test_rollup_is_rebuilt_when_history_changes_without_it(store_dir):
+    risk_monitor.save_risk_assessment("u1", {"risk_level": "low"})
+    path = Path(risk_monitor.RISK_DIR) / "u1.json"
+    records = json.loads(path.read_text())
+    records.append({**records[0], "assessment_id": "seeded", "risk_level": "high"})
+    path.write_text(json.dumps(records))
+
+    summary = risk_monitor.get_risk_summary("u1")
+    assert summary["total_assessments"] == 2
+    assert summary["high_risk_count"] == 1
+    assert rollup_path(path).exists()
@@ -0,0 +1,101 @@
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+import daily_tracking
+from daily_tracking import parse_batch_entry, save_daily_tracking, save_tracking_batch
+
+
+def entry(when: datetime, client_entry_id: str | None = None, **fields) -> dict:
+    raw = {"timestamp": when.isoformat(), **fields}
+    if client_entry_id is not None:
+        raw["client_entry_id"] = client_entry_id
+    return parse_batch_entry(raw)
+
+
+def stored(user_id: str = "u1") -> list[dict]:
+    return json.loads((Path(daily_tracking.TRACKING_DIR) / f"{user_id}.json").read_text())
+
+
+def assert_ordered(records: list[dict]) -> None:
+    keys = [(r["timestamp"], r["entry_id"]) for r in records]
+    assert keys == sorted(keys)
+
+
+def test_batch_is_merged_in_time_order(store_dir):
+    now = datetime.now()
+    save_daily_tracking("u1", {"mood": "live"})
+    result = save_tracking_batch("u1", [
+        entry(now - timedelta(hours=1), "b", mood="newer"),
+        entry(now - timedelta(days=2), "a", mood="older"),
+    ])
+    assert [e["mood"] for e in result["saved"]] == ["older", "newer"]
+    records = stored()
+    assert [r["mood"] for r in records] == ["older", "newer", "live"]
+    assert_ordered(records)
+
+
+def test_resubmitted_and_repeated_entries_are_skipped(store_dir):
+    now = datetime.now()
+    first = [entry(now - timedelta(hours=3), "a"), entry(now - timedelta(hours=2), "b")]
+    save_tracking_batch("u1", first)
+
+    result = save_tracking_batch("u1", [
+        entry(now - timedelta(hours=3), "a"),
+        entry(now - timedelta(hours=1), "c"),
+        entry(now - timedelta(minutes=30), "c"),
+        entry(now - timedelta(minutes=10)),
+    ])
+    assert result["duplicates"] == ["a", "c"]
+    assert len(result["saved"]) == 2
+    assert [r.get("client_entry_id") for r in stored()] == ["a", "b", "c", None]
+
+
+def test_future_timestamp_is_clamped_and_live_saves_stay_ordered(store_dir):
+    ahead = entry(datetime.now() + timedelta(minutes=2), "fast-clock")
+    assert datetime.fromisoformat(ahead["timestamp"]) <= datetime.now()
+    save_tracking_batch("u1", [ahead])
+    save_daily_tracking("u1", {"mood": "after"})
+    records = stored()
+    assert [r.get("client_entry_id") for r in records] == ["fast-clock", None]
+    assert_ordered(records)
+
+
+def test_live_save_is_inserted_in_order_behind_a_later_stored_entry(store_dir):
+    path = Path(daily_tracking.TRACKING_DIR)
+    path.mkdir()
+    later = entry(datetime.now(), "x")
+    later["timestamp"] = (datetime.now() + timedelta(hours=1)).isoformat(timespec="microseconds")
+    (path / "u1.json").write_text(json.dumps([later]))
+
+    save_daily_tracking("u1", {"mood": "now"})
+    records = stored()
+    assert [r.get("client_entry_id") for r in records] == [None, "x"]
+    assert_ordered(records)
+
+
+@pytest.mark.parametrize("raw, message", [
+    ({"timestamp": "yesterday"}, "ISO 8601"),
+    ({"timestamp": (datetime.now() + timedelta(hours=1)).isoformat()}, "future"),
+    ({"timestamp": datetime.now().isoformat(), "client_entry_id": ""}, "client_entry_id"),
+    ({"timestamp": datetime.now().isoformat(), "symptoms": "cough"}, "symptoms"),
+    ("not an object", "object"),
+])
+def test_invalid_entries_are_rejected(raw, message):
+    with pytest.raises(ValueError, match=message):
+        parse_batch_entry(raw)
+
+
+def test_resubmitted_fast_clock_entry_is_a_duplicate(store_dir, monkeypatch):
+    submitted = datetime.now() + timedelta(minutes=3)
+    first = save_tracking_batch("u1", [entry(submitted, "q1")])
+    assert len(first["saved"]) == 1
+
+    # The retry is clamped to a later server time than the stored copy.
+    later = datetime.now() + timedelta(minutes=2)
+    monkeypatch.setattr(daily_tracking, "datetime", type("Later", (datetime,), {"now": staticmethod(lambda: later)}))
+    second = save_tracking_batch("u1", [entry(submitted, "q1")])
+    assert second == {"saved": [], "duplicates": ["q1"]}
+    assert [r["client_entry_id"] for r in stored()] == ["q1"]
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+import upload_jobs
+from job_queue import DONE, JobQueue
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """Upload jobs on a private queue and directory; jobs run only when a test runs them."""
+    queue = JobQueue(str(tmp_path / "uploads.db"))
+    queue.register("process_upload", upload_jobs._process_upload_job)
+    monkeypatch.setattr(queue, "start", lambda: None)
+    monkeypatch.setattr(upload_jobs, "upload_queue", queue)
+    monkeypatch.setattr(upload_jobs, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    return queue
+
+
+def test_upload_dir_does_not_depend_on_the_working_directory():
+    assert os.path.isabs(upload_jobs.UPLOAD_DIR)
+
+
+def test_job_finds_its_file_after_a_chdir(uploads, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    job_id = upload_jobs.enqueue_upload("u1", "notes.txt", b"Blood pressure 120/80", extract_facts=False)
+    stored = uploads.get(job_id)["payload"]["path"]
+    assert os.path.isabs(stored)
+
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    uploads.run_pending()
+
+    status = upload_jobs.get_upload_status(job_id, "u1")
+    assert status["status"] == DONE
+    assert status["result"] == {
+        "filename": "notes.txt", "content_extracted": True, "facts_extracted": False, "new_facts": 0,
+    }
+    assert not os.path.exists(stored)
+    assert upload_jobs.get_upload_status(job_id, "someone-else") is None
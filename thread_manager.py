@@ -1,10 +1,11 @@
 """Thread/session management for tracking recent conversations."""
 
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from core.codec import read_json, write_json
+
 THREADS_DIR = "user_threads"
 
 
@@ -32,12 +33,10 @@ def save_thread_metadata(user_id: str, thread_id: str, title: str, last_message:
         threads_file = _get_user_threads_file(user_id)
         
         # Load existing threads
-        threads = {}
-        if threads_file.exists():
-            try:
-                threads = json.loads(threads_file.read_text())
-            except json.JSONDecodeError:
-                threads = {}
+        try:
+            threads = read_json(threads_file, default={})
+        except ValueError:
+            threads = {}
         
         # Update or create thread metadata
         if thread_id in threads:
@@ -57,7 +56,7 @@ def save_thread_metadata(user_id: str, thread_id: str, title: str, last_message:
             }
         
         # Save back to file
-        threads_file.write_text(json.dumps(threads, indent=2))
+        write_json(threads_file, threads)
     except Exception as e:
         print(f"Error saving thread metadata: {e}")
 
@@ -78,7 +77,7 @@ def get_recent_threads(user_id: str, limit: int = 10) -> List[Dict]:
         if not threads_file.exists():
             return []
         
-        threads = json.loads(threads_file.read_text())
+        threads = read_json(threads_file)
         
         # Convert to list and sort by last_updated
         threads_list = list(threads.values())
@@ -103,12 +102,12 @@ def increment_thread_message_count(user_id: str, thread_id: str) -> None:
         if not threads_file.exists():
             return
         
-        threads = json.loads(threads_file.read_text())
+        threads = read_json(threads_file)
         
         if thread_id in threads:
             threads[thread_id]["message_count"] = threads[thread_id].get("message_count", 0) + 1
             threads[thread_id]["last_updated"] = datetime.now().isoformat()
-            threads_file.write_text(json.dumps(threads, indent=2))
+            write_json(threads_file, threads)
     except Exception as e:
         print(f"Error incrementing thread message count: {e}")
 
@@ -129,7 +128,7 @@ def get_thread_metadata(user_id: str, thread_id: str) -> Optional[Dict]:
         if not threads_file.exists():
             return None
         
-        threads = json.loads(threads_file.read_text())
+        threads = read_json(threads_file)
         return threads.get(thread_id)
     except Exception as e:
         print(f"Error getting thread metadata: {e}")
@@ -1,7 +1,7 @@
 """Diabetes advisory tool"""
 
 from langchain.tools import tool
-from .specialist_utils import get_specialist, build_messages
+from .specialist_utils import ask_specialist
 
 SYSTEM_PROMPT = """You are a specialist in endocrinology and diabetes care with expertise in Type 1, Type 2, and gestational diabetes, insulin therapy, and metabolic health.
 
@@ -29,5 +29,4 @@ def diabetes_advisor(question: str, user_context: str = "") -> str:
         user_context: Summary of relevant user info (diabetes type, medications,
             recent glucose readings, comorbidities) from memory.
     """
-    messages = build_messages(SYSTEM_PROMPT, question, user_context)
-    return get_specialist("diabetes").invoke(messages).content
+    return ask_specialist("diabetes", SYSTEM_PROMPT, question, user_context)
@@ -1,7 +1,7 @@
 """Emergency triage tool for critical symptoms"""
 
 from langchain.tools import tool
-from .specialist_utils import get_specialist, build_messages
+from .specialist_utils import ask_specialist
 
 SYSTEM_PROMPT = """You are a specialized emergency triage specialist with expertise in critical care, emergency medicine, and acute symptom assessment.
 
@@ -55,5 +55,4 @@ def emergency_triage(symptoms: str, user_context: str = "") -> str:
         user_context: Summary of relevant medical info (allergies, medications,
             chronic conditions, age, pregnancy status) from memory.
     """
-    messages = build_messages(SYSTEM_PROMPT, symptoms, user_context)
-    return get_specialist("emergency", temperature=0.0).invoke(messages).content
+    return ask_specialist("emergency", SYSTEM_PROMPT, symptoms, user_context)
@@ -1,7 +1,7 @@
 """Mental health advisory tool"""
 
 from langchain.tools import tool
-from .specialist_utils import get_specialist, build_messages
+from .specialist_utils import ask_specialist
 
 SYSTEM_PROMPT = """You are a specialist in psychiatry and clinical psychology with expertise in mood disorders, anxiety, trauma-informed care, and psychopharmacology.
 
@@ -30,5 +30,4 @@ def mental_health_advisor(question: str, user_context: str = "") -> str:
         user_context: Summary of relevant info (diagnosed conditions, current
             medications, therapy status, significant stressors) from memory.
     """
-    messages = build_messages(SYSTEM_PROMPT, question, user_context)
-    return get_specialist("mental_health").invoke(messages).content
+    return ask_specialist("mental_health", SYSTEM_PROMPT, question, user_context)
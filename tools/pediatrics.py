@@ -1,7 +1,7 @@
 """Pediatrics advisory tool"""
 
 from langchain.tools import tool
-from .specialist_utils import get_specialist, build_messages
+from .specialist_utils import ask_specialist
 
 SYSTEM_PROMPT = """You are a specialist pediatrician with expertise spanning neonatology, child development, adolescent medicine, and preventive pediatric care.
 
@@ -30,5 +30,4 @@ def pediatrics_advisor(question: str, user_context: str = "") -> str:
         user_context: Summary of relevant child info (age, weight, known conditions,
             vaccination history, current medications) from memory.
     """
-    messages = build_messages(SYSTEM_PROMPT, question, user_context)
-    return get_specialist("pediatrics").invoke(messages).content
+    return ask_specialist("pediatrics", SYSTEM_PROMPT, question, user_context)
@@ -1,7 +1,7 @@
 """Pregnant woman advisory tool"""
 
 from langchain.tools import tool
-from .specialist_utils import get_specialist, build_messages
+from .specialist_utils import ask_specialist
 
 SYSTEM_PROMPT = """You are a specialized pregnancy healthcare advisor with deep expertise in obstetrics, maternal nutrition, fetal development, and perinatal mental health.
 
@@ -29,5 +29,4 @@ def pregnancy_advisor(question: str, user_context: str = "") -> str:
         user_context: Optional. Relevant user info (allergies, medications,
             known conditions, trimester) from memory.
     """
-    messages = build_messages(SYSTEM_PROMPT, question, user_context)
-    return get_specialist("pregnancy", temperature=0.1).invoke(messages).content
+    return ask_specialist("pregnancy", SYSTEM_PROMPT, question, user_context)
@@ -1,7 +1,7 @@
 """Preventive health analyzer tool for pattern detection and early intervention"""
 
 from langchain.tools import tool
-from .specialist_utils import get_specialist, build_messages
+from .specialist_utils import ask_specialist
 
 SYSTEM_PROMPT = """You are a preventive medicine specialist with expertise in population health, epidemiology, risk stratification, and early disease detection.
 
@@ -56,5 +56,4 @@ def preventive_health_analyzer(health_history: str, user_context: str = "") -> s
         user_context: User's complete health profile from memory (chronic conditions,
             medications, family history, demographics, past measurements/symptoms).
     """
-    messages = build_messages(SYSTEM_PROMPT, health_history, user_context)
-    return get_specialist("preventive", temperature=0.2).invoke(messages).content
+    return ask_specialist("preventive", SYSTEM_PROMPT, health_history, user_context)
@@ -1,20 +1,69 @@
 """Shared utilities for specialist LLM instances.
 
-Provides a properly-keyed cache (specialist type + model + temperature) and a
-`build_messages` helper that every tool uses to build its message list,
-eliminating repeated boilerplate across tool files.
+Provides a properly-keyed cache (specialist type + model + temperature) and
+`ask_specialist`, the single call path every tool uses: it builds the message
+list and, when prompt caching is enabled, sends the static SYSTEM_PROMPT as a
+provider cache reference instead of in full.
+
+Every specialist call goes through `hedged_call`: once a call runs past the
+specialist's observed p90 latency a duplicate request is sent and the first
+answer wins, and retryable errors are retried with jittered exponential
+backoff. Hedges are limited by a per-specialist budget. All waits are
+bounded by the request deadline (core.deadline), and every model call is
+sent with a timeout of the time left, so a call for an abandoned request
+does not keep holding a pool thread.
 """
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+
 from langchain_google_genai import ChatGoogleGenerativeAI
 from dotenv import load_dotenv
 
-from core.config import MODEL_NAME, SPECIALIST_TEMPERATURE
+from core.config import (
+    HEDGE_BUDGET_RATIO,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    FALLBACK_MODEL_NAME,
+    HEDGING_ENABLED,
+    LLM_TIMEOUT_SECONDS,
+    SPECIALIST_MAX_RETRIES,
+    SPECIALIST_RETRY_BASE_SECONDS,
+    SPECIALIST_RETRY_MAX_SECONDS,
+    SPECIALIST_TEMPERATURE,
+)
+from core import deadline
+from core.deadline import DeadlineExceeded
+from services.circuit_breaker import get_breaker
+from services.fallbacks import specialist_fallback
+from services.model_router import get_model_router
+from services.prompt_cache import get_prompt_cache
 
 load_dotenv()
 
+# Every specialist the app uses, with its temperature override (None means
+# SPECIALIST_TEMPERATURE). Listing them here lets warm_specialists() build
+# all of them at startup instead of on each one's first tool call.
+SPECIALISTS: dict[str, float | None] = {
+    "emergency": 0.0,
+    "pregnancy": 0.1,
+    "diabetes": None,
+    "pediatrics": None,
+    "mental_health": None,
+    "preventive": 0.2,
+    "doc_extractor": None,
+    "translator": 0.1,
+}
+
 # Cache keyed on (specialist_type, model, temperature) so that tools that
 # override temperature (e.g. emergency_triage) always receive the correct
-# instance rather than the first one that was cached.
+# instance rather than the first one that was cached. warm_specialists()
+# fills it from a thread pool, so creation is guarded by _cache_lock.
 _cache: dict[tuple, ChatGoogleGenerativeAI] = {}
+_cache_lock = threading.Lock()
 
 
 def get_specialist(
@@ -22,13 +71,301 @@ def get_specialist(
     model: str | None = None,
     temperature: float | None = None,
 ) -> ChatGoogleGenerativeAI:
-    """Return a cached ChatGoogleGenerativeAI instance for the given specialist."""
-    model = model or MODEL_NAME
+    """Return a cached ChatGoogleGenerativeAI instance for the given specialist.
+
+    Without an explicit model, the router picks the specialist's configured
+    model, or the fast tier while the service is overloaded.
+    """
+    model = model or get_model_router().select(specialist_type)
+    if temperature is None:
+        temperature = SPECIALISTS.get(specialist_type)
     temperature = temperature if temperature is not None else SPECIALIST_TEMPERATURE
     key = (specialist_type, model, temperature)
-    if key not in _cache:
-        _cache[key] = ChatGoogleGenerativeAI(model=model, temperature=temperature)
-    return _cache[key]
+    llm = _cache.get(key)
+    if llm is None:
+        with _cache_lock:
+            llm = _cache.get(key)
+            if llm is None:
+                # Retries are owned by hedged_call(); client-side retries would multiply them.
+                llm = _cache[key] = ChatGoogleGenerativeAI(
+                    model=model, temperature=temperature, max_retries=0, timeout=LLM_TIMEOUT_SECONDS
+                )
+    return llm
+
+
+# ── Hedging and retries ──
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_MARKERS = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "timed out", "Timeout")
+
+# Shared pool for primary and hedge calls. A losing call cannot be
+# interrupted once running; its result is simply discarded.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="specialist")
+
+
+class HedgeStats:
+    """Recent latencies and the hedging budget for one specialist."""
+
+    def __init__(self, window: int = 200, budget_cap: float = 10.0):
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._budget = 0.0
+        self._budget_cap = budget_cap
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging, or None while there is too little data."""
+        with self._lock:
+            if len(self._latencies) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * HEDGE_PERCENTILE / 100))]
+
+    def start_call(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self._budget = min(self._budget_cap, self._budget + HEDGE_BUDGET_RATIO)
+
+    def try_spend_hedge(self) -> bool:
+        """Take one hedge from the budget; each call earns HEDGE_BUDGET_RATIO of one."""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            self.hedges += 1
+            return True
+
+
+_hedge_stats: dict[str, HedgeStats] = {}
+_hedge_stats_lock = threading.Lock()
+
+
+def _stats_for(specialist_type: str) -> HedgeStats:
+    with _hedge_stats_lock:
+        if specialist_type not in _hedge_stats:
+            _hedge_stats[specialist_type] = HedgeStats()
+        return _hedge_stats[specialist_type]
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Whether an LLM call error is transient (rate limit, overload, timeout)."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int) and status in RETRYABLE_STATUS_CODES:
+        return True
+    text = f"{type(exc).__name__}: {exc}"
+    return any(str(code) in text for code in RETRYABLE_STATUS_CODES) or any(m in text for m in RETRYABLE_MARKERS)
+
+
+def _submit(stats: HedgeStats, fn):
+    """Run fn on the shared pool with the caller's context, recording its latency on success."""
+    def timed():
+        start = time.monotonic()
+        result = fn()
+        stats.record(time.monotonic() - start)
+        return result
+
+    return _executor.submit(contextvars.copy_context().run, timed)
+
+
+def _result(future, step: str):
+    """future.result(), giving up when the request deadline passes."""
+    try:
+        return future.result(timeout=deadline.bounded(None))
+    except FutureTimeout:
+        future.cancel()
+        raise DeadlineExceeded(step) from None
+
+
+def _hedged_once(stats: HedgeStats, fn, step: str):
+    stats.start_call()
+    primary = _submit(stats, fn)
+    delay = stats.hedge_delay() if HEDGING_ENABLED else None
+    if delay is None:
+        return _result(primary, step)
+
+    done, _ = wait([primary], timeout=deadline.bounded(delay))
+    if done:
+        return primary.result()
+    deadline.check(step)
+    if not stats.try_spend_hedge():
+        return _result(primary, step)
+
+    pending = {primary, _submit(stats, fn)}
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=deadline.bounded(None), return_when=FIRST_COMPLETED)
+        if not done:
+            for future in pending:
+                future.cancel()
+            raise DeadlineExceeded(step)
+        for future in done:
+            if future.exception() is None:
+                for loser in pending:
+                    loser.cancel()
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+def hedged_call(specialist_type: str, fn):
+    """Call fn() with hedging and retries, tracked under `specialist_type`.
+
+    Retryable errors are retried up to SPECIALIST_MAX_RETRIES times with
+    full-jitter exponential backoff; anything else is raised immediately.
+    Raises DeadlineExceeded when the request deadline passes first.
+    """
+    stats = _stats_for(specialist_type)
+    step = f"{specialist_type} specialist call"
+    for attempt in range(SPECIALIST_MAX_RETRIES + 1):
+        deadline.check(step)
+        try:
+            return _hedged_once(stats, fn, step)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if attempt >= SPECIALIST_MAX_RETRIES or not is_retryable(e):
+                raise
+            backoff = random.uniform(0, min(SPECIALIST_RETRY_MAX_SECONDS, SPECIALIST_RETRY_BASE_SECONDS * 2 ** attempt))
+            left = deadline.remaining()
+            if left is not None and left <= backoff:
+                raise
+            print(f"Retrying {specialist_type} after error ({attempt + 1}/{SPECIALIST_MAX_RETRIES}): {e}")
+            time.sleep(backoff)
+
+
+def invoke_within_deadline(llm, step: str, messages, **kwargs):
+    """llm.invoke() with its timeout capped at the request's remaining time.
+
+    Raises DeadlineExceeded if the deadline passes before or during the call.
+    """
+    timeout = deadline.call_timeout(step, LLM_TIMEOUT_SECONDS)
+    with deadline.expiring(step):
+        return llm.invoke(messages, timeout=timeout, **kwargs)
+
+
+def hedging_stats() -> dict:
+    """Per-specialist call and hedge counts with the current hedge delay."""
+    with _hedge_stats_lock:
+        items = list(_hedge_stats.items())
+    return {
+        name: {"calls": s.calls, "hedges": s.hedges, "hedge_delay_ms": (s.hedge_delay() or 0.0) * 1000}
+        for name, s in items
+    }
+
+
+def open_connection(llm) -> None:
+    """Establish the client's HTTP connection with a model metadata lookup.
+
+    This costs no tokens, so the TLS handshake is paid before the first real
+    call rather than during it.
+    """
+    client = getattr(llm, "client", None)
+    models = getattr(client, "models", None)
+    if models is not None:
+        models.get(model=llm.model)
+
+
+def warm_specialists(prime: bool = False) -> None:
+    """Build every registered specialist and open its connection in parallel.
+
+    Both model tiers are built when a fast tier is configured. With
+    prime=True each specialist also answers a tiny request, which warms the
+    provider side as well as the client.
+    """
+    config = get_model_router().config
+
+    def warm(specialist_type: str) -> None:
+        models = {config.model_for(specialist_type)}
+        if config.fast_model_name and specialist_type not in config.pinned_roles:
+            models.add(config.fast_model_name)
+        for model in models:
+            try:
+                llm = get_specialist(specialist_type, model=model)
+                open_connection(llm)
+                if prime:
+                    llm.invoke("Reply with OK.")
+            except Exception as e:
+                print(f"Error warming specialist {specialist_type} ({model}): {e}")
+
+    with ThreadPoolExecutor(max_workers=len(SPECIALISTS)) as pool:
+        list(pool.map(warm, SPECIALISTS))
+
+
+def ask_specialist(specialist_type: str, system_prompt: str, question: str, user_context: str = "") -> str:
+    """Ask a specialist a question and return its answer text.
+
+    Calls go through a circuit breaker per specialist and model. When the
+    model fails or its breaker is open, FALLBACK_MODEL_NAME is tried; if that
+    fails too, a fixed fallback is returned (safety guidance for emergencies)
+    so the orchestrator can still answer.
+    """
+    llm = get_specialist(specialist_type)
+    try:
+        return call_with_breaker(specialist_type, llm, _ask, llm, specialist_type, system_prompt, question, user_context)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        print(f"Specialist {specialist_type} unavailable: {e}")
+    if FALLBACK_MODEL_NAME and FALLBACK_MODEL_NAME != llm.model:
+        fallback = get_specialist(specialist_type, model=FALLBACK_MODEL_NAME)
+        try:
+            return call_with_breaker(
+                specialist_type, fallback, _ask, fallback, specialist_type, system_prompt, question, user_context
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Fallback model for specialist {specialist_type} unavailable: {e}")
+    return specialist_fallback(specialist_type, question)
+
+
+def call_with_breaker(role: str, llm, fn, *args):
+    """Run fn(*args) through the circuit breaker for this role and model."""
+    return get_breaker(f"{role}:{llm.model}").call(fn, *args)
+
+
+def _ask(llm, specialist_type: str, system_prompt: str, question: str, user_context: str) -> str:
+    """One specialist call on `llm`, hedged and retried.
+
+    With prompt caching enabled the system prompt is referenced by its cache
+    name. If the provider rejects the cached request, the prefix is dropped
+    from the cache and the call is retried with the full prompt.
+    """
+    step = f"{specialist_type} specialist call"
+    prompt_cache = get_prompt_cache()
+    cache_name = prompt_cache.get(llm.model, system_prompt) if prompt_cache else None
+    if cache_name:
+        messages = build_cached_messages(question, user_context)
+        try:
+            return hedged_call(
+                specialist_type, lambda: invoke_within_deadline(llm, step, messages, cached_content=cache_name)
+            ).content
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"Cached call failed for specialist {specialist_type}, retrying uncached: {e}")
+            prompt_cache.invalidate(llm.model, system_prompt)
+    messages = build_messages(system_prompt, question, user_context)
+    return hedged_call(specialist_type, lambda: invoke_within_deadline(llm, step, messages)).content
+
+
+def build_cached_messages(question: str, user_context: str = "") -> list[dict]:
+    """Build the message list for a call whose system prompt lives in a provider cache.
+
+    The provider rejects a system instruction alongside cached content, so the
+    user context travels in the user turn instead.
+    """
+    content = question
+    if user_context.strip():
+        content = f"User Context:\n{user_context}\n\n{question}"
+    return [{"role": "user", "content": content}]
 
 
 def build_messages(system_prompt: str, question: str, user_context: str = "") -> list[dict]:
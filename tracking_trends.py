@@ -0,0 +1,321 @@
+"""Vectorized trend and anomaly analysis over daily tracking entries.
+
+`analyze_tracking` turns a user's entries into columnar NumPy arrays: mood
+and energy as ordinal scores, symptoms and medications as per-day
+indicator matrices. It then computes, in one pass over those arrays:
+  - daily means and a rolling mean over the last ROLLING_DAYS
+  - the least-squares slope of each score (points per week)
+  - the strongest single shift in each score's mean (change point)
+  - symptom and medication frequency, recent days vs earlier
+
+The result is a compact dict of numbers plus plain-language `findings`.
+/tracking/trends returns it, and the chat context gets it instead of raw
+tracking rows.
+
+NumPy is imported on first use so it stays off the startup path.
+"""
+import bisect
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+from core.json_cache import load_json_cached
+from daily_tracking import TRACKING_DIR
+
+DEFAULT_TREND_DAYS = 30
+ROLLING_DAYS = 7
+MIN_TREND_DAYS = 5          # observed days needed before a slope is reported
+MIN_SEGMENT_DAYS = 3        # observed days on each side of a change point
+CHANGE_POINT_MIN_F = 8.0    # between/within variance ratio for a real shift
+MAX_LISTED = 10             # symptoms/medications returned per list
+
+MOOD_SCALE = {
+    "terrible": 1, "awful": 1, "bad": 1, "very bad": 1,
+    "low": 2, "poor": 2, "sad": 2, "down": 2,
+    "okay": 3, "ok": 3, "fine": 3, "neutral": 3, "average": 3,
+    "good": 4, "happy": 4,
+    "great": 5, "excellent": 5, "very good": 5,
+}
+ENERGY_SCALE = {
+    "very low": 1, "exhausted": 1,
+    "low": 2.5, "tired": 2.5,
+    "medium": 5, "moderate": 5, "normal": 5, "okay": 5,
+    "high": 7.5, "good": 7.5,
+    "very high": 9,
+}
+
+# name, word scale, top of the numeric scale, smallest change worth reporting
+METRICS = [
+    ("mood", MOOD_SCALE, 5, 0.75),
+    ("energy", ENERGY_SCALE, 10, 1.5),
+]
+
+_FRACTION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:/\s*(\d+(?:\.\d+)?))?\s*$")
+
+
+def _score(value, words: dict, top: float) -> float:
+    """Ordinal score for a mood/energy value: a known word, 'N/M' or a number."""
+    if isinstance(value, bool) or value is None:
+        return float("nan")
+    if isinstance(value, (int, float)):
+        return float(value) if 0 <= value <= top else float("nan")
+    text = str(value).strip().lower()
+    if text in words:
+        return float(words[text])
+    match = _FRACTION.match(text)
+    if not match:
+        return float("nan")
+    number, denominator = float(match.group(1)), match.group(2)
+    if denominator:
+        return number / float(denominator) * top if float(denominator) else float("nan")
+    return number if number <= top else float("nan")
+
+
+def _labels(value) -> list[str]:
+    """Normalized symptom/medication names from a list or comma-separated string."""
+    if not value:
+        return []
+    items = value.split(",") if isinstance(value, str) else value
+    return list(dict.fromkeys(str(i).strip().lower() for i in items if str(i).strip()))
+
+
+def _indicator_matrix(np, day_idx, values: list[list[str]], days: int):
+    """(days x names) presence matrix and the sorted names."""
+    names = sorted({name for labels in values for name in labels})
+    column = {name: i for i, name in enumerate(names)}
+    rows = [day for day, labels in zip(day_idx, values) for _ in labels]
+    cols = [column[name] for labels in values for name in labels]
+    presence = np.zeros((days, len(names)), dtype=bool)
+    presence[rows, cols] = True
+    return presence, names
+
+
+def _metric_stats(np, day_idx, scores, days: int) -> dict | None:
+    valid = ~np.isnan(scores)
+    if not valid.any():
+        return None
+    sums = np.bincount(day_idx[valid], weights=scores[valid], minlength=days)
+    counts = np.bincount(day_idx[valid], minlength=days)
+    observed = counts > 0
+    t = np.flatnonzero(observed)
+    y = sums[observed] / counts[observed]
+
+    # Rolling mean over windows ending on each day (partial at the start)
+    sum_cs = np.concatenate(([0.0], np.cumsum(sums)))
+    count_cs = np.concatenate(([0], np.cumsum(counts)))
+    end = np.arange(1, days + 1)
+    begin = np.maximum(end - ROLLING_DAYS, 0)
+    window_counts = count_cs[end] - count_cs[begin]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rolling = (sum_cs[end] - sum_cs[begin]) / window_counts
+
+    slope = None
+    if len(y) >= MIN_TREND_DAYS:
+        tc = t - t.mean()
+        slope = float((tc * (y - y.mean())).sum() / (tc ** 2).sum() * 7)
+
+    change_point = None
+    m = len(y)
+    if m >= 2 * MIN_SEGMENT_DAYS:
+        cs = np.cumsum(y)
+        k = np.arange(MIN_SEGMENT_DAYS, m - MIN_SEGMENT_DAYS + 1)
+        left = cs[k - 1] / k
+        right = (cs[-1] - cs[k - 1]) / (m - k)
+        gain = k * (m - k) / m * (left - right) ** 2
+        best = int(np.argmax(gain))
+        residual = (((y - y.mean()) ** 2).sum() - gain[best]) / (m - 2)
+        if gain[best] > 0 and (residual <= 1e-12 or gain[best] / residual >= CHANGE_POINT_MIN_F):
+            change_point = {
+                "day": int(t[k[best]]),
+                "before": round(float(left[best]), 2),
+                "after": round(float(right[best]), 2),
+            }
+
+    previous = rolling[-1 - ROLLING_DAYS] if days > ROLLING_DAYS else float("nan")
+    return {
+        "latest": round(float(scores[valid][-1]), 2),
+        "mean": round(float(scores[valid].mean()), 2),
+        "rolling_mean": None if np.isnan(rolling[-1]) else round(float(rolling[-1]), 2),
+        "previous_rolling_mean": None if np.isnan(previous) else round(float(previous), 2),
+        "slope_per_week": None if slope is None else round(slope, 2),
+        "change_point": change_point,
+        "days_observed": m,
+    }
+
+
+def _frequency_stats(np, presence, names: list[str], tracked) -> list[dict]:
+    """Per-name day counts and frequencies overall, in the last ROLLING_DAYS and before."""
+    if not names:
+        return []
+    recent, earlier = slice(-ROLLING_DAYS, None), slice(None, -ROLLING_DAYS)
+    totals = np.array([tracked.sum(), tracked[recent].sum(), tracked[earlier].sum()], dtype=float)
+    counts = np.stack([presence.sum(0), presence[recent].sum(0), presence[earlier].sum(0)])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        freqs = np.where(totals[:, None] > 0, counts / totals[:, None], 0.0)
+    order = np.argsort(-counts[0], kind="stable")[:MAX_LISTED]
+    return [
+        {
+            "name": names[i],
+            "days": int(counts[0, i]),
+            "frequency": round(float(freqs[0, i]), 2),
+            "recent_days": int(counts[1, i]),
+            "recent_frequency": round(float(freqs[1, i]), 2),
+            "earlier_frequency": round(float(freqs[2, i]), 2),
+        }
+        for i in order
+    ]
+
+
+def analyze_tracking(entries: list, days: int = DEFAULT_TREND_DAYS, today: date | None = None) -> dict:
+    """Trend statistics and findings for tracking entries in the last `days` days.
+
+    Args:
+        entries: Tracking entries in chronological order (older ones are ignored)
+        days: Window length in calendar days, ending today
+        today: Last day of the window (default: the current date)
+
+    Returns:
+        Dict with per-metric statistics, symptom and medication frequencies
+        and a list of plain-language findings
+    """
+    import numpy as np
+
+    days = max(1, days)
+    today = today or date.today()
+    start = today - timedelta(days=days - 1)
+    result = {
+        "days": days,
+        "start": start.isoformat(),
+        "end": today.isoformat(),
+        "entries": 0,
+        "days_tracked": 0,
+        "last_entry_date": None,
+        "mood": None,
+        "energy": None,
+        "symptoms": [],
+        "medications": [],
+        "findings": [],
+    }
+
+    entry_days = np.array(
+        [(e.get("date") or e.get("timestamp", ""))[:10] for e in entries], dtype="datetime64[D]"
+    )
+    day_idx = (entry_days - np.datetime64(start, "D")).astype(int)
+    in_window = (day_idx >= 0) & (day_idx < days)
+    entries = [e for e, keep in zip(entries, in_window) if keep]
+    day_idx = day_idx[in_window]
+    if not entries:
+        return result
+
+    tracked = np.bincount(day_idx, minlength=days) > 0
+    result.update(
+        entries=len(entries),
+        days_tracked=int(tracked.sum()),
+        last_entry_date=(start + timedelta(days=int(day_idx.max()))).isoformat(),
+    )
+
+    for name, words, top, _ in METRICS:
+        scores = np.array([_score(e.get(name), words, top) for e in entries])
+        stats = _metric_stats(np, day_idx, scores, days)
+        if stats:
+            stats["scale"] = f"1-{top}" if name == "mood" else f"0-{top}"
+            if stats["change_point"]:
+                stats["change_point"]["date"] = (start + timedelta(days=stats["change_point"].pop("day"))).isoformat()
+        result[name] = stats
+
+    for field in ("symptoms", "medications"):
+        presence, names = _indicator_matrix(np, day_idx, [_labels(e.get(field)) for e in entries], days)
+        result[field] = _frequency_stats(np, presence, names, tracked)
+
+    result["findings"] = _findings(result, tracked_recent=int(tracked[-ROLLING_DAYS:].sum()),
+                                   tracked_earlier=int(tracked[:-ROLLING_DAYS].sum()), today=today)
+    return result
+
+
+def _findings(trends: dict, tracked_recent: int, tracked_earlier: int, today: date) -> list[str]:
+    findings = []
+    for name, _, top, min_shift in METRICS:
+        stats = trends[name]
+        if not stats:
+            continue
+        label = name.capitalize()
+        change, slope = stats["change_point"], stats["slope_per_week"]
+        if change and abs(change["after"] - change["before"]) >= min_shift:
+            findings.append(
+                f"{label} shifted from {change['before']:.1f} to {change['after']:.1f} "
+                f"(scale {stats['scale']}) around {change['date']}"
+            )
+        elif slope is not None and abs(slope) >= min_shift / 2:
+            findings.append(
+                f"{label} trending {'down' if slope < 0 else 'up'} ({slope:+.1f}/week on a "
+                f"{stats['scale']} scale over {stats['days_observed']} tracked days)"
+            )
+        elif (stats["previous_rolling_mean"] is not None and stats["rolling_mean"] is not None
+              and abs(stats["rolling_mean"] - stats["previous_rolling_mean"]) >= min_shift):
+            findings.append(
+                f"{label} averaged {stats['rolling_mean']:.1f} over the last {ROLLING_DAYS} days, "
+                f"vs {stats['previous_rolling_mean']:.1f} the week before (scale {stats['scale']})"
+            )
+
+    for symptom in trends["symptoms"]:
+        rising = symptom["recent_frequency"] - symptom["earlier_frequency"]
+        if tracked_recent >= 3 and symptom["recent_days"] >= 2 and rising >= 0.3:
+            before = "new" if symptom["earlier_frequency"] == 0 and tracked_earlier >= 3 else (
+                f"was {symptom['earlier_frequency']:.0%} of days before"
+            )
+            findings.append(
+                f"{symptom['name'].capitalize()} on {symptom['recent_days']} of the last "
+                f"{tracked_recent} tracked days ({before})"
+            )
+        elif trends["days_tracked"] >= 5 and symptom["frequency"] >= 0.5:
+            findings.append(
+                f"{symptom['name'].capitalize()} reported on {symptom['frequency']:.0%} of tracked days"
+            )
+
+    for medication in trends["medications"]:
+        if (tracked_recent >= 3 and medication["earlier_frequency"] >= 0.6
+                and medication["recent_frequency"] <= medication["earlier_frequency"] - 0.4):
+            findings.append(
+                f"{medication['name'].capitalize()} logged on {medication['recent_days']} of the last "
+                f"{tracked_recent} tracked days, down from {medication['earlier_frequency']:.0%}"
+            )
+
+    gap = (today - date.fromisoformat(trends["last_entry_date"])).days
+    if gap >= 3:
+        findings.append(f"No tracking entries in the last {gap} days")
+    return findings
+
+
+def get_tracking_trends(user_id: str, days: int = DEFAULT_TREND_DAYS) -> dict:
+    """Trend analysis of a user's tracking history over the last `days` days."""
+    try:
+        records = load_json_cached(Path(TRACKING_DIR) / f"{user_id}.json", default=[])
+        start = (date.today() - timedelta(days=max(1, days) - 1)).isoformat()
+        # Entries are stored in chronological order
+        first = bisect.bisect_left(records, start, key=lambda e: e.get("date") or e.get("timestamp", "")[:10])
+        return analyze_tracking(records[first:], days=days)
+    except Exception as e:
+        print(f"Error analyzing tracking trends for {user_id}: {e}")
+        return {}
+
+
+def get_trend_context(user_id: str, days: int = DEFAULT_TREND_DAYS) -> str:
+    """Compact tracking trends for AI context ('' when there is nothing tracked)."""
+    trends = get_tracking_trends(user_id, days=days)
+    if not trends.get("entries"):
+        return ""
+
+    lines = [
+        f"Tracking trends, last {days} days ({trends['entries']} entries on "
+        f"{trends['days_tracked']} days, latest {trends['last_entry_date']}):"
+    ]
+    lines += [f"- {finding}" for finding in trends["findings"]] or ["- No notable changes"]
+
+    levels = [
+        f"{name} {trends[name]['rolling_mean']:.1f}/{top} ({ROLLING_DAYS}-day mean)"
+        for name, _, top, _ in METRICS
+        if trends[name] and trends[name]["rolling_mean"] is not None
+    ]
+    if levels:
+        lines.append(f"- Current levels: {', '.join(levels)}")
+    return "\n".join(lines)
@@ -0,0 +1,115 @@
+"""Background processing of uploaded documents.
+
+`/upload` stores the file under UPLOAD_DIR (an `uploads` directory next to
+this module) and enqueues a job; it returns 202 with the job id straight
+away, so request time no longer depends on the document's size. Jobs run on `upload_queue`, a JobQueue of its own
+(UPLOAD_QUEUE_PATH, UPLOAD_WORKERS threads), so a long document never
+holds up chat side effects or emergency alerts on the main queue.
+
+A job extracts the text (document_cache), extracts facts from it and
+appends the new ones to the user's memory, reporting progress after each
+step. One user's uploads run one at a time (lane "upload:<user_id>"), so
+fact deduplication sees earlier uploads. The stored file is deleted once
+the job is done or has failed its last attempt.
+"""
+import os
+import secrets
+from pathlib import Path
+
+from core import deadline
+from core.config import (
+    DOCUMENT_FACTS_MAX_CHARS,
+    JOB_LEASE_SECONDS,
+    JOB_RETENTION_HOURS,
+    UPLOAD_QUEUE_PATH,
+    UPLOAD_TIMEOUT_SECONDS,
+    UPLOAD_WORKERS,
+)
+from document_cache import extract_document_content_cached
+from job_queue import DONE, FAILED, JobQueue
+from memory import save_new_facts
+from services.ai_service import extract_health_facts_with_ai
+
+# Next to this module, not the working directory: jobs store the file's
+# path, and a worker may run from elsewhere or after a chdir.
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")
+UPLOAD_MAX_ATTEMPTS = 3
+
+upload_queue = JobQueue(
+    UPLOAD_QUEUE_PATH,
+    workers=UPLOAD_WORKERS,
+    reserved_workers=0,
+    lease_seconds=JOB_LEASE_SECONDS,
+    max_attempts=UPLOAD_MAX_ATTEMPTS,
+    retention_hours=JOB_RETENTION_HOURS,
+)
+
+
+def enqueue_upload(user_id: str, filename: str, data: bytes, extract_facts: bool = True) -> int:
+    """Store an uploaded file and queue it for processing; returns the job id."""
+    Path(UPLOAD_DIR).mkdir(exist_ok=True)
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    path = Path(UPLOAD_DIR) / f"{secrets.token_hex(16)}.{extension}"
+    path.write_bytes(data)
+    try:
+        return upload_queue.enqueue(
+            "process_upload",
+            {"user_id": user_id, "filename": filename, "path": str(path), "extract_facts": extract_facts},
+            user_id=user_id,
+            lane=f"upload:{user_id}",
+        )
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+
+
+def _process_upload_job(payload: dict, job: dict) -> dict:
+    path = Path(payload["path"])
+    filename = payload["filename"]
+    try:
+        # Workers run without a request deadline; bound each attempt like the old synchronous request.
+        with deadline.scope(UPLOAD_TIMEOUT_SECONDS):
+            content = extract_document_content_cached(path.read_bytes(), filename, max_chars=DOCUMENT_FACTS_MAX_CHARS)
+            content_extracted = bool(content) and not content.startswith("[")
+            upload_queue.set_progress(job["id"], 0.3)
+
+            extracted_facts = ""
+            new_facts = 0
+            if payload["extract_facts"] and content_extracted:
+                deadline.check("fact extraction")
+                extracted_facts = extract_health_facts_with_ai(content, filename)
+                upload_queue.set_progress(job["id"], 0.9)
+                if extracted_facts:
+                    new_facts = save_new_facts(payload["user_id"], extracted_facts)
+    except Exception:
+        if job["attempts"] >= job["max_attempts"]:
+            path.unlink(missing_ok=True)
+        raise
+    path.unlink(missing_ok=True)
+    return {
+        "filename": filename,
+        "content_extracted": content_extracted,
+        # Whether any facts were found, as in the synchronous /upload response
+        # (the extractor returns "" rather than a "no facts" message).
+        "facts_extracted": bool(extracted_facts),
+        "new_facts": new_facts,
+    }
+
+
+upload_queue.register("process_upload", _process_upload_job)
+
+
+def get_upload_status(job_id: int, user_id: str) -> dict | None:
+    """Status of one of the user's upload jobs, or None if they have no such job."""
+    job = upload_queue.get(job_id)
+    if job is None or job["kind"] != "process_upload" or job["user_id"] != user_id:
+        return None
+    return {
+        "job_id": job["id"],
+        "filename": job["payload"]["filename"],
+        "status": job["status"],
+        "progress": job["progress"] or 0.0,
+        "attempts": job["attempts"],
+        "result": job["result"] if job["status"] == DONE else None,
+        "error": job["last_error"] if job["status"] == FAILED else None,
+    }
@@ -1,11 +1,13 @@
 """Simple file-based user authentication and management."""
 
-import json
 import hashlib
 import secrets
 from pathlib import Path
 from datetime import datetime, timedelta
 
+from core.codec import read_json, write_json
+from core.versions import file_version
+
 USERS_FILE = "users.json"
 SESSIONS_FILE = "sessions.json"
 
@@ -18,11 +20,7 @@ def _hash_password(password: str) -> str:
 def _load_users() -> dict:
     """Load users from the JSON file."""
     try:
-        path = Path(USERS_FILE)
-        if not path.exists():
-            return {}
-        with path.open() as f:
-            return json.load(f)
+        return read_json(USERS_FILE, default={})
     except Exception as e:
         print(f"Error loading users: {e}")
         return {}
@@ -31,8 +29,7 @@ def _load_users() -> dict:
 def _save_users(users: dict) -> None:
     """Save users to the JSON file."""
     try:
-        with Path(USERS_FILE).open("w") as f:
-            json.dump(users, f, indent=2)
+        write_json(USERS_FILE, users)
     except Exception as e:
         print(f"Error saving users: {e}")
 
@@ -40,11 +37,7 @@ def _save_users(users: dict) -> None:
 def _load_sessions() -> dict:
     """Load active sessions from the JSON file."""
     try:
-        path = Path(SESSIONS_FILE)
-        if not path.exists():
-            return {}
-        with path.open() as f:
-            return json.load(f)
+        return read_json(SESSIONS_FILE, default={})
     except Exception as e:
         print(f"Error loading sessions: {e}")
         return {}
@@ -53,8 +46,7 @@ def _load_sessions() -> dict:
 def _save_sessions(sessions: dict) -> None:
     """Save sessions to the JSON file."""
     try:
-        with Path(SESSIONS_FILE).open("w") as f:
-            json.dump(sessions, f, indent=2)
+        write_json(SESSIONS_FILE, sessions)
     except Exception as e:
         print(f"Error saving sessions: {e}")
 
@@ -195,6 +187,11 @@ def logout_user(token: str) -> bool:
     return False
 
 
+def users_version() -> str:
+    """Version token of the user store (all profiles); changes on every save."""
+    return file_version(USERS_FILE)
+
+
 def get_user_info(username: str) -> dict:
     """Get user information (excluding password)."""
     users = _load_users()